@@ -0,0 +1,100 @@
+"""
+Índice de compatibilidad (`load/compatibility_index.py`) sobre un catálogo generado:
+tiempo de armado, tamaño del archivo, tiempo de carga y latencia por consulta
+(p50 / p99) de `query_rows` y `query`, contra un filtro de pandas sobre todo el catálogo.
+
+    python -m benchmarks.bench_compat_index --rows 1000000 --queries 2000
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_xlsx import build_catalog
+from load.compatibility_index import CompatibilityIndex, CompatibilityIndexBuilder
+
+
+def _percentiles_ms(seconds: list[float]) -> str:
+    p50, p99 = np.percentile(np.array(seconds) * 1000, [50, 99])
+    return f"p50 {p50:8.3f} ms  p99 {p99:8.3f} ms"
+
+
+def _scan(catalog: pd.DataFrame, marca: str, modelo: str, year: int) -> np.ndarray:
+    matches = (
+        (catalog["compatibilidad_modelo"] == modelo)
+        & (catalog["compatibilidad_marca"] == marca)
+        & (catalog["compatibilidad_anio_desde"].fillna(-1) <= year)
+        & (catalog["compatibilidad_anio_hasta"].fillna(9999) >= year)
+    )
+    return np.flatnonzero(matches.to_numpy())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="filas del catálogo")
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=2_000)
+    parser.add_argument("--scan-queries", type=int, default=20, help="consultas con el filtro de pandas")
+    args = parser.parse_args(argv)
+
+    catalog = build_catalog(args.rows, args.fanout, args.seed)
+    vehicles = catalog.dropna(subset=["compatibilidad_marca", "compatibilidad_modelo"])
+    rng = np.random.default_rng(args.seed)
+    sample = vehicles.iloc[rng.integers(0, len(vehicles), size=args.queries)]
+    queries = [
+        (str(marca), str(modelo), int(year))
+        for marca, modelo, year in zip(
+            sample["compatibilidad_marca"], sample["compatibilidad_modelo"], rng.integers(1990, 2025, size=args.queries)
+        )
+    ]
+
+    started_at = time.perf_counter()
+    builder = CompatibilityIndexBuilder()
+    builder.add(catalog)
+    compatibility_index = builder.build()
+    build_seconds = time.perf_counter() - started_at
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        index_path = compatibility_index.save(Path(temp_dir) / "catalog_unificado.compat_index.npz")
+        size_mb = index_path.stat().st_size / 2**20
+        started_at = time.perf_counter()
+        compatibility_index = CompatibilityIndex.load(index_path)
+        load_seconds = time.perf_counter() - started_at
+
+    print(
+        f"{len(catalog)} filas -> {len(compatibility_index)} indexadas en {compatibility_index.bucket_count} buckets"
+        f"  armado {build_seconds:.2f}s  carga {load_seconds:.2f}s  {size_mb:.1f} MB en disco"
+    )
+    # primera consulta fuera de la medición: decodifica las tablas de textos
+    compatibility_index.query(*queries[0])
+
+    lookups = (
+        ("query_rows", compatibility_index.query_rows),
+        ("query", compatibility_index.query),
+        ("query x50", lambda *vehicle: compatibility_index.query(*vehicle, limit=50)),
+    )
+    for label, lookup in lookups:
+        seconds, matches = [], 0
+        for marca, modelo, year in queries:
+            started_at = time.perf_counter()
+            matches += len(lookup(marca, modelo, year))
+            seconds.append(time.perf_counter() - started_at)
+        print(f"  {label:<12} {_percentiles_ms(seconds)}  ({matches / len(queries):.0f} filas por consulta)")
+
+    seconds = []
+    for marca, modelo, year in queries[:args.scan_queries]:
+        started_at = time.perf_counter()
+        _scan(catalog, marca, modelo, year)
+        seconds.append(time.perf_counter() - started_at)
+    print(f"  {'scan pandas':<12} {_percentiles_ms(seconds)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Parquet único (`output_format="parquet"`) vs dataset particionado
+(`output_format="parquet_dataset"`, `load/writer.ParquetDatasetWriter`): tiempo de
+escritura, tamaño en disco y tiempo de lectura con filtro por proveedor, por marca y
+por OEM (este último aprovecha los bloom filters si se piden con --bloom).
+
+    python -m benchmarks.bench_parquet --rows 1000000 --bloom
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from benchmarks.bench_xlsx import build_catalog
+from load.writer import ParquetDatasetConfig, write_output
+
+
+def _timed(function: Callable[[], object]) -> tuple[float, object]:
+    started_at = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started_at, result
+
+
+def _size_mb(path: Path) -> float:
+    files = path.rglob("*.parquet") if path.is_dir() else [path]
+    return sum(file.stat().st_size for file in files) / 2**20
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="filas del catálogo")
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3, help="lecturas por filtro (se reporta la mejor)")
+    parser.add_argument("--bloom", action="store_true", help="bloom filters en repuesto_oem y repuesto_sku")
+    args = parser.parse_args(argv)
+
+    catalog = build_catalog(args.rows, args.fanout, args.seed)
+    # los processors generados usan la misma hoja "bench": un proveedor por formato para particionar
+    catalog["proveedor"] = catalog["formato_origen"].cat.rename_categories(
+        lambda format_key: f"proveedor_{format_key}"
+    )
+    filters = {
+        "proveedor": [("proveedor", "=", catalog["proveedor"].iloc[0])],
+        "marca": [("compatibilidad_marca", "=", catalog["compatibilidad_marca"].dropna().iloc[0])],
+        "oem": [("repuesto_oem", "=", catalog["repuesto_oem"].dropna().iloc[len(catalog) // 2])],
+    }
+    dataset_config = ParquetDatasetConfig(
+        bloom_filter_columns=("repuesto_oem", "repuesto_sku") if args.bloom else (),
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for output_format in ("parquet", "parquet_dataset"):
+            output_dir = Path(temp_dir) / output_format
+            write_seconds, output_path = _timed(
+                lambda: write_output(catalog, output_dir, output_format=output_format, parquet_dataset=dataset_config)
+            )
+            print(
+                f"{output_format:<16} {len(catalog)} filas  escritura {write_seconds:6.2f}s"
+                f"  {_size_mb(output_path):6.1f} MB en disco"
+            )
+            for label, row_filter in filters.items():
+                best_seconds, rows = min(
+                    _timed(lambda: len(pd.read_parquet(output_path, filters=row_filter))) for _ in range(args.repeat)
+                )
+                print(f"{'':<16} lectura filtro {label:<10} {best_seconds * 1000:8.1f} ms  ({rows} filas)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
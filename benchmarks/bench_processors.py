@@ -0,0 +1,126 @@
+"""
+Filas/seg de los processors por formato sobre una hoja sintética.
+
+    python -m benchmarks.bench_processors --rows 1000000
+    python -m benchmarks.bench_processors --rows 1000000 --baseline-ref <commit>
+
+Con --baseline-ref también se mide el processor tal como estaba en ese commit
+(árbol completo exportado con git archive, en un proceso aparte).
+"""
+from __future__ import annotations
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from constants.formats import FORMAT_APLICACIONES, FORMAT_COMPLETO, FORMAT_NOMBRE_EMBEBIDO
+from constants.output import OUTPUT_COLUMN_ORDER
+from benchmarks.synthetic import load_template_sheets, synthetic_sheet
+from transform.formats.formato_aplicaciones import procesar_formato_aplicaciones
+from transform.formats.formato_completo import procesar_formato_completo_a_tabla_unica
+from transform.formats.formato_nombre_embebido import procesar_formato_nombre_embebido_a_tabla_unica
+from utils.dataframe import conform_output_chunk
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+PROCESSORS: dict[str, tuple[str, str]] = {
+    FORMAT_COMPLETO: ("transform/formats/formato_completo.py", "procesar_formato_completo_a_tabla_unica"),
+    FORMAT_APLICACIONES: ("transform/formats/formato_aplicaciones.py", "procesar_formato_aplicaciones"),
+    FORMAT_NOMBRE_EMBEBIDO: (
+        "transform/formats/formato_nombre_embebido.py",
+        "procesar_formato_nombre_embebido_a_tabla_unica",
+    ),
+}
+
+CURRENT_PROCESSORS: dict[str, Callable[[pd.DataFrame, str], pd.DataFrame]] = {
+    FORMAT_COMPLETO: procesar_formato_completo_a_tabla_unica,
+    FORMAT_APLICACIONES: procesar_formato_aplicaciones,
+    FORMAT_NOMBRE_EMBEBIDO: procesar_formato_nombre_embebido_a_tabla_unica,
+}
+
+
+BASELINE_SNIPPET = """
+import pickle, sys, time
+sys.path.insert(0, sys.argv[1])
+module_name, function_name = sys.argv[2], sys.argv[3]
+processor = getattr(__import__(module_name, fromlist=[function_name]), function_name)
+sheet = pickle.load(open(sys.argv[4], "rb"))
+started_at = time.perf_counter()
+output_table = processor(sheet, "bench")
+elapsed = time.perf_counter() - started_at
+pickle.dump((elapsed, output_table), open(sys.argv[5], "wb"))
+"""
+
+
+def time_processor_at_ref(ref: str, format_key: str, sheet: pd.DataFrame) -> tuple[float, pd.DataFrame]:
+    """
+    Mide el processor tal como estaba en `ref`: exporta ese árbol completo (git archive)
+    a un directorio temporal y lo corre en un proceso aparte.
+    """
+    relative_path, function_name = PROCESSORS[format_key]
+    module_name = relative_path.removesuffix(".py").replace("/", ".")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        tree_dir = temp_path / "tree"
+        tree_dir.mkdir()
+        archive = subprocess.run(
+            ["git", "archive", ref], cwd=REPO_ROOT, check=True, capture_output=True
+        ).stdout
+        subprocess.run(["tar", "-x", "-C", str(tree_dir)], input=archive, check=True)
+
+        sheet_path, result_path = temp_path / "sheet.pkl", temp_path / "result.pkl"
+        sheet.to_pickle(sheet_path)
+        subprocess.run(
+            [sys.executable, "-c", BASELINE_SNIPPET, str(tree_dir), module_name, function_name,
+             str(sheet_path), str(result_path)],
+            cwd=tree_dir, check=True,
+        )
+        return pd.read_pickle(result_path)
+
+
+def time_processor(
+    processor: Callable[[pd.DataFrame, str], pd.DataFrame], sheet: pd.DataFrame
+) -> tuple[float, pd.DataFrame]:
+    started_at = time.perf_counter()
+    output_table = processor(sheet, "bench")
+    return time.perf_counter() - started_at, output_table
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--formats", nargs="+", default=list(PROCESSORS), choices=list(PROCESSORS))
+    parser.add_argument("--baseline-ref", default=None, help="commit/branch a comparar (opcional)")
+    args = parser.parse_args(argv)
+
+    templates = load_template_sheets()
+    for format_key in args.formats:
+        sheet = synthetic_sheet(format_key, args.rows, seed=args.seed, templates=templates)
+        elapsed, output_table = time_processor(CURRENT_PROCESSORS[format_key], sheet)
+        print(
+            f"{format_key:<26} actual   {args.rows:>9} filas en {elapsed:7.2f}s "
+            f"= {args.rows / elapsed:>10,.0f} filas/s  (salida {len(output_table)} filas)"
+        )
+
+        if args.baseline_ref:
+            baseline_elapsed, baseline_table = time_processor_at_ref(args.baseline_ref, format_key, sheet)
+            # se compara con el esquema de salida: los dtypes crudos pueden variar entre commits
+            same_output = conform_output_chunk(baseline_table, OUTPUT_COLUMN_ORDER).equals(
+                conform_output_chunk(output_table, OUTPUT_COLUMN_ORDER)
+            )
+            print(
+                f"{format_key:<26} {args.baseline_ref[:8]:<8} {args.rows:>9} filas en {baseline_elapsed:7.2f}s "
+                f"= {args.rows / baseline_elapsed:>10,.0f} filas/s  "
+                f"(speedup x{baseline_elapsed / elapsed:.2f}, salida idéntica={same_output})"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
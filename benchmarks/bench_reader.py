@@ -0,0 +1,104 @@
+"""
+Pico de memoria (RSS) y tiempo al leer + procesar un libro sintético grande:
+lectura completa con pandas vs lectura en streaming por chunks. Con --pipeline
+también mide `main.run` completo (concat + escritura única vs escritura incremental).
+
+    python -m benchmarks.bench_reader --rows 200000 --chunk-rows 50000
+    python -m benchmarks.bench_reader --rows 200000 --chunk-rows 50000 --pipeline
+
+Cada modo corre en un proceso aparte para que el pico de RSS no se mezcle.
+"""
+from __future__ import annotations
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.synthetic import write_synthetic_workbook
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+MODE_SNIPPET = """
+import resource, sys, time
+sys.path.insert(0, sys.argv[1])
+from detect.format_detector import detectar_formato
+from extract.excel_reader import iter_sheet_chunks, read_all_sheets
+from main import PROCESSORS
+
+mode, path, chunk_rows = sys.argv[2], sys.argv[3], int(sys.argv[4])
+baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started_at = time.perf_counter()
+sheets = read_all_sheets(path) if mode == "pandas" else iter_sheet_chunks(path, chunk_rows=chunk_rows)
+input_rows = output_rows = 0
+for sheet_data in sheets:
+    input_rows += len(sheet_data.data_frame)
+    detected_format = detectar_formato(sheet_data.data_frame)
+    output_rows += len(PROCESSORS[detected_format.format_key](sheet_data.data_frame, sheet_data.sheet_name))
+elapsed = time.perf_counter() - started_at
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f"{input_rows} {output_rows} {elapsed:.3f} {baseline_kb} {peak_kb}")
+"""
+
+PIPELINE_SNIPPET = """
+import resource, sys, time
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+from config import ETLConfig
+from main import run
+
+mode, path, chunk_rows, output_dir = sys.argv[2], sys.argv[3], int(sys.argv[4]), sys.argv[5]
+streaming = mode == "pipeline-stream"
+baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started_at = time.perf_counter()
+output_path = run(ETLConfig(
+    input_path=Path(path), output_dir=Path(output_dir), output_format="csv",
+    read_chunk_rows=chunk_rows if streaming else None, stream_output=streaming,
+))
+elapsed = time.perf_counter() - started_at
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+output_rows = sum(1 for _ in open(output_path, encoding="utf-8")) - 1
+print(f"0 {output_rows} {elapsed:.3f} {baseline_kb} {peak_kb}")
+"""
+
+
+def measure_mode(
+    mode: str, workbook_path: Path, chunk_rows: int, output_dir: Path
+) -> tuple[int, int, float, int, int]:
+    snippet = PIPELINE_SNIPPET if mode.startswith("pipeline") else MODE_SNIPPET
+    completed = subprocess.run(
+        [sys.executable, "-c", snippet, str(REPO_ROOT), mode, str(workbook_path), str(chunk_rows), str(output_dir)],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True,
+    )
+    input_rows, output_rows, elapsed, baseline_kb, peak_kb = completed.stdout.split()
+    return int(input_rows), int(output_rows), float(elapsed), int(baseline_kb), int(peak_kb)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000, help="filas por hoja (3 hojas)")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workbook", type=Path, default=None, help="usar un libro existente en vez de generarlo")
+    parser.add_argument("--pipeline", action="store_true", help="medir también main.run completo")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workbook_path = args.workbook or write_synthetic_workbook(
+            Path(temp_dir) / "sintetico.xlsx", args.rows, seed=args.seed
+        )
+        print(f"libro: {workbook_path} ({workbook_path.stat().st_size / 1e6:.1f} MB)")
+        modes = ["pandas", "stream"] + (["pipeline-full", "pipeline-stream"] if args.pipeline else [])
+        for mode in modes:
+            input_rows, output_rows, elapsed, baseline_kb, peak_kb = measure_mode(
+                mode, workbook_path, args.chunk_rows, Path(temp_dir) / mode
+            )
+            print(
+                f"{mode:<15} {input_rows:>9} filas -> {output_rows:>9} en {elapsed:7.2f}s  "
+                f"RSS pico {peak_kb / 1024:8.1f} MB (tras imports {baseline_kb / 1024:.1f} MB)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
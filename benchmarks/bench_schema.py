@@ -0,0 +1,74 @@
+"""
+Memoria y tiempo de escritura del catálogo unificado sin tipar (concat de las salidas tal
+como las entregan los processors) vs con el esquema tipado de `constants/output.OUTPUT_SCHEMA`
+(cada salida casteada antes del concat). Usa hojas generadas de los cuatro formatos.
+
+    python -m benchmarks.bench_schema --rows 200000 --fanout 3
+"""
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from benchmarks.run_suite import run_processor
+from benchmarks.synthetic import GENERATED_FORMATS, generated_sheet, stub_enrichment
+from constants.formats import FORMAT_OEM_SOLO
+from constants.output import OUTPUT_COLUMN_ORDER
+from load.writer import write_output
+from utils.dataframe import concat_output_chunks, conform_output_chunk, reorder_columns
+
+
+def _untyped_catalog(outputs: list[pd.DataFrame]) -> pd.DataFrame:
+    unified_data_frame = pd.concat(outputs, ignore_index=True).drop_duplicates()
+    return reorder_columns(unified_data_frame, priority_columns=OUTPUT_COLUMN_ORDER)
+
+
+def _typed_catalog(outputs: list[pd.DataFrame]) -> pd.DataFrame:
+    conformed = [conform_output_chunk(output, OUTPUT_COLUMN_ORDER) for output in outputs]
+    return concat_output_chunks(conformed).drop_duplicates()
+
+
+def _timed(function: Callable[[], object]) -> float:
+    started_at = time.perf_counter()
+    function()
+    return time.perf_counter() - started_at
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="filas por hoja (una hoja por formato)")
+    parser.add_argument("--fanout", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write-formats", nargs="+", default=["csv", "parquet"])
+    args = parser.parse_args(argv)
+
+    outputs = []
+    for format_key in GENERATED_FORMATS:
+        sheet = generated_sheet(format_key, args.rows, fanout=args.fanout, seed=args.seed)
+        enrichments = (
+            {oem_code: stub_enrichment(oem_code, args.fanout) for oem_code in dict.fromkeys(sheet["OEM"])}
+            if format_key == FORMAT_OEM_SOLO else {}
+        )
+        outputs.append(run_processor(format_key, sheet, enrichments))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, build in (("sin tipar", _untyped_catalog), ("tipado", _typed_catalog)):
+            build_seconds = _timed(lambda: build(outputs))
+            catalog = build(outputs)
+            memory_mb = catalog.memory_usage(deep=True).sum() / 2**20
+            print(f"{label:<10} {len(catalog):>9} filas  memoria {memory_mb:8.1f} MB  concat+dedup {build_seconds:6.2f}s")
+            for output_format in args.write_formats:
+                output_dir = Path(temp_dir) / f"{label}_{output_format}"
+                write_seconds = _timed(lambda: write_output(catalog, output_dir, output_format=output_format))
+                size_mb = (output_dir / f"catalog_unificado.{output_format}").stat().st_size / 2**20
+                print(f"{'':<10} write_output:{output_format:<8} {write_seconds:6.2f}s  ({size_mb:.1f} MB en disco)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
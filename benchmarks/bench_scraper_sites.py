@@ -0,0 +1,95 @@
+"""
+Registro de sitios de scraping (`extract/scrapping/registry.py`) con sitios simulados
+(latencia y tasa de acierto configurables, sin red): latencia por OEM consultando los
+sitios uno tras otro (como antes, cortando en el primer resultado completo) vs en
+paralelo con el primero completo ganando, y el orden final que arma el ranking.
+
+    python -m benchmarks.bench_scraper_sites --oems 200 --sites lento:0.40:0.9 rapido:0.05:0.6 malo:0.10:0.05
+
+Cada sitio es `nombre:latencia_segundos:tasa_de_acierto`; la prioridad declarada es el
+orden en que se pasan.
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from extract.scrapping.registry import ScraperRegistry, ScraperSite, is_complete_result
+
+
+def simulated_site(name: str, latency: float, hit_rate: float, priority: int, seed: int) -> ScraperSite:
+    def scrape(oem_code: str, session: object = None) -> dict | None:
+        # acierto determinístico por (sitio, OEM): las dos estrategias ven los mismos resultados
+        rng = random.Random(zlib.crc32(f"{seed}:{name}:{oem_code}".encode()))
+        time.sleep(latency * rng.uniform(0.5, 1.5))
+        if rng.random() >= hit_rate:
+            return None
+        return {"repuesto_nombre": f"{name} {oem_code}", "compatibilidades": [{"compatibilidad_modelo": "X"}]}
+
+    return ScraperSite(name=name, scrape=scrape, priority=priority)
+
+
+def _parse_site(spec: str) -> tuple[str, float, float]:
+    name, latency, hit_rate = spec.split(":")
+    return name, float(latency), float(hit_rate)
+
+
+def _percentiles_ms(seconds: list[float]) -> str:
+    p50, p99 = np.percentile(np.array(seconds) * 1000, [50, 99])
+    return f"p50 {p50:7.1f} ms  p99 {p99:7.1f} ms  total {sum(seconds):6.1f}s"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--oems", type=int, default=200)
+    parser.add_argument(
+        "--sites", nargs="+", default=["lento:0.40:0.9", "rapido:0.05:0.6", "malo:0.10:0.05"],
+        help="nombre:latencia_segundos:tasa_de_acierto, en orden de prioridad",
+    )
+    parser.add_argument("--max-concurrent-sites", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sites = [
+        simulated_site(name, latency, hit_rate, priority, args.seed)
+        for priority, (name, latency, hit_rate) in enumerate(map(_parse_site, args.sites))
+    ]
+    oem_codes = [f"{90000 + oem_index:05d}-{oem_index % 997:05d}" for oem_index in range(args.oems)]
+
+    seconds, hits = [], 0
+    for oem_code in oem_codes:
+        started_at = time.perf_counter()
+        result = next((result for site in sites if is_complete_result(result := site.scrape(oem_code, None))), None)
+        seconds.append(time.perf_counter() - started_at)
+        hits += result is not None
+    print(f"{'secuencial':<11} {_percentiles_ms(seconds)}  completos {hits}/{len(oem_codes)}")
+
+    registry = ScraperRegistry(max_concurrent_sites=args.max_concurrent_sites)
+    for site in sites:
+        registry.register(site)
+    seconds, hits = [], 0
+    for oem_code in oem_codes:
+        started_at = time.perf_counter()
+        result = registry.first_complete(oem_code, registry.ranked_sites())
+        seconds.append(time.perf_counter() - started_at)
+        hits += is_complete_result(result)
+    print(f"{'paralelo':<11} {_percentiles_ms(seconds)}  completos {hits}/{len(oem_codes)}")
+
+    # los sitios que perdieron pueden seguir corriendo: se esperan antes de leer sus estadísticas
+    time.sleep(max(latency for _, latency, _ in map(_parse_site, args.sites)) * 1.5)
+    print("orden final: " + " > ".join(site.name for site in registry.ranked_sites()))
+    for site in sites:
+        stats = registry.stats(site.name)
+        print(
+            f"  {site.name:<10} ganadas {stats.wins:4d}  éxito {stats.success_rate:4.0%}  "
+            f"latencia {stats.latency_ewma or 0:.3f}s  puntaje {stats.score:6.2f}  canceladas {stats.skipped}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Equivalencia + microbenchmark del escáner único de compatibilidades.
+
+    python -m benchmarks.bench_tokenizer [--repeat 200]
+
+1) Compara `parsear_compatibilidad` (y los wrappers `extraer_*`) contra la implementación
+   anterior de cuatro funciones, sobre cada celda y cada fragmento de compatibilidad del
+   Excel de ejemplo. Termina con código 1 si algún campo difiere.
+2) Mide fragmentos/s de las cuatro llamadas anteriores vs el escáner (sin memoización).
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from benchmarks.synthetic import DEFAULT_SOURCE_XLSX
+from constants.vehicles import KNOWN_MAKES
+from extract.excel_reader import read_all_sheets
+from transform import parsing_compatibilidades as pc
+from transform.parsing_nombre_embebido import split_vehiculos_en_nombre
+
+
+# ---------- Implementación anterior (referencia congelada para la equivalencia) ----------
+
+def _ref_extraer_anios(texto: str) -> Tuple[Optional[int], Optional[int]]:
+    normalized_text = texto.upper()
+    normalized_text = pc.MEASURE_BLOCK.sub(" ", normalized_text)
+    normalized_text = pc.DECIMALS.sub(" ", normalized_text)
+
+    range_match = pc.RANGE_4DIGIT.search(normalized_text)
+    if range_match:
+        return int(range_match.group(1)), int(range_match.group(2))
+    range_match = pc.RANGE_2DIGIT.search(normalized_text)
+    if range_match:
+        return pc._to_year_4(range_match.group(1)), pc._to_year_4(range_match.group(2))
+    range_match = pc.GENERIC_RANGE.search(normalized_text)
+    if range_match:
+        return pc._to_year_4(range_match.group(1)), pc._to_year_4(range_match.group(2))
+    on_match = pc.ON_PATTERN.search(normalized_text)
+    if on_match:
+        return pc._to_year_4(on_match.group(1)), None
+    year_match = pc.YEAR4.search(normalized_text)
+    if year_match:
+        year_value = int(year_match.group(1))
+        return year_value, year_value
+    return None, None
+
+
+def _ref_extraer_motor_litros(texto: str) -> Optional[float]:
+    liters_match = pc.LITERS.search(texto)
+    if not liters_match:
+        return None
+    liters_value = float(liters_match.group(1))
+    if liters_value < 0.8 or liters_value > 8.0:
+        return None
+    return liters_value
+
+
+def _ref_extraer_codigo_motor(texto: str) -> Optional[str]:
+    normalized_text = texto.upper()
+    candidates = []
+    for token in pc.TOKEN.findall(normalized_text):
+        if token in KNOWN_MAKES or token in pc.STOP_WORDS:
+            continue
+        if not pc.HAS_LETTER.search(token) or not pc.HAS_DIGIT.search(token):
+            continue
+        if token.isdigit():
+            continue
+        candidates.append(token)
+    if not candidates:
+        return None
+    candidates.sort(key=lambda token: (-(len(token)), -sum(ch.isdigit() for ch in token)))
+    return candidates[0]
+
+
+def _ref_extraer_marca_modelo_flexible(texto: str) -> tuple[Optional[str], Optional[str]]:
+    tokens = [token for token in texto.strip().split() if token]
+    if not tokens:
+        return None, None
+    first_token = tokens[0].upper()
+    marca = first_token if first_token in KNOWN_MAKES else None
+    model_start_index = 1 if marca else 0
+    modelo_tokens = []
+    for token in tokens[model_start_index:]:
+        token_upper = token.upper()
+        if (
+            pc.YEAR4.fullmatch(token_upper)
+            or pc.LITERS.fullmatch(token)
+            or pc.RANGE_2DIGIT.fullmatch(token)
+            or pc.RANGE_4DIGIT.fullmatch(token)
+        ):
+            break
+        if token_upper == "0":
+            continue
+        modelo_tokens.append(token)
+    modelo = " ".join(modelo_tokens).strip() if modelo_tokens else None
+    return marca, (modelo.upper() if modelo else None)
+
+
+def _ref_cuatro_llamadas(texto: str) -> tuple:
+    marca, modelo = _ref_extraer_marca_modelo_flexible(texto)
+    anio_desde, anio_hasta = _ref_extraer_anios(texto)
+    return marca, modelo, anio_desde, anio_hasta, _ref_extraer_motor_litros(texto), _ref_extraer_codigo_motor(texto)
+
+
+def _wrappers_cuatro_llamadas(texto: str) -> tuple:
+    marca, modelo = pc.extraer_marca_modelo_flexible(texto)
+    anio_desde, anio_hasta = pc.extraer_anios(texto)
+    return marca, modelo, anio_desde, anio_hasta, pc.extraer_motor_litros(texto), pc.extraer_codigo_motor(texto)
+
+
+# ---------- Fragmentos ----------
+
+def collect_fragments(source: Path = DEFAULT_SOURCE_XLSX) -> list[str]:
+    """Cada celda del Excel y cada fragmento que generan los splits de compatibilidades."""
+    fragments: list[str] = []
+    for sheet_data in read_all_sheets(source):
+        for column_name in sheet_data.data_frame.columns:
+            for cell_value in sheet_data.data_frame[column_name].dropna().tolist():
+                cell_text = str(cell_value)
+                fragments.append(cell_text)
+                fragments.extend(cell_text.split(","))
+                fragments.extend(pc.split_aplicaciones_seguro(cell_text))
+                fragments.extend(split_vehiculos_en_nombre(cell_text))
+    return list(dict.fromkeys(fragment for fragment in fragments))
+
+
+def check_equivalence(fragments: list[str]) -> list[str]:
+    mismatches: list[str] = []
+    for fragment in fragments:
+        expected = _ref_cuatro_llamadas(fragment)
+        for label, actual in (
+            ("escáner", tuple(pc.parsear_compatibilidad(fragment))),
+            ("wrappers", _wrappers_cuatro_llamadas(fragment)),
+        ):
+            same = all(
+                type(expected_value) is type(actual_value) and expected_value == actual_value
+                for expected_value, actual_value in zip(expected, actual)
+            )
+            if not same:
+                mismatches.append(f"{label}: {fragment!r}\n  antes={expected}\n  ahora={actual}")
+    return mismatches
+
+
+def time_per_fragment(parser, fragments: list[str], repeat: int) -> float:
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        for fragment in fragments:
+            parser(fragment)
+    elapsed = time.perf_counter() - started_at
+    return len(fragments) * repeat / elapsed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    fragments = collect_fragments()
+    mismatches = check_equivalence(fragments)
+    print(f"equivalencia: {len(fragments)} fragmentos, {len(mismatches)} diferencias")
+    for mismatch in mismatches[:20]:
+        print(mismatch)
+
+    before = time_per_fragment(_ref_cuatro_llamadas, fragments, args.repeat)
+    after = time_per_fragment(pc.parsear_compatibilidad, fragments, args.repeat)
+    print(f"4 funciones (anterior): {before:>10,.0f} fragmentos/s")
+    print(f"parsear_compatibilidad: {after:>10,.0f} fragmentos/s  (x{after / before:.2f})")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
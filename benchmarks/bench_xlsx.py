@@ -0,0 +1,132 @@
+"""
+Tiempo y pico de memoria (RSS) al escribir el catálogo unificado a XLSX:
+`DataFrame.to_excel` (escritura anterior) vs `load/writer.XlsxIncrementalWriter`
+(openpyxl `write_only`), tanto con el catálogo entero en memoria (`write_output`) como
+por chunks leídos de a uno (salida incremental). Por encima de 1.048.575 filas de datos
+`to_excel` falla y el writer incremental reparte en hojas `catalogo_2`, ...
+
+    python -m benchmarks.bench_xlsx --rows 100000 1000000 --chunk-rows 50000
+
+Cada modo (y la generación del catálogo) corre en un proceso aparte para que el pico de
+RSS no se mezcle: en Linux un hijo hereda el ru_maxrss del padre al momento del fork.
+"""
+from __future__ import annotations
+import argparse
+import math
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.run_suite import run_processor
+from benchmarks.synthetic import GENERATED_FORMATS, generated_sheet, stub_enrichment
+from constants.formats import FORMAT_OEM_SOLO
+from constants.output import OUTPUT_COLUMN_ORDER
+from utils.dataframe import concat_output_chunks, conform_output_chunk
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+MODES = ("to_excel", "write_output", "incremental")
+
+BUILD_SNIPPET = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from benchmarks.bench_xlsx import build_catalog
+rows, fanout, seed, chunk_rows = map(int, sys.argv[2:6])
+catalog_path = sys.argv[6]
+build_catalog(rows, fanout, seed).to_parquet(catalog_path, index=False, row_group_size=chunk_rows)
+"""
+
+MODE_SNIPPET = """
+import resource, sys, time
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+import pandas as pd
+import pyarrow.parquet as pq
+from load.writer import XlsxIncrementalWriter, write_output
+
+mode, catalog_path, output_dir = sys.argv[2], sys.argv[3], Path(sys.argv[4])
+output_dir.mkdir(parents=True, exist_ok=True)
+catalog = pd.read_parquet(catalog_path) if mode != "incremental" else None
+baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started_at = time.perf_counter()
+if mode == "to_excel":
+    output_path = output_dir / "catalog_unificado.xlsx"
+    catalog.to_excel(output_path, index=False)
+elif mode == "write_output":
+    output_path = write_output(catalog, output_dir, output_format="xlsx")
+else:
+    parquet_file = pq.ParquetFile(catalog_path)
+    with XlsxIncrementalWriter(output_dir, parquet_file.schema_arrow.names) as writer:
+        for row_group in range(parquet_file.num_row_groups):
+            writer.write(parquet_file.read_row_group(row_group).to_pandas())
+    output_path = writer.output_path
+elapsed = time.perf_counter() - started_at
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f"{elapsed:.3f} {baseline_kb} {peak_kb} {output_path.stat().st_size}")
+"""
+
+
+def build_catalog(rows: int, fanout: int, seed: int) -> pd.DataFrame:
+    """Catálogo tipado de `rows` filas, repartidas en partes iguales entre los cuatro formatos generados."""
+    rows_per_sheet = max(1, math.ceil(rows / len(GENERATED_FORMATS)))
+    outputs = []
+    for format_key in GENERATED_FORMATS:
+        sheet = generated_sheet(format_key, rows_per_sheet, fanout=fanout, seed=seed)
+        enrichments = (
+            {oem_code: stub_enrichment(oem_code, fanout) for oem_code in dict.fromkeys(sheet["OEM"])}
+            if format_key == FORMAT_OEM_SOLO else {}
+        )
+        output = run_processor(format_key, sheet, enrichments).iloc[:rows_per_sheet]
+        outputs.append(conform_output_chunk(output, OUTPUT_COLUMN_ORDER))
+    catalog = concat_output_chunks(outputs)
+    return catalog.iloc[:rows].reset_index(drop=True)
+
+
+def measure_mode(mode: str, catalog_path: Path, output_dir: Path) -> tuple[float, int, int, int]:
+    completed = subprocess.run(
+        [sys.executable, "-c", MODE_SNIPPET, str(REPO_ROOT), mode, str(catalog_path), str(output_dir)],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+    elapsed, baseline_kb, peak_kb, size_bytes = completed.stdout.split()
+    return float(elapsed), int(baseline_kb), int(peak_kb), int(size_bytes)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000], help="filas del catálogo")
+    parser.add_argument("--chunk-rows", type=int, default=50_000, help="filas por chunk en modo incremental")
+    parser.add_argument("--fanout", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rows in args.rows:
+            catalog_path = Path(temp_dir) / f"catalogo_{rows}.parquet"
+            subprocess.run(
+                [sys.executable, "-c", BUILD_SNIPPET, str(REPO_ROOT),
+                 *map(str, (rows, args.fanout, args.seed, args.chunk_rows)), str(catalog_path)],
+                cwd=REPO_ROOT, check=True,
+            )
+            print(f"{rows} filas")
+            for mode in args.modes:
+                try:
+                    elapsed, baseline_kb, peak_kb, size_bytes = measure_mode(
+                        mode, catalog_path, Path(temp_dir) / f"{mode}_{rows}"
+                    )
+                except RuntimeError as error:
+                    print(f"  {mode:<13} falló: {error}")
+                    continue
+                print(
+                    f"  {mode:<13} {elapsed:8.2f}s  RSS +{(peak_kb - baseline_kb) / 1024:7.1f} MB"
+                    f"  (pico {peak_kb / 1024:7.1f} MB)  {size_bytes / 2**20:6.1f} MB en disco"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+"""
+Suite de throughput sobre libros sintéticos de los cuatro formatos (OEM solo con un
+enriquecedor stub, sin red). Por formato y tamaño mide: read_all_sheets, detectar_formato,
+el processor, cada función de parseo y write_output. Reporta filas/s y pico de memoria
+(tracemalloc, en una segunda pasada) como JSON, para comparar entre commits.
+
+    python -m benchmarks.run_suite --rows 1000 100000 1000000 --fanout 3 --output base.json
+    python -m benchmarks.run_suite --rows 100000 --output nuevo.json --compare base.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import pandas as pd
+
+from benchmarks.synthetic import GENERATED_COLUMNS, GENERATED_FORMATS, generated_sheet, stub_enrichment, write_workbook
+from constants.formats import FORMAT_APLICACIONES, FORMAT_COMPLETO, FORMAT_NOMBRE_EMBEBIDO, FORMAT_OEM_SOLO
+from detect.format_detector import detectar_formato
+from extract.excel_reader import read_all_sheets
+from load.writer import write_output
+from transform import parsing_compatibilidades, parsing_medidas, parsing_nombre_embebido
+from transform.formats import formato_oem_solo
+from transform.formats.formato_aplicaciones import procesar_formato_aplicaciones
+from transform.formats.formato_completo import procesar_formato_completo_a_tabla_unica
+from transform.formats.formato_nombre_embebido import procesar_formato_nombre_embebido_a_tabla_unica
+from transform.parse_cache import reset_parse_stats
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+CPU_PROCESSORS: dict[str, Callable[[pd.DataFrame, str], pd.DataFrame]] = {
+    FORMAT_COMPLETO: procesar_formato_completo_a_tabla_unica,
+    FORMAT_APLICACIONES: procesar_formato_aplicaciones,
+    FORMAT_NOMBRE_EMBEBIDO: procesar_formato_nombre_embebido_a_tabla_unica,
+}
+
+FRAGMENT_PARSERS = [
+    parsing_compatibilidades.parsear_compatibilidad,
+    parsing_compatibilidades.extraer_marca_modelo_flexible,
+    parsing_compatibilidades.extraer_anios,
+    parsing_compatibilidades.extraer_motor_litros,
+    parsing_compatibilidades.extraer_codigo_motor,
+]
+
+
+@contextmanager
+def stubbed_oem_enricher(enrichments: dict[str, dict]) -> Iterator[None]:
+    """Reemplaza cache/scraping/LLM de la hoja solo OEM por resultados precalculados."""
+    original = formato_oem_solo._enrich_oem_codes
+    formato_oem_solo._enrich_oem_codes = lambda oem_codes, *args: [enrichments.get(oem_code) for oem_code in oem_codes]
+    try:
+        yield
+    finally:
+        formato_oem_solo._enrich_oem_codes = original
+
+
+def run_processor(format_key: str, sheet: pd.DataFrame, enrichments: dict[str, dict]) -> pd.DataFrame:
+    if format_key == FORMAT_OEM_SOLO:
+        with stubbed_oem_enricher(enrichments):
+            return formato_oem_solo.procesar_formato_oem_solo(sheet, "bench", use_llm=False)
+    return CPU_PROCESSORS[format_key](sheet, "bench")
+
+
+def parser_inputs(format_key: str, sheet: pd.DataFrame, enrichments: dict[str, dict]) -> dict[Callable, list[str]]:
+    """Entradas reales de cada parser para el formato (lo que el processor le pasaría)."""
+    if format_key == FORMAT_COMPLETO:
+        fragments = [fragment.strip() for text in sheet["COMPATIBILIDADES"] for fragment in text.split(",") if fragment.strip()]
+        return {
+            **{parser: fragments for parser in FRAGMENT_PARSERS},
+            parsing_medidas.extraer_medidas: sheet["REPUESTO"].tolist(),
+        }
+    if format_key == FORMAT_APLICACIONES:
+        aplicaciones = sheet["APLICACIONES"].tolist()
+        parts = [part for text in aplicaciones for part in parsing_compatibilidades.split_aplicaciones_seguro(text)]
+        return {
+            parsing_compatibilidades.split_aplicaciones_seguro: aplicaciones,
+            parsing_compatibilidades.parsear_compatibilidad: parts,
+            parsing_medidas.extraer_medidas: sheet["DESCRIPCION"].tolist(),
+        }
+    if format_key == FORMAT_NOMBRE_EMBEBIDO:
+        return {
+            parsing_nombre_embebido.parse_compatibilidad_desde_nombre: sheet["REPUESTO"].tolist(),
+            parsing_medidas.extraer_medidas: sheet["REPUESTO"].tolist(),
+        }
+    specs = [enrichment["repuesto_especificaciones_texto"] for enrichment in enrichments.values()]
+    return {parsing_medidas.extraer_medidas: [text for text in specs if text]}
+
+
+def measure(
+    stage: str, function: Callable[[], Any], rows_in: int, memory: bool, rows_out: Callable[[Any], Optional[int]] = lambda _: None
+) -> dict[str, Any]:
+    reset_parse_stats()
+    cpu_started_at, started_at = time.process_time(), time.perf_counter()
+    result = function()
+    seconds, cpu_seconds = time.perf_counter() - started_at, time.process_time() - cpu_started_at
+
+    peak_memory_mb = None
+    if memory:
+        # segunda pasada: tracemalloc distorsiona el tiempo, así que no se mezcla con la primera
+        reset_parse_stats()
+        tracemalloc.start()
+        function()
+        peak_memory_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    return {
+        "stage": stage,
+        "seconds": round(seconds, 6),
+        "cpu_seconds": round(cpu_seconds, 6),
+        "rows_in": rows_in,
+        "rows_out": rows_out(result),
+        "rows_per_second": round(rows_in / seconds, 1) if seconds else None,
+        "peak_memory_mb": round(peak_memory_mb, 2) if peak_memory_mb is not None else None,
+    }
+
+
+def bench_format(
+    format_key: str, rows: int, fanout: int, seed: int, memory: bool,
+    parser_limit: int, write_formats: list[str], work_dir: Path,
+) -> list[dict[str, Any]]:
+    sheet = generated_sheet(format_key, rows, fanout=fanout, seed=seed)
+    enrichments = (
+        {oem_code: stub_enrichment(oem_code, fanout) for oem_code in dict.fromkeys(sheet["OEM"])}
+        if format_key == FORMAT_OEM_SOLO else {}
+    )
+    workbook_path = write_workbook({"bench": sheet}, work_dir / f"{format_key}_{rows}.xlsx")
+
+    results = [
+        measure("read_all_sheets", lambda: read_all_sheets(workbook_path), rows, memory,
+                lambda sheets: sum(len(sheet_data.data_frame) for sheet_data in sheets)),
+        measure("detectar_formato", lambda: detectar_formato(sheet), rows, memory=False),
+    ]
+    processor_result = measure("processor", lambda: run_processor(format_key, sheet, enrichments), rows, memory, len)
+    results.append(processor_result)
+
+    for parser, inputs in parser_inputs(format_key, sheet, enrichments).items():
+        inputs = inputs[:parser_limit]
+        results.append(measure(
+            f"parser:{parser.__name__}", lambda: [parser(text) for text in inputs], len(inputs), memory
+        ))
+
+    output_table = run_processor(format_key, sheet, enrichments)
+    for output_format in write_formats:
+        output_dir = work_dir / f"out_{format_key}_{rows}_{output_format}"
+        results.append(measure(
+            f"write_output:{output_format}",
+            lambda: write_output(output_table, output_dir, output_format=output_format),
+            len(output_table), memory,
+        ))
+
+    for result in results:
+        result.update({"format": format_key, "rows": rows, "fanout": fanout})
+    return results
+
+
+def run_metadata(args: argparse.Namespace) -> dict[str, Any]:
+    def git(*git_args: str) -> Optional[str]:
+        completed = subprocess.run(["git", *git_args], cwd=REPO_ROOT, capture_output=True, text=True)
+        return completed.stdout.strip() if completed.returncode == 0 else None
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "rows": args.rows,
+        "fanout": args.fanout,
+        "seed": args.seed,
+    }
+
+
+def print_comparison(results: list[dict[str, Any]], baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    baseline_by_key = {
+        (result["format"], result["rows"], result["stage"]): result for result in baseline["results"]
+    }
+    print(f"\ncomparado con {baseline_path} (commit {str(baseline['meta'].get('commit'))[:8]}):")
+    for result in results:
+        previous = baseline_by_key.get((result["format"], result["rows"], result["stage"]))
+        if not previous or not previous.get("rows_per_second") or not result.get("rows_per_second"):
+            continue
+        ratio = result["rows_per_second"] / previous["rows_per_second"]
+        flag = "  <-- regresión" if ratio < 0.9 else ""
+        print(f"  {result['format']:<24} {result['rows']:>8} {result['stage']:<40} x{ratio:5.2f}{flag}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000], help="filas por hoja (ej. 1000 ... 1000000)")
+    parser.add_argument("--fanout", type=int, default=3, help="compatibilidades promedio por fila")
+    parser.add_argument("--formats", nargs="+", default=GENERATED_FORMATS, choices=GENERATED_FORMATS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--write-formats", nargs="+", default=["csv", "parquet"])
+    parser.add_argument("--parser-limit", type=int, default=100_000, help="máximo de entradas por parser")
+    parser.add_argument("--no-memory", action="store_true", help="omitir la pasada con tracemalloc")
+    parser.add_argument("--output", type=Path, default=None, help="archivo JSON (por defecto, stdout)")
+    parser.add_argument("--compare", type=Path, default=None, help="JSON de otra corrida para comparar filas/s")
+    args = parser.parse_args(argv)
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rows in args.rows:
+            for format_key in args.formats:
+                for result in bench_format(
+                    format_key, rows, args.fanout, args.seed, not args.no_memory,
+                    args.parser_limit, args.write_formats, Path(temp_dir),
+                ):
+                    results.append(result)
+                    memory_text = f"{result['peak_memory_mb']:8.1f} MB" if result["peak_memory_mb"] is not None else ""
+                    print(
+                        f"{format_key:<24} {rows:>8} {result['stage']:<40} {result['seconds']:8.3f}s "
+                        f"{result['rows_per_second'] or 0:>12,.0f} filas/s {memory_text}",
+                        file=sys.stderr,
+                    )
+
+    report = json.dumps({"meta": run_metadata(args), "results": results}, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(report, encoding="utf-8")
+        print(f"reporte: {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+    if args.compare:
+        print_comparison(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
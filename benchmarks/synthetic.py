@@ -0,0 +1,223 @@
+from __future__ import annotations
+import re
+import zlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from constants.formats import FORMAT_APLICACIONES, FORMAT_COMPLETO, FORMAT_NOMBRE_EMBEBIDO, FORMAT_OEM_SOLO
+from detect.format_detector import detectar_formato
+from extract.excel_reader import read_all_sheets
+
+DEFAULT_SOURCE_XLSX = Path(__file__).resolve().parents[1] / "ArchivosIniciales" / "datos_tarea_reclutamiento.xlsx"
+
+# Columna con texto libre de cada formato: ahí se varían años para no repetir siempre lo mismo
+TEXT_COLUMN_BY_FORMAT = {
+    FORMAT_COMPLETO: "COMPATIBILIDADES",
+    FORMAT_APLICACIONES: "APLICACIONES",
+    FORMAT_NOMBRE_EMBEBIDO: "REPUESTO",
+}
+
+YEAR4 = re.compile(r"\b(19\d{2}|20\d{2})\b")
+
+
+def load_template_sheets(source: Path = DEFAULT_SOURCE_XLSX) -> dict[str, pd.DataFrame]:
+    """Hojas reales del Excel de ejemplo, indexadas por formato detectado."""
+    templates: dict[str, pd.DataFrame] = {}
+    for sheet_data in read_all_sheets(source):
+        detected_format = detectar_formato(sheet_data.data_frame)
+        if detected_format and detected_format.format_key in TEXT_COLUMN_BY_FORMAT:
+            templates[detected_format.format_key] = sheet_data.data_frame
+    return templates
+
+
+def synthetic_sheet(
+    format_key: str,
+    rows: int,
+    seed: int = 0,
+    vary_fraction: float = 0.3,
+    templates: Optional[dict[str, pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """
+    Hoja sintética de `rows` filas con las columnas del formato: muestrea filas reales
+    y, en `vary_fraction` de ellas, cambia los años del texto libre para que no todas
+    las compatibilidades sean idénticas.
+    """
+    templates = templates if templates is not None else load_template_sheets()
+    template = templates[format_key]
+    rng = np.random.default_rng(seed)
+
+    sample = template.iloc[rng.integers(0, len(template), size=rows)].reset_index(drop=True)
+    text_column = next(
+        column_name for column_name in sample.columns
+        if column_name.strip().upper() == TEXT_COLUMN_BY_FORMAT[format_key]
+    )
+
+    varied_mask = rng.random(rows) < vary_fraction
+    random_years = rng.integers(1990, 2025, size=int(varied_mask.sum())).astype(str)
+    varied_texts = [
+        YEAR4.sub(year, text) if isinstance(text, str) else text
+        for text, year in zip(sample.loc[varied_mask, text_column].tolist(), random_years)
+    ]
+    sample.loc[varied_mask, text_column] = varied_texts
+    return sample
+
+
+def write_workbook(sheets: dict[str, pd.DataFrame], path: Path) -> Path:
+    """Escribe las hojas a .xlsx con openpyxl write_only (fila a fila, memoria acotada)."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for sheet_name, sheet in sheets.items():
+        worksheet = workbook.create_sheet(title=sheet_name)
+        worksheet.append(list(sheet.columns))
+        for row in sheet.itertuples(index=False):
+            worksheet.append([None if pd.isna(value) else value for value in row])
+    workbook.save(path)
+    return path
+
+
+def write_synthetic_workbook(
+    path: Path,
+    rows_per_sheet: int,
+    seed: int = 0,
+    templates: Optional[dict[str, pd.DataFrame]] = None,
+) -> Path:
+    """Libro .xlsx con una hoja sintética por formato CPU, muestreada de las plantillas."""
+    templates = templates if templates is not None else load_template_sheets()
+    sheets = {
+        f"sintetica_{sheet_index + 1}": synthetic_sheet(format_key, rows_per_sheet, seed=seed + sheet_index, templates=templates)
+        for sheet_index, format_key in enumerate(TEXT_COLUMN_BY_FORMAT)
+    }
+    return write_workbook(sheets, path)
+
+
+# ---------- Hojas generadas (sin plantilla, fan-out configurable) ----------
+
+VEHICLES = {
+    "TOYOTA": ["HILUX", "YARIS", "COROLLA", "RAV4", "HIACE", "LAND CRUISER"],
+    "HYUNDAI": ["ELANTRA", "TUCSON", "ACCENT", "SANTA FE", "H1", "I10"],
+    "KIA": ["MORNING", "RIO 5", "SPORTAGE", "SORENTO", "FRONTIER"],
+    "CHEVROLET": ["DMAX", "SAIL", "SPARK", "CORSA", "N300"],
+    "NISSAN": ["NAVARA", "TIIDA", "V16", "X-TRAIL"],
+    "MITSUBISHI": ["L200", "MONTERO", "LANCER"],
+    "ISUZU": ["NKR", "DMAX"],
+    "SUZUKI": ["SWIFT", "ALTO", "VITARA"],
+}
+ENGINE_CODES = ["G4FC", "G4GC", "1KD", "2KD", "1NZFE", "G4HG", "G3LA", "QG15", "4D56", "4JB1", None]
+ENGINE_LITERS = ["1.0", "1.2", "1.4", "1.6", "2.0", "2.4", "2.5", "2.8", "3.0", None]
+PART_NAMES = [
+    "KIT EMBRAGUE", "DISCO FRENO DELANTERO", "BUJE BANDEJA", "RADIADOR", "CORREA DISTRIBUCION",
+    "OPTICO DERECHO", "SELLO VALVULA", "AMORTIGUADOR TRASERO", "BOMBA AGUA", "FILTRO ACEITE",
+]
+PART_MEASURES = ["275X24X25.6", "200X14X18.8", "260MM", "22X30", "190X18X19.3", None, None]
+
+# Columnas reales de cada formato (mismos encabezados que el Excel de ejemplo)
+GENERATED_COLUMNS = {
+    FORMAT_COMPLETO: ["SKU", "OEM", "COMPATIBILIDADES", "REPUESTO"],
+    FORMAT_APLICACIONES: ["CODIGO", "DESCRIPCION", "APLICACIONES"],
+    FORMAT_NOMBRE_EMBEBIDO: ["SKU", "REPUESTO", "codigo"],
+    FORMAT_OEM_SOLO: ["OEM"],
+}
+GENERATED_FORMATS = list(GENERATED_COLUMNS)
+
+
+class _VehicleSampler:
+    def __init__(self, rng: np.random.Generator):
+        self.rng = rng
+        self.makes = list(VEHICLES)
+
+    def pick(self, values: list):
+        return values[int(self.rng.integers(0, len(values)))]
+
+    def vehicle(self) -> tuple[str, str, Optional[str], Optional[str], int, int]:
+        make = self.pick(self.makes)
+        year_from = int(self.rng.integers(1995, 2022))
+        return (
+            make,
+            self.pick(VEHICLES[make]),
+            self.pick(ENGINE_LITERS),
+            self.pick(ENGINE_CODES),
+            year_from,
+            year_from + int(self.rng.integers(0, 8)),
+        )
+
+    def part_name(self) -> str:
+        measure = self.pick(PART_MEASURES)
+        return f"{self.pick(PART_NAMES)} {measure}" if measure else self.pick(PART_NAMES)
+
+    def oem(self) -> str:
+        return f"{int(self.rng.integers(10000, 99999))}-{int(self.rng.integers(0, 99999)):05d}"
+
+
+def _join(*tokens: Optional[str]) -> str:
+    return " ".join(token for token in tokens if token)
+
+
+def _fanout_count(rng: np.random.Generator, fanout: int) -> int:
+    """Compatibilidades de una fila: entre 1 y 2*fanout-1 (promedio ~fanout)."""
+    return int(rng.integers(1, 2 * max(1, fanout)))
+
+
+def _generated_row(format_key: str, row_index: int, sampler: _VehicleSampler, fanout: int) -> list[str]:
+    rng = sampler.rng
+    vehicles = [sampler.vehicle() for _ in range(_fanout_count(rng, fanout))] if format_key != FORMAT_OEM_SOLO else []
+    if format_key == FORMAT_COMPLETO:
+        compatibilidades = ", ".join(
+            _join(make, model, liters, engine, str(year_from)) for make, model, liters, engine, year_from, _ in vehicles
+        )
+        return [str(row_index + 1), sampler.oem(), compatibilidades, sampler.part_name()]
+    if format_key == FORMAT_APLICACIONES:
+        aplicaciones = " - ".join(
+            _join(model, liters, f"{year_from}/{year_to}") for _, model, liters, _, year_from, year_to in vehicles
+        )
+        return [sampler.oem(), sampler.part_name(), aplicaciones]
+    if format_key == FORMAT_NOMBRE_EMBEBIDO:
+        vehiculos = "/".join(_join(make, model, liters) for make, model, liters, _, _, _ in vehicles)
+        return [str(row_index + 1), f"{sampler.pick(PART_NAMES)} {vehiculos} {sampler.pick(PART_MEASURES) or ''}".strip(), sampler.oem()]
+    return [sampler.oem()]
+
+
+def generated_sheet(format_key: str, rows: int, fanout: int = 3, seed: int = 0, unique_rows: int = 5_000) -> pd.DataFrame:
+    """
+    Hoja de `rows` filas con las columnas reales del formato, armada desde un vocabulario de
+    vehículos/repuestos. Cada fila trae en promedio `fanout` compatibilidades. Se generan
+    `unique_rows` filas distintas y se repiten (como en los catálogos reales, donde los
+    textos se repiten mucho); las llaves (SKU/OEM) sí son únicas por fila.
+    """
+    sampler = _VehicleSampler(np.random.default_rng(seed))
+    distinct_rows = [_generated_row(format_key, row_index, sampler, fanout) for row_index in range(min(rows, unique_rows))]
+    picks = sampler.rng.integers(0, len(distinct_rows), size=rows) if rows > len(distinct_rows) else np.arange(rows)
+    sheet = pd.DataFrame([distinct_rows[pick] for pick in picks], columns=GENERATED_COLUMNS[format_key], dtype=object)
+    key_column = GENERATED_COLUMNS[format_key][0]
+    if format_key in (FORMAT_COMPLETO, FORMAT_NOMBRE_EMBEBIDO):
+        sheet[key_column] = [str(row_index + 1) for row_index in range(rows)]
+    return sheet.astype(str)
+
+
+def stub_enrichment(oem_code: str, fanout: int = 3) -> dict:
+    """Resultado con la forma de `enrich_oem_data` (scraping), determinístico por OEM."""
+    sampler = _VehicleSampler(np.random.default_rng(zlib.crc32(oem_code.encode("utf-8"))))
+    compatibilidades = []
+    for make, model, liters, engine, year_from, year_to in (
+        sampler.vehicle() for _ in range(_fanout_count(sampler.rng, fanout))
+    ):
+        compatibilidades.append({
+            "compatibilidad_marca": make,
+            "compatibilidad_modelo": model,
+            "compatibilidad_anio_desde": year_from,
+            "compatibilidad_anio_hasta": year_to,
+            "compatibilidad_motor_litros": float(liters) if liters else None,
+            "compatibilidad_codigo_motor": engine,
+            "compatibilidad_texto": _join(make, model, liters, engine, f"{year_from}-{year_to}"),
+        })
+    return {
+        "repuesto_sku": None,
+        "repuesto_nombre": sampler.part_name(),
+        "repuesto_especificaciones_texto": sampler.pick(PART_MEASURES),
+        "compatibilidades": compatibilidades,
+        "links_fuente": [f"https://example.invalid/oem/{oem_code}"],
+        "fuente": "stub",
+    }
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional, Tuple
 
 @dataclass(frozen=True)
 class ETLConfig:
@@ -7,3 +8,72 @@ class ETLConfig:
     output_dir: Path
     output_format: str
     use_llm: bool = False
+
+    # Cache persistente de enriquecimiento OEM (None = sin cache)
+    oem_cache_path: Optional[Path] = None
+    oem_cache_ttl_hours: float = 24 * 30
+    oem_cache_negative_ttl_hours: float = 12
+    oem_cache_max_entries: int = 50_000
+
+    # Inicia Chrome en segundo plano mientras se lee el Excel (útil si hay hoja solo OEM)
+    prewarm_scraper: bool = False
+
+    # Pool de navegadores headless para la hoja solo OEM (1 = secuencial)
+    scraper_workers: int = 1
+    # Límite total de requests por segundo a cada sitio, compartido por todos los workers
+    scraper_requests_per_second: float = 0.5
+
+    # OEM por request en el fallback LLM (1 = una llamada por OEM)
+    llm_batch_size: int = 1
+
+    # Fallback LLM async: requests concurrentes (1 = desactivado) y presupuestos por minuto
+    llm_concurrency: int = 1
+    llm_requests_per_minute: float = 60
+    llm_tokens_per_minute: float = 200_000
+
+    # Procesos para las hojas CPU (0 = secuencial en el proceso principal).
+    # Con >0 la hoja solo OEM corre en paralelo en el proceso principal.
+    sheet_workers: int = 0
+
+    # Lectura en streaming por chunks de N filas (openpyxl read_only); None = libro completo con pandas
+    read_chunk_rows: Optional[int] = None
+
+    # Escritura incremental chunk a chunk (csv, parquet, json, ndjson, xlsx); dedup también entre chunks
+    stream_output: bool = False
+
+    # ETL incremental: store SQLite de fingerprints por hoja/llave (None = procesar todo siempre).
+    # Solo reprocesa filas nuevas o modificadas; no se combina con read_chunk_rows.
+    incremental_store_path: Optional[Path] = None
+
+    # Reporte por etapa (tiempos, CPU, filas, memoria) en <salida>.run_report.json + resumen [RUN] en el log.
+    # Memoria: None (solo tiempos), "tracemalloc" (preciso, más lento) o "rss" (muestreo del proceso).
+    run_report: bool = True
+    run_report_memory: Optional[str] = None
+
+    # output_format="parquet_dataset": carpeta catalog_unificado/ particionada por estas columnas
+    # (proveedor=.../formato_origen=...), zstd, filas ordenadas por row group y bloom filters
+    # opcionales, ej. ("repuesto_oem", "repuesto_sku")
+    parquet_partition_columns: Tuple[str, ...] = ("proveedor", "formato_origen")
+    parquet_sort_columns: Tuple[str, ...] = ("compatibilidad_marca", "compatibilidad_modelo", "compatibilidad_anio_desde")
+    parquet_row_group_rows: int = 100_000
+    parquet_bloom_filter_columns: Tuple[str, ...] = ()
+
+    # Índice vehículo -> repuestos (marca, modelo, años, litros, código de motor) en
+    # <salida>.compat_index.npz; se consulta con load/compatibility_index.CompatibilityIndex
+    compatibility_index: bool = True
+
+    # Hoja solo OEM: los OEM (normalizados) que ya aparecen con nombre y compatibilidad en hojas
+    # formato completo / nombre embebido se completan con esas filas sin scraping ni LLM. La hoja
+    # solo OEM pasa a procesarse al final (la salida mantiene el orden del libro). Opcional: no se
+    # combina con stream_output, read_chunk_rows ni sheet_workers>0 (memoria acotada / pool).
+    reuse_known_oems: bool = False
+
+    def __post_init__(self) -> None:
+        if self.reuse_known_oems and (
+            self.stream_output or self.read_chunk_rows is not None or self.sheet_workers > 0
+        ):
+            # diferir la hoja solo OEM retendría las salidas posteriores (memoria acotada) y la
+            # haría esperar al pool (solapamiento I/O / CPU)
+            raise ValueError(
+                "reuse_known_oems no es compatible con stream_output, read_chunk_rows ni sheet_workers>0"
+            )
@@ -34,3 +34,41 @@ OUTPUT_COLUMN_ORDER = [
     "uso_de_OPEN_AI",
     "paginas_de_informacion",
 ]
+
+# Esquema tipado del catálogo unificado. Cada salida de processor se castea a este esquema
+# antes del concat (y cada chunk antes de escribirse por partes), así pd.concat no sube
+# todo a object y los chunks comparten dtypes. Columnas no listadas quedan como texto.
+OUTPUT_CATEGORY_COLUMNS = [
+    "proveedor",
+    "formato_origen",
+    "repuesto_separador_medidas",
+    "compatibilidad_marca",
+    "compatibilidad_modelo",
+]
+OUTPUT_FLOAT_COLUMNS = [
+    "repuesto_medida_1",
+    "repuesto_medida_2",
+    "repuesto_medida_3",
+    "repuesto_medida_4",
+    "compatibilidad_motor_litros",
+]
+OUTPUT_YEAR_COLUMNS = ["compatibilidad_anio_desde", "compatibilidad_anio_hasta"]
+OUTPUT_INTEGER_COLUMNS = ["repuesto_cantidad_medidas"]
+OUTPUT_BOOLEAN_COLUMNS = ["uso_de_OPEN_AI"]
+
+
+def _output_dtype(column_name: str) -> str:
+    if column_name in OUTPUT_CATEGORY_COLUMNS:
+        return "category"
+    if column_name in OUTPUT_FLOAT_COLUMNS:
+        return "float32"
+    if column_name in OUTPUT_YEAR_COLUMNS:
+        return "Int16"
+    if column_name in OUTPUT_INTEGER_COLUMNS:
+        return "Int8"
+    if column_name in OUTPUT_BOOLEAN_COLUMNS:
+        return "bool"
+    return "str"
+
+
+OUTPUT_SCHEMA = {column_name: _output_dtype(column_name) for column_name in OUTPUT_COLUMN_ORDER}
@@ -2,22 +2,85 @@ from __future__ import annotations
 
 import json
 import textwrap
-from typing import Optional, Dict, Any, List
-
-from openai import OpenAI
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Dict, Any, List
 
 from utils.env import load_env, get_env
 from utils.logging import get_logger
+from utils.oem import normalize_oem_code
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 logger = get_logger()
 
-# Carga .env y API key
-load_env()
-api_key = get_env("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("OPENAI_API_KEY no encontrada en .env")
+_client: Optional[OpenAI] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OpenAI:
+    """
+    Cliente OpenAI creado en el primer uso (importar este módulo no carga openai ni .env).
+    Lanza RuntimeError si falta OPENAI_API_KEY.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+
+                load_env()
+                api_key = get_env("OPENAI_API_KEY")
+                if not api_key:
+                    raise RuntimeError("OPENAI_API_KEY no encontrada en .env")
+                _client = OpenAI(api_key=api_key)
+    return _client
+
+LLM_MODEL = "gpt-4.1"
+LLM_TOOLS = [{"type": "web_search_preview"}]
+
+
+@dataclass
+class LlmUsage:
+    """Tokens y tiempo acumulados por modo de llamada, para comparar single vs batch."""
+    calls: int = 0
+    oems: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+
+    def per_oem(self) -> str:
+        if not self.oems:
+            return "sin llamadas"
+        return (
+            f"llamadas={self.calls} oems={self.oems} "
+            f"tokens/OEM={(self.input_tokens + self.output_tokens) / self.oems:.0f} "
+            f"(in={self.input_tokens / self.oems:.0f}, out={self.output_tokens / self.oems:.0f}) "
+            f"s/OEM={self.seconds / self.oems:.1f}"
+        )
+
+
+LLM_USAGE: Dict[str, LlmUsage] = {"single": LlmUsage(), "batch": LlmUsage(), "async": LlmUsage()}
+_usage_lock = threading.Lock()
 
-client = OpenAI(api_key=api_key)
+
+def _record_usage(mode: str, response: Any, oem_count: int, elapsed_seconds: float) -> None:
+    usage = getattr(response, "usage", None)
+    with _usage_lock:
+        mode_usage = LLM_USAGE[mode]
+        mode_usage.calls += 1
+        mode_usage.oems += oem_count
+        mode_usage.input_tokens += int(getattr(usage, "input_tokens", 0) or 0)
+        mode_usage.output_tokens += int(getattr(usage, "output_tokens", 0) or 0)
+        mode_usage.seconds += elapsed_seconds
+
+
+def log_llm_usage() -> None:
+    for mode, mode_usage in LLM_USAGE.items():
+        if mode_usage.calls:
+            logger.info(f"[LLM] {mode}: {mode_usage.per_oem()}")
 
 
 def _extract_first_json_object(text: str) -> Optional[dict]:
@@ -88,70 +151,8 @@ def _to_float(value: Any) -> Optional[float]:
         return None
 
 
-def buscar_oem_en_internet(oem: str) -> Optional[Dict[str, Any]]:
-    """
-    Busca info del OEM usando OpenAI + web_search_preview.
-    Retorna dict con:
-      - repuesto_nombre / repuesto_especificaciones_texto
-      - compatibilidad_texto + campos desglosados (marca/modelo/años/motor)
-      - links_fuente (lista) y link_fuente (primer enlace)
-    Retorna None si no hay nada útil o si ocurre un error.
-    """
-    oem = oem.strip()
-    if not oem:
-        return None
-    prompt = textwrap.dedent(
-        """
-        Busca en internet qu? repuesto corresponde al c?digo OEM: "{oem}".
-
-        Responde SOLO con un JSON v?lido (sin texto extra) con estas claves:
-        {{
-          "repuesto_nombre": "string|null",
-          "repuesto_especificaciones_texto": "string|null",
-          "compatibilidad_texto": "string|null",   // resumen libre de compatibilidades
-          "compatibilidades": [
-            {{
-              "compatibilidad_texto": "string|null",
-              "compatibilidad_marca": "string|null",
-              "compatibilidad_modelo": "string|null",
-              "compatibilidad_anio_desde": "number|null",
-              "compatibilidad_anio_hasta": "number|null",
-              "compatibilidad_motor_litros": "number|null",
-              "compatibilidad_codigo_motor": "string|null"
-            }}
-          ],
-          "dimensiones": "number[]|null",          // usa mm si puedes; si vienen en pulgadas, aclara en especificaciones
-          "dimensiones_unidad": "string|null",     // ej. "mm" o "in"
-          "links_fuente": "string[]"   // puede ser []
-        }}
-
-        Reglas (se breve):
-        - Usa solo datos expl?citos de las fuentes. No inventes ni completes con conjeturas.
-        - Si hay varias p?ginas ?tiles, agrega varias en links_fuente.
-        - Si hay varias compatibilidades (varios modelos/motores/a?os), usa el array "compatibilidades".
-        - Si algo no est? expl?cito, usa null.
-        - No incluyas explicaciones ni texto fuera del JSON.
-        """
-    ).format(oem=oem)
-
-    try:
-        response = client.responses.create(
-            model="gpt-4.1",
-            input=prompt,
-            tools=[{"type": "web_search_preview"}],
-        )
-    except Exception as api_error:
-        logger.warning(f"OpenAI call falló para OEM {oem}: {api_error}")
-        return None
-
-    raw_output_text = (response.output_text or "").strip()
-    logger.info(f"LLM raw text for OEM '{oem}': {raw_output_text}")
-
-    parsed_data = _extract_first_json_object(raw_output_text)
-    if not parsed_data:
-        logger.warning(f"No se pudo extraer JSON válido para OEM {oem}")
-        return None
-
+def _normalize_llm_result(parsed_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Valida el JSON de un OEM y lo lleva al shape que consume el pipeline; None si no trae nada útil."""
     links = _normalize_links(parsed_data.get("links_fuente"))
     compat_text = _clean_str(parsed_data.get("compatibilidad_texto"))
 
@@ -210,3 +211,163 @@ def buscar_oem_en_internet(oem: str) -> Optional[Dict[str, Any]]:
         return None
 
     return result
+
+
+SINGLE_PROMPT = textwrap.dedent(
+    """
+    Busca en internet qu? repuesto corresponde al c?digo OEM: "{oem}".
+
+    Responde SOLO con un JSON v?lido (sin texto extra) con estas claves:
+    {{
+      "repuesto_nombre": "string|null",
+      "repuesto_especificaciones_texto": "string|null",
+      "compatibilidad_texto": "string|null",   // resumen libre de compatibilidades
+      "compatibilidades": [
+        {{
+          "compatibilidad_texto": "string|null",
+          "compatibilidad_marca": "string|null",
+          "compatibilidad_modelo": "string|null",
+          "compatibilidad_anio_desde": "number|null",
+          "compatibilidad_anio_hasta": "number|null",
+          "compatibilidad_motor_litros": "number|null",
+          "compatibilidad_codigo_motor": "string|null"
+        }}
+      ],
+      "dimensiones": "number[]|null",          // usa mm si puedes; si vienen en pulgadas, aclara en especificaciones
+      "dimensiones_unidad": "string|null",     // ej. "mm" o "in"
+      "links_fuente": "string[]"   // puede ser []
+    }}
+
+    Reglas (se breve):
+    - Usa solo datos expl?citos de las fuentes. No inventes ni completes con conjeturas.
+    - Si hay varias p?ginas ?tiles, agrega varias en links_fuente.
+    - Si hay varias compatibilidades (varios modelos/motores/a?os), usa el array "compatibilidades".
+    - Si algo no est? expl?cito, usa null.
+    - No incluyas explicaciones ni texto fuera del JSON.
+    """
+)
+
+
+def buscar_oem_en_internet(oem: str) -> Optional[Dict[str, Any]]:
+    """
+    Busca info del OEM usando OpenAI + web_search_preview.
+    Retorna dict con:
+      - repuesto_nombre / repuesto_especificaciones_texto
+      - compatibilidad_texto + campos desglosados (marca/modelo/años/motor)
+      - links_fuente (lista) y link_fuente (primer enlace)
+    Retorna None si no hay nada útil; si la llamada a OpenAI falla lanza la excepción
+    (un error no es un "no encontrado": no debe quedar en la cache negativa).
+    """
+    oem = oem.strip()
+    if not oem:
+        return None
+    prompt = SINGLE_PROMPT.format(oem=oem)
+
+    try:
+        started_at = time.perf_counter()
+        response = get_client().responses.create(
+            model=LLM_MODEL,
+            input=prompt,
+            tools=LLM_TOOLS,
+        )
+        _record_usage("single", response, 1, time.perf_counter() - started_at)
+    except Exception as api_error:
+        logger.warning(f"OpenAI call falló para OEM {oem}: {api_error}")
+        raise
+
+    return _parse_single_output(oem, response.output_text)
+
+
+def _parse_single_output(oem: str, output_text: Optional[str]) -> Optional[Dict[str, Any]]:
+    raw_output_text = (output_text or "").strip()
+    logger.info(f"LLM raw text for OEM '{oem}': {raw_output_text}")
+
+    parsed_data = _extract_first_json_object(raw_output_text)
+    if not parsed_data:
+        logger.warning(f"No se pudo extraer JSON válido para OEM {oem}")
+        return None
+
+    return _normalize_llm_result(parsed_data)
+
+
+BATCH_PROMPT = textwrap.dedent(
+    """
+    Busca en internet qué repuesto corresponde a cada uno de estos códigos OEM:
+    {oem_list}
+
+    Responde SOLO con un JSON válido (sin texto extra): un objeto cuyas llaves son los OEM
+    exactamente como aparecen arriba, y cuyo valor es un objeto con este esquema (o null si
+    no encontraste nada para ese OEM):
+    {{
+      "repuesto_nombre": "string|null",
+      "repuesto_especificaciones_texto": "string|null",
+      "compatibilidad_texto": "string|null",
+      "compatibilidades": [
+        {{
+          "compatibilidad_texto": "string|null",
+          "compatibilidad_marca": "string|null",
+          "compatibilidad_modelo": "string|null",
+          "compatibilidad_anio_desde": "number|null",
+          "compatibilidad_anio_hasta": "number|null",
+          "compatibilidad_motor_litros": "number|null",
+          "compatibilidad_codigo_motor": "string|null"
+        }}
+      ],
+      "dimensiones": "number[]|null",
+      "dimensiones_unidad": "string|null",
+      "links_fuente": "string[]"
+    }}
+
+    Reglas (se breve):
+    - Usa solo datos explícitos de las fuentes. No inventes ni completes con conjeturas.
+    - No mezcles datos entre OEM distintos.
+    - Si algo no está explícito, usa null.
+    - No incluyas explicaciones ni texto fuera del JSON.
+    """
+)
+
+
+def buscar_oems_en_internet_batch(oems: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Variante batch de buscar_oem_en_internet: una sola request para varios OEM, pidiendo
+    un JSON con un objeto por OEM. Retorna {oem: resultado|None} solo para los OEM que
+    vinieron en la respuesta con un valor válido (objeto o null); los que falten deben
+    consultarse de a uno.
+    """
+    oems = [oem.strip() for oem in oems if oem and oem.strip()]
+    if not oems:
+        return {}
+
+    prompt = BATCH_PROMPT.format(oem_list="\n".join(f"- {oem}" for oem in oems))
+
+    try:
+        started_at = time.perf_counter()
+        response = get_client().responses.create(
+            model=LLM_MODEL,
+            input=prompt,
+            tools=LLM_TOOLS,
+        )
+        _record_usage("batch", response, len(oems), time.perf_counter() - started_at)
+    except Exception as api_error:
+        logger.warning(f"OpenAI batch falló para {len(oems)} OEM: {api_error}")
+        return {}
+
+    raw_output_text = (response.output_text or "").strip()
+    parsed_data = _extract_first_json_object(raw_output_text)
+    if not isinstance(parsed_data, dict):
+        logger.warning(f"No se pudo extraer JSON válido para batch de {len(oems)} OEM")
+        return {}
+
+    # las llaves pueden venir con otro formato de guiones/espacios
+    requested_by_key = {normalize_oem_code(oem): oem for oem in oems}
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    for response_key, oem_data in parsed_data.items():
+        requested_oem = requested_by_key.get(normalize_oem_code(str(response_key)))
+        if requested_oem is None:
+            continue
+        if oem_data is None:
+            results[requested_oem] = None
+        elif isinstance(oem_data, dict):
+            results[requested_oem] = _normalize_llm_result(oem_data)
+
+    return results
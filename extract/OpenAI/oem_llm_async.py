@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from utils.env import load_env, get_env
+from utils.logging import get_logger
+from extract.OpenAI.oem_llm import (
+    LLM_MODEL,
+    LLM_TOOLS,
+    SINGLE_PROMPT,
+    _parse_single_output,
+    _record_usage,
+)
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class AsyncLlmConfig:
+    # Requests en vuelo al mismo tiempo
+    max_concurrency: int = 4
+    # Presupuestos por minuto (None = sin límite)
+    requests_per_minute: Optional[float] = 60
+    tokens_per_minute: Optional[float] = 200_000
+    # Estimación de tokens por llamada para reservar presupuesto antes de enviar
+    # (web search suele inflar el input); se corrige con el usage real de la respuesta.
+    estimated_tokens_per_call: int = 4_000
+
+    # Timeout por llamada (incluye la búsqueda web del modelo)
+    timeout_seconds: float = 90.0
+
+    # Reintentos con backoff exponencial + jitter ante 429 / 5xx / timeout / conexión
+    max_retries: int = 4
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+
+    # Endpoint alternativo (ej. un servidor stub local); None = OPENAI_BASE_URL o el de OpenAI
+    base_url: Optional[str] = None
+
+
+class AsyncMinuteBudget:
+    """
+    Token bucket asyncio con capacidad `per_minute` que se recarga de forma continua.
+    Se usa tanto para requests/min (1 por llamada) como para tokens/min (estimado por llamada).
+    `debit` permite cobrar después lo que faltó de la estimación (el saldo puede quedar negativo).
+    """
+
+    def __init__(self, per_minute: float):
+        if per_minute <= 0:
+            raise ValueError("per_minute debe ser > 0")
+        self.capacity = float(per_minute)
+        self.refill_per_second = float(per_minute) / 60.0
+        self._available = float(per_minute)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._last_refill) * self.refill_per_second)
+        self._last_refill = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Espera hasta tener `amount` disponible y lo descuenta. Retorna los segundos esperados."""
+        amount = min(float(amount), self.capacity)
+        waited_seconds = 0.0
+        # El lock mantiene el orden FIFO: nadie se salta a quien ya está esperando presupuesto
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._available >= amount:
+                    self._available -= amount
+                    return waited_seconds
+                sleep_seconds = (amount - self._available) / self.refill_per_second
+                await asyncio.sleep(sleep_seconds)
+                waited_seconds += sleep_seconds
+
+    def debit(self, amount: float) -> None:
+        self._refill()
+        self._available -= amount
+
+
+@dataclass
+class AsyncLlmStats:
+    ok: int = 0
+    empty: int = 0
+    failed: int = 0
+    retries: int = 0
+    budget_wait_seconds: float = 0.0
+
+
+def _create_client(config: AsyncLlmConfig) -> AsyncOpenAI:
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+    load_env()
+    api_key = get_env("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY no encontrada en .env")
+
+    # Un solo cliente HTTP (pool keep-alive) compartido por todas las llamadas del lote.
+    # Los reintentos los maneja este módulo (max_retries=0) para respetar los presupuestos.
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=config.base_url or get_env("OPENAI_BASE_URL"),
+        max_retries=0,
+        timeout=config.timeout_seconds,
+        http_client=DefaultAsyncHttpxClient(timeout=config.timeout_seconds),
+    )
+
+
+def _is_retryable(api_error: BaseException) -> bool:
+    from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+    if isinstance(api_error, (RateLimitError, APITimeoutError, APIConnectionError, asyncio.TimeoutError)):
+        return True
+    return isinstance(api_error, APIStatusError) and api_error.status_code >= 500
+
+
+def _retry_after_seconds(api_error: BaseException) -> Optional[float]:
+    response = getattr(api_error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(config: AsyncLlmConfig, attempt: int, api_error: BaseException) -> float:
+    retry_after = _retry_after_seconds(api_error)
+    if retry_after is not None:
+        return min(config.backoff_max, retry_after)
+    exponential = min(config.backoff_max, config.backoff_base * (2 ** attempt))
+    return random.uniform(exponential / 2, exponential)
+
+
+class AsyncOemLlmClient:
+    """
+    Enriquecimiento LLM concurrente: hasta `max_concurrency` requests en vuelo, acotadas
+    por presupuestos de requests/min y tokens/min, con timeout por llamada y backoff
+    ante 429/5xx. Un OEM que falla queda fuera del resultado sin frenar al resto del lote.
+    """
+
+    def __init__(self, config: AsyncLlmConfig, client: Optional[AsyncOpenAI] = None):
+        self.config = config
+        self.client = client
+        self.stats = AsyncLlmStats()
+        self._semaphore = asyncio.Semaphore(max(1, config.max_concurrency))
+        self._request_budget = AsyncMinuteBudget(config.requests_per_minute) if config.requests_per_minute else None
+        self._token_budget = AsyncMinuteBudget(config.tokens_per_minute) if config.tokens_per_minute else None
+
+    async def _reserve_budget(self) -> None:
+        # `stats.x += await ...` leería el total antes del await y pisaría lo que sumaron
+        # las otras corrutinas mientras esta esperaba: se suma después de esperar
+        if self._request_budget is not None:
+            waited_seconds = await self._request_budget.acquire(1)
+            self.stats.budget_wait_seconds += waited_seconds
+        if self._token_budget is not None:
+            waited_seconds = await self._token_budget.acquire(self.config.estimated_tokens_per_call)
+            self.stats.budget_wait_seconds += waited_seconds
+
+    def _settle_tokens(self, response: Any) -> None:
+        if self._token_budget is None:
+            return
+        usage = getattr(response, "usage", None)
+        used_tokens = int(getattr(usage, "input_tokens", 0) or 0) + int(getattr(usage, "output_tokens", 0) or 0)
+        if used_tokens > self.config.estimated_tokens_per_call:
+            self._token_budget.debit(used_tokens - self.config.estimated_tokens_per_call)
+
+    async def _create_response(self, prompt: str) -> Any:
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.config.max_retries + 1):
+            await self._reserve_budget()
+            try:
+                return await asyncio.wait_for(
+                    self.client.responses.create(model=LLM_MODEL, input=prompt, tools=LLM_TOOLS),
+                    timeout=self.config.timeout_seconds,
+                )
+            except Exception as api_error:
+                if not _is_retryable(api_error) or attempt == self.config.max_retries:
+                    raise
+                last_error = api_error
+                self.stats.retries += 1
+                backoff_seconds = _backoff_seconds(self.config, attempt, api_error)
+                logger.info(
+                    f"[LLM-ASYNC] reintento {attempt + 1}/{self.config.max_retries} en "
+                    f"{backoff_seconds:.1f}s: {type(api_error).__name__}"
+                )
+                await asyncio.sleep(backoff_seconds)
+        raise last_error  # type: ignore[misc]
+
+    async def lookup(self, oem: str) -> Optional[Dict[str, Any]]:
+        """Resultado normalizado, o None si el modelo no encontró nada útil. Propaga errores de API."""
+        oem = oem.strip()
+        if not oem:
+            return None
+        async with self._semaphore:
+            started_at = time.perf_counter()
+            response = await self._create_response(SINGLE_PROMPT.format(oem=oem))
+            _record_usage("async", response, 1, time.perf_counter() - started_at)
+            self._settle_tokens(response)
+
+        result = _parse_single_output(oem, response.output_text)
+        if result is None:
+            self.stats.empty += 1
+        else:
+            self.stats.ok += 1
+        return result
+
+    async def lookup_many(self, oems: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        unique_oems = list(dict.fromkeys(oem for oem in oems if oem and oem.strip()))
+        owns_client = self.client is None
+        if owns_client:
+            self.client = _create_client(self.config)
+        try:
+            outcomes = await asyncio.gather(*(self.lookup(oem) for oem in unique_oems), return_exceptions=True)
+        finally:
+            if owns_client:
+                await self.client.close()
+                self.client = None
+
+        # Los OEM que fallaron no van en el resultado: así no se cachean como negativos
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for oem, outcome in zip(unique_oems, outcomes):
+            if isinstance(outcome, BaseException):
+                self.stats.failed += 1
+                logger.warning(f"OpenAI async falló para OEM {oem}: {type(outcome).__name__}: {outcome}")
+                continue
+            results[oem] = outcome
+        return results
+
+    def log_stats(self) -> None:
+        logger.info(
+            f"[LLM-ASYNC] ok={self.stats.ok} sin_datos={self.stats.empty} fallidos={self.stats.failed} "
+            f"reintentos={self.stats.retries} espera_presupuesto={self.stats.budget_wait_seconds:.1f}s"
+        )
+
+
+def buscar_oems_en_internet_async(
+    oems: List[str], config: Optional[AsyncLlmConfig] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Punto de entrada síncrono: consulta todos los OEM de forma concurrente y retorna
+    {oem: resultado|None}; los OEM cuya llamada falló no vienen en el dict. Debe llamarse desde código sin event loop corriendo.
+    """
+    llm_client = AsyncOemLlmClient(config or AsyncLlmConfig())
+    started_at = time.perf_counter()
+    results = asyncio.run(llm_client.lookup_many(oems))
+    llm_client.log_stats()
+    logger.info(f"[LLM-ASYNC] {len(results)} OEM en {time.perf_counter() - started_at:.1f}s")
+    return results
@@ -1,8 +1,19 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence
 import pandas as pd
 
+# Filas por chunk por defecto al leer en streaming
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Textos que pd.read_excel toma como nulos por defecto (pandas STR_NA_VALUES)
+NA_TEXT_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
 @dataclass(frozen=True)
 class SheetData:
     sheet_name: str
@@ -12,7 +23,100 @@ def read_all_sheets(path: Path) -> list[SheetData]:
     sheets = pd.read_excel(path, sheet_name=None, dtype=str)  # todo como str para no perder info
     sheet_data_list: list[SheetData] = []
     for sheet_name, data_frame in sheets.items():
-        data_frame = data_frame.copy()
         data_frame.columns = [str(column_name).strip() for column_name in data_frame.columns]
         sheet_data_list.append(SheetData(sheet_name=sheet_name, data_frame=data_frame))
     return sheet_data_list
+
+def _normalize_headers(header_row: Sequence[Any]) -> list[str]:
+    """Encabezados como los deja read_excel + strip: vacíos -> 'Unnamed: i', repetidos -> 'X.1'."""
+    raw_names = [
+        str(cell_value) if cell_value is not None else f"Unnamed: {column_index}"
+        for column_index, cell_value in enumerate(header_row)
+    ]
+    seen: set[str] = set()
+    unique_names: list[str] = []
+    for name in raw_names:
+        candidate, suffix = name, 0
+        while candidate in seen:
+            suffix += 1
+            candidate = f"{name}.{suffix}"
+        seen.add(candidate)
+        unique_names.append(candidate)
+    return [name.strip() for name in unique_names]
+
+def _cell_text(cell_value: Any) -> Optional[str]:
+    """Valor de celda como texto, con las mismas reglas que read_excel(dtype=str)."""
+    if cell_value is None:
+        return None
+    if isinstance(cell_value, float) and cell_value.is_integer():
+        return str(int(cell_value))
+    if isinstance(cell_value, datetime):
+        return str(pd.Timestamp(cell_value))
+    text = str(cell_value)
+    return None if text in NA_TEXT_VALUES else text
+
+def _chunk_frame(rows: list[list[Optional[str]]], columns: list[str], start_row: int) -> pd.DataFrame:
+    data_frame = pd.DataFrame(rows, columns=columns, dtype=object)
+    data_frame.index = pd.RangeIndex(start_row, start_row + len(rows))
+    return data_frame.astype(str)
+
+def iter_sheet_chunks(path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[SheetData]:
+    """
+    Lee el libro en streaming (openpyxl read_only) y entrega chunks de hasta `chunk_rows`
+    filas como SheetData. Los chunks de una hoja salen seguidos y con el index continuo;
+    cada hoja entrega al menos un chunk (vacío si no tiene datos). Concatenar los chunks
+    de una hoja da lo mismo que read_all_sheets.
+    """
+    from openpyxl import load_workbook
+
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows debe ser > 0")
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            row_iterator = worksheet.iter_rows(values_only=True)
+            columns = _normalize_headers(next(row_iterator, ()))
+            column_count = len(columns)
+
+            rows: list[list[Optional[str]]] = []
+            # filas vacías pendientes: read_excel descarta las del final de la hoja
+            blank_rows = 0
+            start_row = 0
+            chunks_emitted = 0
+            for row_values in row_iterator:
+                row = [_cell_text(cell_value) for cell_value in row_values[:column_count]]
+                if all(cell_text is None for cell_text in row):
+                    blank_rows += 1
+                    continue
+                rows.extend([[None] * column_count] * blank_rows)
+                blank_rows = 0
+                row.extend([None] * (column_count - len(row)))
+                rows.append(row)
+                if len(rows) >= chunk_rows:
+                    yield SheetData(worksheet.title, _chunk_frame(rows[:chunk_rows], columns, start_row))
+                    start_row += chunk_rows
+                    chunks_emitted += 1
+                    rows = rows[chunk_rows:]
+
+            if rows or not chunks_emitted:
+                yield SheetData(worksheet.title, _chunk_frame(rows, columns, start_row))
+    finally:
+        workbook.close()
+
+def read_sheet_headers(path: Path) -> dict[str, list[str]]:
+    """
+    Solo la fila de encabezados de cada hoja (openpyxl read_only, sin cargar los datos).
+    Sirve para decidir antes de leer el libro si alguna hoja va a necesitar scraping.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        sheet_headers: dict[str, list[str]] = {}
+        for worksheet in workbook.worksheets:
+            header_row = next(worksheet.iter_rows(max_row=1, values_only=True), ())
+            sheet_headers[worksheet.title] = _normalize_headers(header_row)
+        return sheet_headers
+    finally:
+        workbook.close()
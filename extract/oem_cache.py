@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from utils.logging import get_logger
+from utils.oem import normalize_oem_code
+
+logger = get_logger()
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS oem_enrichment (
+    oem_key TEXT NOT NULL,
+    source TEXT NOT NULL,
+    payload TEXT,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (oem_key, source)
+)
+"""
+
+
+@dataclass(frozen=True)
+class OemCacheConfig:
+    path: Path
+    # TTL de resultados positivos (dict de enriquecimiento)
+    ttl_hours: float = 24 * 30
+    # TTL de resultados negativos (None / modal de vehículo): más corto para reintentar antes
+    negative_ttl_hours: float = 12
+    # Máximo de entradas; al superarlo se expulsan las de acceso más antiguo
+    max_entries: int = 50_000
+    # Los hits no escriben al momento: el último acceso se guarda de a lotes de este tamaño
+    # (y en cada put / close), en una sola transacción
+    access_flush_batch: int = 256
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    value: Optional[Dict[str, Any]]  # None = resultado negativo cacheado
+    source: str
+    created_at: float
+
+
+class OemEnrichmentCache:
+    """
+    Cache persistente (SQLite) de enriquecimiento OEM, con llave (OEM normalizado, fuente).
+    Guarda también resultados negativos para no repetir scraping/LLM de OEM sin datos.
+    """
+
+    def __init__(self, config: OemCacheConfig):
+        self.config = config
+        self.config.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.config.path), check_same_thread=False)
+        self._connection.execute(SCHEMA_SQL)
+        self._connection.commit()
+        self._lock = threading.Lock()
+        # Conteo de filas en memoria (un COUNT(*) al abrir); lo ajustan insert, expiración y expulsión
+        (self._entry_count,) = self._connection.execute("SELECT COUNT(*) FROM oem_enrichment").fetchone()
+        # Último acceso pendiente de escribir por (oem_key, source)
+        self._pending_access: Dict[Tuple[str, str], float] = {}
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.evictions = 0
+
+    # ---------- Lectura / escritura ----------
+    def get(self, oem_code: str, source: str) -> Optional[CacheEntry]:
+        oem_key = normalize_oem_code(oem_code)
+        if not oem_key:
+            return None
+
+        now = time.time()
+        with self._lock:
+            cached_row = self._connection.execute(
+                "SELECT payload, created_at FROM oem_enrichment WHERE oem_key = ? AND source = ?",
+                (oem_key, source),
+            ).fetchone()
+
+            if cached_row is None:
+                self.misses += 1
+                return None
+
+            payload, created_at = cached_row
+            ttl_hours = self.config.ttl_hours if payload is not None else self.config.negative_ttl_hours
+            if now - created_at > ttl_hours * 3600:
+                deleted = self._connection.execute(
+                    "DELETE FROM oem_enrichment WHERE oem_key = ? AND source = ?",
+                    (oem_key, source),
+                ).rowcount
+                self._pending_access.pop((oem_key, source), None)
+                self._connection.commit()
+                self._entry_count -= deleted
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._pending_access[(oem_key, source)] = now
+            if len(self._pending_access) >= self.config.access_flush_batch:
+                self._flush_access()
+                self._connection.commit()
+
+            if payload is None:
+                self.negative_hits += 1
+                return CacheEntry(value=None, source=source, created_at=created_at)
+
+            self.hits += 1
+            return CacheEntry(value=json.loads(payload), source=source, created_at=created_at)
+
+    def put(self, oem_code: str, source: str, value: Optional[Dict[str, Any]]) -> None:
+        oem_key = normalize_oem_code(oem_code)
+        if not oem_key:
+            return
+
+        payload = json.dumps(value, ensure_ascii=False, default=str) if value is not None else None
+        now = time.time()
+        with self._lock:
+            self._pending_access.pop((oem_key, source), None)
+            updated = self._connection.execute(
+                "UPDATE oem_enrichment SET payload = ?, created_at = ?, last_access = ? "
+                "WHERE oem_key = ? AND source = ?",
+                (payload, now, now, oem_key, source),
+            ).rowcount
+            if not updated:
+                self._connection.execute(
+                    "INSERT INTO oem_enrichment (oem_key, source, payload, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (oem_key, source, payload, now, now),
+                )
+                self._entry_count += 1
+            self.writes += 1
+            # los accesos pendientes van antes de expulsar: la expulsión ordena por last_access
+            self._flush_access()
+            self._evict_if_needed()
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_access()
+            self._connection.commit()
+            self._connection.close()
+
+    # ---------- Estadísticas ----------
+    def log_stats(self) -> None:
+        lookups = self.hits + self.negative_hits + self.misses
+        hit_rate = (self.hits + self.negative_hits) / lookups if lookups else 0.0
+        logger.info(
+            f"[CACHE] OEM hits={self.hits} hits_negativos={self.negative_hits} "
+            f"misses={self.misses} (expirados={self.expired}) hit_rate={hit_rate:.1%} "
+            f"escrituras={self.writes} expulsados={self.evictions}"
+        )
+
+    # ---------- Internals ----------
+    def _flush_access(self) -> None:
+        """Escribe los últimos accesos pendientes (sin commit: lo hace el llamador)."""
+        if not self._pending_access:
+            return
+        self._connection.executemany(
+            "UPDATE oem_enrichment SET last_access = ? WHERE oem_key = ? AND source = ?",
+            [(last_access, oem_key, source) for (oem_key, source), last_access in self._pending_access.items()],
+        )
+        self._pending_access.clear()
+
+    def _evict_if_needed(self) -> None:
+        overflow = self._entry_count - self.config.max_entries
+        if overflow <= 0:
+            return
+        evicted = self._connection.execute(
+            "DELETE FROM oem_enrichment WHERE rowid IN ("
+            "SELECT rowid FROM oem_enrichment ORDER BY last_access ASC LIMIT ?)",
+            (overflow,),
+        ).rowcount
+        self._entry_count -= evicted
+        self.evictions += evicted
@@ -1,15 +1,70 @@
 from __future__ import annotations
 
-from typing import Optional, Dict, Any, List
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Iterator, Optional, Dict, Any, List
 
 from utils.logging import get_logger
 
-from extract.scrapping.sites.toyota_parts_deal import scrape_oem_data_in_toyota_parts_deal
-from extract.OpenAI.oem_llm import buscar_oem_en_internet
+from extract.oem_cache import OemEnrichmentCache
+from extract.scrapping.registry import ScraperRegistry, ScraperSite, is_complete_result
+
+# oem_llm y oem_llm_async cargan openai recién en la primera llamada
+from extract.OpenAI.oem_llm import buscar_oem_en_internet, buscar_oems_en_internet_batch, get_client, log_llm_usage
+from extract.OpenAI.oem_llm_async import AsyncLlmConfig, buscar_oems_en_internet_async
+
+if TYPE_CHECKING:
+    from extract.scrapping.session import ScraperSession
 
 
 logger = get_logger()
 
+SOURCE_TOYOTA_PARTS_DEAL = "toyotapartsdeal"
+SOURCE_OPENAI = "openai"
+
+
+@dataclass
+class EnrichmentTiming:
+    """Tiempo acumulado por tipo de fuente; con workers las llamadas se solapan y la suma supera al reloj."""
+    calls: int = 0
+    oems: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+
+
+ENRICHMENT_TIMINGS: Dict[str, EnrichmentTiming] = {
+    "cache": EnrichmentTiming(),
+    "scrape": EnrichmentTiming(),
+    "llm": EnrichmentTiming(),
+}
+_timings_lock = threading.Lock()
+
+
+@contextmanager
+def _timed(kind: str, oem_count: int = 1) -> Iterator[None]:
+    started_at, cpu_started_at = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        with _timings_lock:
+            timing = ENRICHMENT_TIMINGS[kind]
+            timing.calls += 1
+            timing.oems += oem_count
+            timing.wall_seconds += time.perf_counter() - started_at
+            timing.cpu_seconds += time.thread_time() - cpu_started_at
+
+
+def reset_enrichment_timings() -> None:
+    with _timings_lock:
+        for kind in ENRICHMENT_TIMINGS:
+            ENRICHMENT_TIMINGS[kind] = EnrichmentTiming()
+
+
+def _source_kind(source: str) -> str:
+    return "llm" if source == SOURCE_OPENAI else "scrape"
+
 
 def _clean_str(val: Any) -> Optional[str]:
     if not isinstance(val, str):
@@ -18,17 +73,18 @@ def _clean_str(val: Any) -> Optional[str]:
     return s or None
 
 
-def _scrape_with_toyota_parts_deal(oem_code: str) -> Optional[Dict[str, Any]]:
+def _scrape_with_toyota_parts_deal(
+    oem_code: str, session: Optional[ScraperSession] = None
+) -> Optional[Dict[str, Any]]:
     """
     Ejecuta scraping en ToyotaPartsDeal y adapta la salida al formato
-    que consume el pipeline (mismo shape que el LLM).
+    que consume el pipeline (mismo shape que el LLM). None = el sitio no tiene el OEM;
+    los errores (navegador caído, timeout) se propagan.
     """
+    # selenium / requests / lxml se importan solo si hay OEM que scrapear
+    from extract.scrapping.sites.toyota_parts_deal import scrape_oem_data_in_toyota_parts_deal
 
-    try:
-        scraped_rows: Optional[List[Dict[str, Any]]] = scrape_oem_data_in_toyota_parts_deal(oem_code)
-    except Exception as scrape_error:
-        logger.warning(f"[SCRAPING] Error ejecutando scraper ToyotaPartsDeal para OEM {oem_code}: {scrape_error}")
-        return None
+    scraped_rows: Optional[List[Dict[str, Any]]] = scrape_oem_data_in_toyota_parts_deal(oem_code, session=session)
 
     if not scraped_rows:
         return None
@@ -85,40 +141,218 @@ def _scrape_with_toyota_parts_deal(oem_code: str) -> Optional[Dict[str, Any]]:
         "dimensiones_unidad": dim_unidad,
         "links_fuente": links,
         "link_fuente": link,
-        "fuente": "toyotapartsdeal",
+        "fuente": SOURCE_TOYOTA_PARTS_DEAL,
     }
 
 
+# Sitios de scraping: para sumar uno basta registrar su ScraperSite con las marcas que cubre.
+# Se consultan en paralelo y el orden declarado se reajusta solo según éxito y latencia.
+SCRAPER_REGISTRY = ScraperRegistry()
+SCRAPER_REGISTRY.register(
+    ScraperSite(
+        name=SOURCE_TOYOTA_PARTS_DEAL,
+        scrape=_scrape_with_toyota_parts_deal,
+        makes=("TOYOTA", "LEXUS", "SCION"),
+        priority=10,
+        uses_session=True,
+    )
+)
+
+
+def log_scraper_site_stats() -> None:
+    SCRAPER_REGISTRY.log_stats()
+
+
 def query_oem_with_llm(oem_code: str) -> Optional[Dict[str, Any]]:
     """
     Consulta a LLM/OpenAI para enriquecer datos de un OEM.
-    Retorna None si no hay resultado usable o si ocurre un error.
+    Retorna None si no hay resultado usable; si la llamada falla lanza la excepción.
     """
+    logger.info(f"Consultando LLM para OEM '{oem_code}'...")
+    result = buscar_oem_en_internet(oem_code)
+    logger.info(f"Resultado LLM para OEM '{oem_code}': {result}")
+    if not result or not isinstance(result, dict):
+        return None
+    return result
+
+
+def _split_cached(
+    oem_codes: List[str], source: str, cache: Optional[OemEnrichmentCache]
+) -> tuple[Dict[str, Optional[Dict[str, Any]]], List[str]]:
+    """(resultados cacheados, OEM pendientes) sin repetir OEM."""
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    pending_oems: List[str] = []
+    unique_oems = list(dict.fromkeys(oem_codes))
+    if cache is None:
+        return results, unique_oems
+    with _timed("cache", len(unique_oems)):
+        for oem_code in unique_oems:
+            cached_entry = cache.get(oem_code, source)
+            if cached_entry is not None:
+                results[oem_code] = cached_entry.value
+            else:
+                pending_oems.append(oem_code)
+    return results, pending_oems
+
+
+def query_oems_with_llm_batch(
+    oem_codes: List[str], batch_size: int, cache: Optional[OemEnrichmentCache] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Consulta al LLM varios OEM por request (`batch_size` por llamada), respetando la cache.
+    Los OEM que no vuelvan en la respuesta del batch se consultan de a uno.
+    """
+    results, pending_oems = _split_cached(oem_codes, SOURCE_OPENAI, cache)
+
+    for batch_start in range(0, len(pending_oems), max(1, batch_size)):
+        batch_oems = pending_oems[batch_start:batch_start + max(1, batch_size)]
+        logger.info(f"Consultando LLM en batch para {len(batch_oems)} OEM: {batch_oems}")
+        with _timed("llm", len(batch_oems)):
+            batch_results = buscar_oems_en_internet_batch(batch_oems)
+
+        for oem_code in batch_oems:
+            if oem_code in batch_results:
+                oem_result = batch_results[oem_code]
+            else:
+                logger.info(f"OEM '{oem_code}' no vino en la respuesta batch; se consulta individual")
+                try:
+                    with _timed("llm"):
+                        oem_result = query_oem_with_llm(oem_code)
+                except Exception as llm_error:
+                    # falló la llamada: no se guarda como negativo en la cache
+                    logger.warning(f"LLM falló para OEM {oem_code}: {llm_error}")
+                    results[oem_code] = None
+                    continue
+            results[oem_code] = oem_result
+            if cache is not None:
+                with _timed("cache"):
+                    cache.put(oem_code, SOURCE_OPENAI, oem_result)
+
+    return results
+
+
+def query_oems_with_llm_async(
+    oem_codes: List[str], config: AsyncLlmConfig, cache: Optional[OemEnrichmentCache] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Consulta al LLM todos los OEM pendientes en paralelo (asyncio, concurrencia acotada),
+    respetando la cache. Un OEM que falla queda en None sin afectar al resto.
+    """
+    results, pending_oems = _split_cached(oem_codes, SOURCE_OPENAI, cache)
+
+    if not pending_oems:
+        return results
+
+    logger.info(
+        f"Consultando LLM async para {len(pending_oems)} OEM "
+        f"(concurrencia={config.max_concurrency})"
+    )
+    with _timed("llm", len(pending_oems)):
+        async_results = buscar_oems_en_internet_async(pending_oems, config)
+    for oem_code in pending_oems:
+        if oem_code.strip() not in async_results:
+            # falló la llamada: no se guarda como negativo en la cache
+            results[oem_code] = None
+            continue
+        oem_result = async_results[oem_code.strip()]
+        results[oem_code] = oem_result
+        if cache is not None:
+            with _timed("cache"):
+                cache.put(oem_code, SOURCE_OPENAI, oem_result)
+
+    return results
+
+
+def _lookup_with_cache(
+    oem_code: str,
+    source: str,
+    lookup: Callable[[str], Optional[Dict[str, Any]]],
+    cache: Optional[OemEnrichmentCache],
+) -> Optional[Dict[str, Any]]:
+    """
+    Consulta la cache antes de ejecutar la búsqueda externa. Un hit (positivo o negativo)
+    evita la llamada; un miss ejecuta la búsqueda y guarda su resultado, aunque sea None
+    (no encontrado). Si la búsqueda lanza un error no se guarda nada y se retorna None.
+    """
+    if cache is not None:
+        with _timed("cache"):
+            cached_entry = cache.get(oem_code, source)
+        if cached_entry is not None:
+            return cached_entry.value
 
     try:
-        logger.info(f"Consultando LLM para OEM '{oem_code}'...")
-        result = buscar_oem_en_internet(oem_code)
-        logger.info(f"Resultado LLM para OEM '{oem_code}': {result}")
-        if not result or not isinstance(result, dict):
-            return None
-        return result
-    except Exception as llm_error:
-        logger.warning(f"LLM falló para OEM {oem_code}: {llm_error}")
+        with _timed(_source_kind(source)):
+            result = lookup(oem_code)
+    except Exception as lookup_error:
+        logger.warning(f"{source} falló para OEM {oem_code}: {lookup_error}")
         return None
+    if cache is not None:
+        with _timed("cache"):
+            cache.put(oem_code, source, result)
+    return result
+
+
+def _scrape_sites(
+    oem_code: str,
+    sites: List[ScraperSite],
+    registry: ScraperRegistry,
+    cache: Optional[OemEnrichmentCache],
+    session: Optional[ScraperSession],
+) -> Optional[Dict[str, Any]]:
+    """
+    La cache de cada sitio se revisa antes de lanzar búsquedas: un resultado completo
+    cacheado evita todo el scraping y un hit parcial o negativo saca al sitio de la ronda.
+    Solo se cachea lo que el sitio devolvió; si lanza un error no queda nada en la cache.
+    """
+    cached_partial: Optional[Dict[str, Any]] = None
+    live_sites: List[ScraperSite] = []
+    for site in sites:
+        if cache is not None:
+            with _timed("cache"):
+                cached_entry = cache.get(oem_code, site.name)
+            if cached_entry is not None:
+                if is_complete_result(cached_entry.value):
+                    return cached_entry.value
+                cached_partial = cached_partial or cached_entry.value
+                continue
+        live_sites.append(site)
+
+    def scrape_and_cache(
+        site: ScraperSite, code: str, site_session: Optional[ScraperSession]
+    ) -> Optional[Dict[str, Any]]:
+        with _timed("scrape"):
+            result = site.scrape(code, site_session)
+        if cache is not None:
+            with _timed("cache"):
+                cache.put(code, site.name, result)
+        return result
+
+    return registry.first_complete(oem_code, live_sites, session, scrape_and_cache) or cached_partial
 
 
-def enrich_oem_data(oem_code: str, use_llm: bool) -> Optional[Dict[str, Any]]:
+def enrich_oem_data(
+    oem_code: str,
+    use_llm: bool,
+    cache: Optional[OemEnrichmentCache] = None,
+    session: Optional[ScraperSession] = None,
+    make: Optional[str] = None,
+    registry: Optional[ScraperRegistry] = None,
+) -> Optional[Dict[str, Any]]:
     """
     Intenta enriquecer:
-    1) scraping (ToyotaPartsDeal)
+    1) scraping: los sitios del registro (`SCRAPER_REGISTRY` por defecto) que cubren `make`
+       (todos si no se conoce la marca), en paralelo; gana el primer resultado completo
     2) LLM (si use_llm=True)
+    Si se entrega `cache`, cada fuente se consulta primero en la cache persistente.
+    Si se entrega `session`, los sitios con navegador (ToyotaPartsDeal) la reutilizan.
     """
-    scraping_result = _scrape_with_toyota_parts_deal(oem_code)
+    registry = registry or SCRAPER_REGISTRY
+    scraping_result = _scrape_sites(oem_code, registry.ranked_sites(make), registry, cache, session)
     if scraping_result:
         return scraping_result
 
     if use_llm:
-        llm_result = query_oem_with_llm(oem_code)
+        llm_result = _lookup_with_cache(oem_code, SOURCE_OPENAI, query_oem_with_llm, cache)
         if llm_result:
             return llm_result
 
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """
+    Token bucket por host, compartido entre threads/workers.
+    Acota la carga total sobre cada sitio sin importar cuántos navegadores estén abiertos:
+    como máximo `requests_per_second` sostenido, con ráfagas de hasta `burst` requests.
+    """
+
+    def __init__(self, requests_per_second: float, burst: int = 1):
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second debe ser > 0")
+        self.requests_per_second = requests_per_second
+        self.burst = max(1, burst)
+        self._tokens: Dict[str, float] = {}
+        self._last_refill: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url_or_host: str) -> float:
+        """Bloquea hasta tener un token para el host. Retorna los segundos esperados."""
+        host = _host_of(url_or_host)
+        waited_seconds = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens = self._tokens.get(host, float(self.burst))
+                last_refill = self._last_refill.get(host, now)
+                tokens = min(float(self.burst), tokens + (now - last_refill) * self.requests_per_second)
+                self._last_refill[host] = now
+
+                if tokens >= 1.0:
+                    self._tokens[host] = tokens - 1.0
+                    return waited_seconds
+
+                self._tokens[host] = tokens
+                sleep_seconds = (1.0 - tokens) / self.requests_per_second
+
+            time.sleep(sleep_seconds)
+            waited_seconds += sleep_seconds
+
+
+def _host_of(url_or_host: str) -> str:
+    parsed_host = urlparse(url_or_host).netloc if "://" in url_or_host else url_or_host
+    return parsed_host.lower().removeprefix("www.")
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from extract.scrapping.session import ScraperSession
+
+logger = get_logger()
+
+# Peso de la última búsqueda en la latencia promedio (EWMA)
+LATENCY_SMOOTHING = 0.2
+# Piso de latencia al puntuar: un sitio que falla al instante no gana por ser rápido
+MIN_SCORE_SECONDS = 0.05
+
+EnrichmentResult = Dict[str, Any]
+
+
+def is_complete_result(result: Optional[EnrichmentResult]) -> bool:
+    """Resultado completo: trae nombre del repuesto y al menos una compatibilidad."""
+    return bool(result) and bool(result.get("repuesto_nombre")) and bool(result.get("compatibilidades"))
+
+
+@dataclass(frozen=True)
+class ScraperSite:
+    """
+    Sitio de scraping registrable. `scrape(oem_code, session)` devuelve el resultado con la
+    forma del pipeline (la misma del LLM), None si el sitio no tiene el OEM, o lanza una
+    excepción si la búsqueda falla (así cuenta como error y no como "no encontrado").
+    `name` es también la fuente en la cache.
+    - makes: marcas que cubre el sitio (vacío = todas); solo filtra si se conoce la marca.
+    - priority: orden declarado (menor = antes) hasta que el sitio junta estadísticas.
+    - uses_session: recibe la ScraperSession (navegador) del llamador; su uso se serializa.
+    """
+    name: str
+    scrape: Callable[[str, Optional["ScraperSession"]], Optional[EnrichmentResult]]
+    makes: Tuple[str, ...] = ()
+    priority: int = 100
+    uses_session: bool = False
+
+    def covers(self, make: Optional[str]) -> bool:
+        return make is None or not self.makes or make.strip().upper() in self.makes
+
+
+@dataclass
+class SiteStats:
+    site_name: str
+    lookups: int = 0
+    complete: int = 0
+    partial: int = 0
+    errors: int = 0
+    wins: int = 0
+    # no alcanzaron a empezar porque otro sitio ya había ganado
+    skipped: int = 0
+    total_seconds: float = 0.0
+    latency_ewma: Optional[float] = None
+
+    @property
+    def success_rate(self) -> float:
+        return self.complete / self.lookups if self.lookups else 0.0
+
+    @property
+    def score(self) -> float:
+        """Resultados completos esperados por segundo (tasa suavizada / latencia promedio)."""
+        smoothed_rate = (self.complete + 1) / (self.lookups + 2)
+        return smoothed_rate / max(self.latency_ewma or 1.0, MIN_SCORE_SECONDS)
+
+    def record(self, result: Optional[EnrichmentResult], seconds: float, failed: bool) -> None:
+        self.lookups += 1
+        self.total_seconds += seconds
+        if failed:
+            # un error baja la tasa de éxito, pero su latencia (ej. un crash al instante)
+            # no representa al sitio: no entra al promedio que usa el ranking
+            self.errors += 1
+            return
+        self.latency_ewma = seconds if self.latency_ewma is None else (
+            LATENCY_SMOOTHING * seconds + (1 - LATENCY_SMOOTHING) * self.latency_ewma
+        )
+        if is_complete_result(result):
+            self.complete += 1
+        elif result:
+            self.partial += 1
+
+
+class ScraperRegistry:
+    """
+    Sitios de scraping para enriquecer OEM. `first_complete` consulta los sitios elegibles
+    en paralelo (hasta `max_concurrent_sites` a la vez, el resto en cola por ranking) y
+    se queda con el primer resultado completo: los que seguían en cola se cancelan y los
+    que ya corrían terminan en su thread, pero su resultado se descarta (sí cuenta en sus
+    estadísticas y la cache). Sin resultado completo gana el parcial mejor rankeado.
+    El ranking usa la prioridad declarada hasta `warmup_lookups` búsquedas por sitio y
+    después el puntaje de `SiteStats` (tasa de éxito / latencia).
+    """
+
+    def __init__(self, max_concurrent_sites: int = 3, warmup_lookups: int = 5):
+        self.max_concurrent_sites = max(1, max_concurrent_sites)
+        self.warmup_lookups = warmup_lookups
+        self._sites: Dict[str, ScraperSite] = {}
+        self._stats: Dict[str, SiteStats] = {}
+        self._lock = threading.Lock()
+        self._last_order: Tuple[str, ...] = ()
+
+    def register(self, site: ScraperSite) -> None:
+        with self._lock:
+            self._sites[site.name] = site
+            self._stats.setdefault(site.name, SiteStats(site.name))
+            self._last_order = ()
+
+    def unregister(self, site_name: str) -> None:
+        with self._lock:
+            self._sites.pop(site_name, None)
+            self._last_order = ()
+
+    def stats(self, site_name: str) -> SiteStats:
+        return self._stats[site_name]
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {site_name: SiteStats(site_name) for site_name in self._sites}
+            self._last_order = ()
+
+    def ranked_sites(self, make: Optional[str] = None) -> List[ScraperSite]:
+        """Sitios que cubren `make` (None = cualquiera), mejor rankeado primero."""
+        with self._lock:
+            ranked = sorted(self._sites.values(), key=self._rank_key)
+            order = tuple(site.name for site in ranked)
+            if self._last_order and order != self._last_order:
+                logger.info(f"[SITES] Nuevo orden de sitios: {' > '.join(order)}")
+            self._last_order = order
+        return [site for site in ranked if site.covers(make)]
+
+    def _rank_key(self, site: ScraperSite) -> tuple:
+        stats = self._stats[site.name]
+        # los sitios sin suficientes búsquedas van primero (por prioridad) para medirlos
+        if stats.lookups < self.warmup_lookups:
+            return (0, site.priority, 0.0)
+        return (1, -stats.score, site.priority)
+
+    def _run_site(
+        self, site: ScraperSite, oem_code: str, session: Optional[ScraperSession], scrape: Callable[..., Any]
+    ) -> Optional[EnrichmentResult]:
+        started_at = time.perf_counter()
+        result, failed = None, False
+        try:
+            if site.uses_session and session is not None:
+                # una ScraperSession no es thread-safe: una búsqueda que perdió puede seguir usándola
+                with session.lock:
+                    result = scrape(oem_code, session)
+            else:
+                result = scrape(oem_code, None)
+        except Exception as scrape_error:
+            failed = True
+            logger.warning(f"[SITES] {site.name} falló con OEM {oem_code}: {scrape_error}")
+        with self._lock:
+            self._stats[site.name].record(result, time.perf_counter() - started_at, failed)
+        return result
+
+    def first_complete(
+        self,
+        oem_code: str,
+        sites: List[ScraperSite],
+        session: Optional[ScraperSession] = None,
+        scrape: Optional[Callable[[ScraperSite, str, Optional[ScraperSession]], Optional[EnrichmentResult]]] = None,
+    ) -> Optional[EnrichmentResult]:
+        """
+        Primer resultado completo entre `sites` (en orden de ranking). `scrape(site, oem, session)`
+        reemplaza a `site.scrape` (ej. para pasar por la cache).
+        """
+        if not sites:
+            return None
+
+        def run(site: ScraperSite) -> Optional[EnrichmentResult]:
+            site_scrape = site.scrape if scrape is None else (
+                lambda code, site_session: scrape(site, code, site_session)
+            )
+            return self._run_site(site, oem_code, session, site_scrape)
+
+        if len(sites) == 1:
+            result = run(sites[0])
+            if result:
+                self._record_win(sites[0])
+            return result
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_concurrent_sites, len(sites)), thread_name_prefix="scraper-site"
+        )
+        futures: Dict[Future, ScraperSite] = {executor.submit(run, site): site for site in sites}
+        partial_results: Dict[str, EnrichmentResult] = {}
+        winner: Optional[Tuple[ScraperSite, EnrichmentResult]] = None
+        try:
+            pending = set(futures)
+            while pending and winner is None:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if is_complete_result(result):
+                        winner = (futures[future], result)
+                        break
+                    if result:
+                        partial_results[futures[future].name] = result
+        finally:
+            skipped = [futures[future] for future in futures if future.cancel()]
+            executor.shutdown(wait=False, cancel_futures=True)
+        if skipped:
+            with self._lock:
+                for site in skipped:
+                    self._stats[site.name].skipped += 1
+
+        if winner is None:
+            # sin completos: el parcial del sitio mejor rankeado
+            winner = next(
+                ((site, partial_results[site.name]) for site in sites if site.name in partial_results), None
+            )
+        if winner is None:
+            return None
+        self._record_win(winner[0])
+        return winner[1]
+
+    def _record_win(self, site: ScraperSite) -> None:
+        with self._lock:
+            self._stats[site.name].wins += 1
+
+    def log_stats(self) -> None:
+        with self._lock:
+            stats_list = [self._stats[site_name] for site_name in self._last_order or self._sites]
+        for stats in stats_list:
+            if not stats.lookups and not stats.skipped:
+                continue
+            latency = f"{stats.latency_ewma:.2f}s" if stats.latency_ewma is not None else "-"
+            logger.info(
+                f"[SITES] {stats.site_name}: búsquedas={stats.lookups} completas={stats.complete} "
+                f"parciales={stats.partial} errores={stats.errors} ganadas={stats.wins} "
+                f"canceladas={stats.skipped} éxito={stats.success_rate:.0%} latencia={latency}"
+            )
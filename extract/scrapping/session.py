@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+from utils.logging import get_logger
+from extract.scrapping.rate_limiter import HostRateLimiter
+from extract.scrapping.web_driver import WebDriverWrapper, ScraperConfig
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class ScrapeTiming:
+    """Desglose de latencia de una búsqueda: esperas del DOM, cortesía y trabajo propio."""
+    item: str
+    total_seconds: float
+    wait_seconds: float
+    politeness_seconds: float
+
+    @property
+    def work_seconds(self) -> float:
+        return max(0.0, self.total_seconds - self.wait_seconds - self.politeness_seconds)
+
+
+class ScraperSession:
+    """
+    Mantiene un único Chrome abierto para muchas búsquedas (una hoja completa de OEMs).
+    - El navegador se inicia recién en el primer `acquire()`, o antes con `start_in_background()`.
+    - Se recicla cada `max_pages_per_browser` páginas o si el heap JS supera `max_js_heap_mb`.
+    """
+
+    def __init__(
+        self,
+        config: Optional[ScraperConfig] = None,
+        name: str = "scraper",
+        rate_limiter: Optional[HostRateLimiter] = None,
+    ):
+        self.config = config or ScraperConfig()
+        self.name = name
+        self.rate_limiter = rate_limiter
+        self._wrapper: Optional[WebDriverWrapper] = None
+        self._startup_thread: Optional[threading.Thread] = None
+        self._startup_error: Optional[BaseException] = None
+        self._broken = False
+        # serializa el navegador entre threads (búsquedas concurrentes en varios sitios)
+        self.lock = threading.RLock()
+
+        self.pages_since_start = 0
+        self.total_pages = 0
+        self.restarts = 0
+        self.timings: List[ScrapeTiming] = []
+
+    # ---------- Ciclo de vida ----------
+    def start_in_background(self) -> None:
+        """Lanza Chrome en un thread para solaparlo con otro trabajo (ej. leer el Excel)."""
+        if self._wrapper is not None or self._startup_thread is not None:
+            return
+        self._startup_thread = threading.Thread(
+            target=self._start_driver_safely, name=f"{self.name}-startup", daemon=True
+        )
+        self._startup_thread.start()
+
+    def acquire(self) -> WebDriverWrapper:
+        """
+        Devuelve el driver listo para usar en la siguiente página, reciclándolo si corresponde.
+        Cada llamada cuenta como una página servida.
+        """
+        self._join_startup()
+
+        if self._wrapper is not None and self._needs_recycle():
+            self.recycle()
+
+        if self._wrapper is None:
+            self._start_driver()
+
+        self.pages_since_start += 1
+        self.total_pages += 1
+        return self._wrapper  # type: ignore[return-value]
+
+    def mark_broken(self) -> None:
+        """Fuerza el reinicio del navegador antes de la siguiente página (ej. tras un error)."""
+        self._broken = True
+
+    def record_timing(self, timing: ScrapeTiming) -> None:
+        self.timings.append(timing)
+
+    def recycle(self) -> None:
+        logger.info(
+            f"[SESSION] Reciclando navegador '{self.name}' tras {self.pages_since_start} páginas"
+        )
+        self._quit()
+        self.restarts += 1
+
+    def close(self) -> None:
+        try:
+            self._join_startup()
+        except Exception as startup_error:
+            logger.warning(f"[SESSION] '{self.name}' no pudo iniciar el navegador: {startup_error}")
+        self._quit()
+        logger.info(
+            f"[SESSION] '{self.name}' cerrada: páginas={self.total_pages} reinicios={self.restarts}"
+        )
+        self._log_timings()
+
+    def __enter__(self) -> "ScraperSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ---------- Internals ----------
+    def _log_timings(self) -> None:
+        if not self.timings:
+            return
+        total_seconds = sum(timing.total_seconds for timing in self.timings)
+        wait_seconds = sum(timing.wait_seconds for timing in self.timings)
+        politeness_seconds = sum(timing.politeness_seconds for timing in self.timings)
+        work_seconds = sum(timing.work_seconds for timing in self.timings)
+        logger.info(
+            f"[SESSION] '{self.name}' {len(self.timings)} búsquedas en {total_seconds:.1f}s: "
+            f"espera DOM={wait_seconds:.1f}s cortesía={politeness_seconds:.1f}s trabajo={work_seconds:.1f}s"
+        )
+
+    def _start_driver(self) -> None:
+        wrapper = WebDriverWrapper(self.config, rate_limiter=self.rate_limiter)
+        wrapper.initialize_driver()
+        self._wrapper = wrapper
+        self._broken = False
+        self.pages_since_start = 0
+
+    def _start_driver_safely(self) -> None:
+        try:
+            self._start_driver()
+        except BaseException as startup_error:  # se re-lanza en acquire()
+            self._startup_error = startup_error
+
+    def _join_startup(self) -> None:
+        if self._startup_thread is None:
+            return
+        self._startup_thread.join()
+        self._startup_thread = None
+        if self._startup_error is not None:
+            startup_error, self._startup_error = self._startup_error, None
+            raise startup_error
+
+    def _needs_recycle(self) -> bool:
+        if self._broken:
+            return True
+        if self.pages_since_start >= self.config.max_pages_per_browser:
+            return True
+        heap_mb = self._wrapper.js_heap_mb() if self._wrapper else None
+        return heap_mb is not None and heap_mb > self.config.max_js_heap_mb
+
+    def _quit(self) -> None:
+        if self._wrapper is None:
+            return
+        try:
+            self._wrapper.quit_driver()
+        except Exception:
+            pass
+        finally:
+            self._wrapper = None
+            self.pages_since_start = 0
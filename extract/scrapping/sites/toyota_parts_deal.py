@@ -1,18 +1,61 @@
 from __future__ import annotations
 
 import re
+from dataclasses import replace
 from typing import Any, Dict, List, Optional, Tuple
 
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.remote.webelement import WebElement
 
 from utils.logging import get_logger
 from extract.scrapping.web_driver import WebDriverWrapper, ScraperConfig
+from extract.scrapping.rate_limiter import HostRateLimiter
+from extract.scrapping.session import ScraperSession, ScrapeTiming
+from extract.scrapping.worker_pool import ScraperWorkerPool
+from extract.scrapping.sites.toyota_parts_deal_http import TOYOTA_PARTS_DEAL_HOME, fetch_detail_via_http
 
 import time as time_module
 
 logger = get_logger()
 
+SEARCH_INPUT_SELECTOR = "input.ab-input-control"
+DETAIL_SELECTOR = "div.pn-detail.part-number-detail"
+VEHICLE_MODAL_SELECTOR = "div.v-cm-content"
+# Listado cuando la búsqueda no cae directo en un detalle (ajustar si cambia el sitio)
+SEARCH_RESULTS_SELECTOR = "div.search-result-list, ul.search-result-list"
+FITMENT_SECTION_SELECTOR = "li[data-id='Vehicle Fitment']"
+FITMENT_ROWS_SELECTOR = f"{FITMENT_SECTION_SELECTOR} table.fit-vehicle-list-table tbody tr"
+
+TOYOTA_PARTS_DEAL_CONFIG = ScraperConfig(
+    headless=False,
+    disable_images=False,
+    human_delay_range=(1.5, 2.5),
+    min_request_interval=2.0,
+)
+
+# Cortesía para el fetcher HTTP cuando no hay un rate limiter compartido (pool)
+HTTP_RATE_LIMITER = HostRateLimiter(requests_per_second=1 / TOYOTA_PARTS_DEAL_CONFIG.min_request_interval)
+
+
+def create_toyota_parts_deal_session() -> ScraperSession:
+    """Sesión de Chrome reutilizable para scrapear muchos OEM en ToyotaPartsDeal."""
+    return ScraperSession(TOYOTA_PARTS_DEAL_CONFIG, name="toyotapartsdeal")
+
+
+def create_toyota_parts_deal_pool(workers: int, requests_per_second: float) -> ScraperWorkerPool:
+    """
+    Pool de navegadores headless para ToyotaPartsDeal. El rate limiter es compartido por
+    todos los workers: la carga sobre el sitio no crece con la cantidad de workers.
+    """
+    return ScraperWorkerPool(
+        workers=workers,
+        config=replace(TOYOTA_PARTS_DEAL_CONFIG, headless=True),
+        rate_limiter=HostRateLimiter(requests_per_second=requests_per_second),
+        name="toyotapartsdeal",
+    )
+
 
 # ------------------ Parsers ------------------
 
@@ -95,7 +138,7 @@ def _extract_specs_table(wd: WebDriverWrapper) -> Dict[str, str]:
 def _extract_header(wd: WebDriverWrapper) -> Dict[str, str]:
     header_data: Dict[str, str] = {}
 
-    heading_element = wd.driver.find_element(By.CSS_SELECTOR, "div.pn-detail.part-number-detail h1.pn-detail-h1")  # type: ignore
+    heading_element = wd.driver.find_element(By.CSS_SELECTOR, f"{DETAIL_SELECTOR} h1.pn-detail-h1")  # type: ignore
     header_data["heading_text"] = (heading_element.text or "").strip()
 
     try:
@@ -105,7 +148,7 @@ def _extract_header(wd: WebDriverWrapper) -> Dict[str, str]:
         header_data["part_name"] = ""
 
     try:
-        sub_description = wd.driver.find_element(By.CSS_SELECTOR, "div.pn-detail.part-number-detail p.pn-detail-sub-desc")  # type: ignore
+        sub_description = wd.driver.find_element(By.CSS_SELECTOR, f"{DETAIL_SELECTOR} p.pn-detail-sub-desc")  # type: ignore
         header_data["sub_desc"] = (sub_description.text or "").strip()
     except Exception:
         header_data["sub_desc"] = ""
@@ -117,7 +160,7 @@ def _extract_fitment_rows(wd: WebDriverWrapper) -> List[Dict[str, str]]:
     fitment_rows: List[Dict[str, str]] = []
     rows = wd.driver.find_elements(  # type: ignore
         By.CSS_SELECTOR,
-        "li[data-id='Vehicle Fitment'] table.fit-vehicle-list-table tbody tr"
+        FITMENT_ROWS_SELECTOR
     )
     for row in rows:
         cells = row.find_elements(By.TAG_NAME, "td")
@@ -144,7 +187,7 @@ def _vehicle_modal_is_open(wd: WebDriverWrapper) -> bool:
         return False
 
     # Lo más estable: el contenedor .v-cm-content + texto “Select Vehicle”
-    modal_elements = wd.driver.find_elements(By.CSS_SELECTOR, "div.v-cm-content")
+    modal_elements = wd.driver.find_elements(By.CSS_SELECTOR, VEHICLE_MODAL_SELECTOR)
     if not modal_elements:
         return False
 
@@ -152,85 +195,276 @@ def _vehicle_modal_is_open(wd: WebDriverWrapper) -> bool:
     return ("select vehicle" in modal_text) or ("enter the vin" in modal_text) or ("select vehicle by model" in modal_text)
 
 
-def _wait_for_detail_or_vehicle_modal(wd: WebDriverWrapper) -> str:
-    """
-    Espera hasta que ocurra una de dos cosas:
-    - aparezca el detalle del repuesto
-    - aparezca el modal de vehículo
+def _page_was_replaced(previous_root: Optional[WebElement]) -> bool:
+    """True si el <html> capturado antes de buscar ya no existe (hubo navegación)."""
+    if previous_root is None:
+        return True
+    try:
+        previous_root.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
 
-    Retorna: "detail" | "vehicle_modal" | "timeout"
+def _wait_for_search_outcome(
+    wd: WebDriverWrapper, previous_root: Optional[WebElement], previous_url: str
+) -> str:
     """
-    wd._require_driver()
+    Espera (por condición, sin sleeps fijos) el resultado de la búsqueda:
+    - aparece el modal de vehículo
+    - aparece el detalle del repuesto en una página nueva (otro <html> u otra URL): con
+      sesión reutilizada la pestaña todavía puede mostrar el detalle del OEM anterior
+    - aparece un listado de resultados sin detalle
 
-    wait_timeout_seconds = wd.config.wait_timeout
-    # polling simple: usamos wait del wrapper para visibilidad/presencia,
-    # pero como son dos condiciones, hacemos un loop corto.
+    Retorna: "detail" | "vehicle_modal" | "results" | "timeout"
+    """
+    def _new_page_has(selector: str) -> bool:
+        page_changed = _page_was_replaced(previous_root) or wd.get_url() != previous_url
+        return page_changed and bool(wd.driver.find_elements(By.CSS_SELECTOR, selector))  # type: ignore
+
+    state = wd.wait_for_any(
+        {
+            "vehicle_modal": lambda: _vehicle_modal_is_open(wd),
+            "detail": lambda: _new_page_has(DETAIL_SELECTOR),
+            "results": lambda: _new_page_has(SEARCH_RESULTS_SELECTOR),
+        }
+    )
+    return state or "timeout"
 
-    loop_start_time = time_module.time()
 
-    while time_module.time() - loop_start_time < wait_timeout_seconds:
-        # 1) modal vehículo
-        if _vehicle_modal_is_open(wd):
-            return "vehicle_modal"
+def _wait_for_fitment_table(wd: WebDriverWrapper) -> None:
+    """
+    Espera a que la tabla de fitment tenga filas. Si la página ya cargó completa y no trae la
+    sección de fitment no hay nada que esperar; si la trae vacía, se espera como máximo
+    `optional_wait_timeout`.
+    """
+    wd.wait_for_any(
+        {
+            "fitment": lambda: bool(wd.driver.find_elements(By.CSS_SELECTOR, FITMENT_ROWS_SELECTOR)),  # type: ignore
+            "no_fitment": lambda: (
+                wd.driver.execute_script("return document.readyState") == "complete"  # type: ignore
+                and not wd.driver.find_elements(By.CSS_SELECTOR, FITMENT_SECTION_SELECTOR)  # type: ignore
+            ),
+        },
+        timeout=wd.config.optional_wait_timeout,
+    )
 
-        # 2) detalle repuesto
-        try:
-            if wd.driver.find_elements(By.CSS_SELECTOR, "div.pn-detail.part-number-detail"):  # type: ignore
-                return "detail"
-        except Exception:
-            pass
 
-        time_module.sleep(0.25)
+# ------------------ Navigation ------------------
 
-    return "timeout"
+def _open_search(wd: WebDriverWrapper) -> None:
+    """
+    Deja el navegador listo para buscar. Si la pestaña ya está en el sitio con el buscador
+    visible (OEM anterior de la misma sesión), se reutiliza sin recargar el home.
+    """
+    try:
+        on_site = wd.get_url().startswith(TOYOTA_PARTS_DEAL_HOME)
+        search_ready = on_site and bool(wd.driver.find_elements(By.CSS_SELECTOR, SEARCH_INPUT_SELECTOR))  # type: ignore
+    except Exception:
+        search_ready = False
+
+    if not search_ready or _vehicle_modal_is_open(wd):
+        wd.load_page(TOYOTA_PARTS_DEAL_HOME, delay_after=False)
+
+
+# ------------------ Row building ------------------
+
+def _build_rows(
+    oem_code: str,
+    url: str,
+    header_data: Dict[str, str],
+    specs_table: Dict[str, str],
+    fitment_rows: List[Dict[str, str]],
+) -> List[Dict[str, Any]]:
+    """Arma las filas de salida (1 por fitment); compartido por el fetcher HTTP y el de Selenium."""
+    # repuesto_nombre: preferimos el strong (limpio) y le agregamos Brand / Part Description si existen
+    base_name = header_data.get("part_name") or header_data.get("heading_text") or ""
+    brand_name = specs_table.get("Brand", "").strip()
+    part_description = specs_table.get("Part Description", "").strip()
+    name_parts = [part for part in [brand_name, base_name, part_description] if part]
+    repuesto_nombre = " ".join(name_parts) or base_name
+
+    # sku: si no existe, None (como pediste)
+    repuesto_sku = specs_table.get("SKU")
+    if repuesto_sku:
+        repuesto_sku = repuesto_sku.strip() or None
+    else:
+        repuesto_sku = None
+
+    # OEM: lo que buscaste (más confiable), pero si specs trae MPN lo puedes guardar si quieres
+    repuesto_oem = oem_code
+
+    # Dimensiones: parse y además incrustar en specs_text
+    dimensions_text = (specs_table.get("Item Dimensions") or "").strip()
+    dimension_1, dimension_2, dimension_3, dimension_4, dimension_count, dimension_separator = _parse_dimensions(dimensions_text)
+
+    # Armar texto de especificaciones, incluyendo medidas dentro (como pediste)
+    title_text = _clean_title_for_description(header_data.get("heading_text", ""))
+    sub_desc = header_data.get("sub_desc", "")
+
+    specs_lines = []
+    if title_text:
+        specs_lines.append(title_text)
+    if sub_desc:
+        specs_lines.append(sub_desc)
+
+    # key-values (menos ruido: sin Shipping & Return con links)
+    for key, value in specs_table.items():
+        if key.lower().strip() == "shipping & return":
+            continue
+        specs_lines.append(f"{key}: {value}")
+
+    # incrustar medidas explícitas al final (aunque ya estén como Item Dimensions)
+    if dimension_count > 0:
+        # ej: "DIMENSIONS_PARSED: 15.8X11.3X3.2 (inches)"
+        dims_join = dimension_separator.join([str(dim) for dim in [dimension_1, dimension_2, dimension_3, dimension_4] if dim is not None])
+        unit_hint = ""
+        if "inch" in dimensions_text.lower():
+            unit_hint = " inches"
+        elif "cm" in dimensions_text.lower():
+            unit_hint = " cm"
+        specs_lines.append(f"DIMENSIONS_PARSED: {dims_join}{unit_hint}".strip())
+
+    repuesto_especificaciones_texto = " | ".join([s for s in specs_lines if s]).strip(" |")
+
+    # 4) Base row (sin proveedor ni formato_origen)
+    base_row: Dict[str, Any] = {
+        "repuesto_sku": repuesto_sku,
+        "repuesto_oem": repuesto_oem,
+        "proveedor": None,          # lo llena tu ETL según hoja (proveedor_3)
+        "formato_origen": None,     # lo llena tu ETL (formato_oem_solo)
+        "repuesto_nombre": repuesto_nombre,
+        "repuesto_especificaciones_texto": repuesto_especificaciones_texto,
+        "repuesto_medida_1": dimension_1,
+        "repuesto_medida_2": dimension_2,
+        "repuesto_medida_3": dimension_3,
+        "repuesto_medida_4": dimension_4,
+        "repuesto_cantidad_medidas": dimension_count,
+        "repuesto_separador_medidas": dimension_separator,
+        "uso_de_OPEN_AI": False,
+        "paginas_de_informacion": url,
+    }
+
+    # 5) Compatibilidades (1 fila por fitment)
+    if not fitment_rows:
+        base_row.update(
+            {
+                "compatibilidad_marca": None,
+                "compatibilidad_modelo": None,
+                "compatibilidad_anio_desde": None,
+                "compatibilidad_anio_hasta": None,
+                "compatibilidad_motor_litros": None,
+                "compatibilidad_codigo_motor": None,
+                "compatibilidad_texto": None,
+            }
+        )
+        return [base_row]
+
+    fitment_output: List[Dict[str, Any]] = []
+    for fitment_row in fitment_rows:
+        year_make_model_text = fitment_row["year_make_model"]
+        trim_engine = fitment_row["trim_engine"]
+        option_details = fitment_row["option_details"]
+
+        year_from, year_to = _parse_year_range(year_make_model_text)
+        make, model = _parse_make_model(year_make_model_text)
+        liters = _parse_engine_liters(trim_engine)
+        engine_code = _parse_engine_code(option_details)
+
+        row = dict(base_row)
+        row.update(
+            {
+                "compatibilidad_marca": make,
+                "compatibilidad_modelo": model,
+                "compatibilidad_anio_desde": year_from,
+                "compatibilidad_anio_hasta": year_to,
+                "compatibilidad_motor_litros": liters,
+                "compatibilidad_codigo_motor": engine_code,
+                "compatibilidad_texto": f"{year_make_model_text} | {trim_engine} | {option_details}".strip(" |"),
+            }
+        )
+        fitment_output.append(row)
+    logger.info(fitment_output)
+    return fitment_output
 
 
 # ------------------ Main scraper ------------------
 
-def scrape_oem_data_in_toyota_parts_deal(oem_code: str) -> Optional[List[Dict[str, Any]]]:
-    wd = WebDriverWrapper(
-        ScraperConfig(
-            headless=False,
-            disable_images=False,
-            human_delay_range=(1.5, 2.5),
-        )
-    )
+def scrape_oem_data_in_toyota_parts_deal(
+    oem_code: str, session: Optional[ScraperSession] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Busca el OEM en ToyotaPartsDeal y devuelve una fila por fitment.
+    Primero intenta con HTTP + lxml (sin navegador); solo si el HTML estático no trae los
+    datos usa Selenium. Con `session` se reutiliza su navegador (no se cierra); sin ella
+    se abre y cierra uno propio.
+    Retorna None solo si el sitio no tiene el OEM; un error del navegador o un timeout
+    se propaga (no es un "no encontrado" y no debe quedar en la cache negativa).
+    """
+    if TOYOTA_PARTS_DEAL_CONFIG.http_first:
+        rate_limiter = session.rate_limiter if session is not None and session.rate_limiter else HTTP_RATE_LIMITER
+        try:
+            static_detail = fetch_detail_via_http(
+                oem_code, rate_limiter=rate_limiter, timeout=TOYOTA_PARTS_DEAL_CONFIG.http_timeout
+            )
+        except Exception as http_error:
+            logger.info(f"[TPD] HTTP falló para OEM={oem_code} ({type(http_error).__name__}: {http_error}); se usa Selenium.")
+            static_detail = None
+
+        if static_detail is not None:
+            logger.info(f"[TPD] OEM={oem_code} resuelto por HTTP ({static_detail.url})")
+            return _build_rows(
+                oem_code,
+                static_detail.url,
+                static_detail.header_data,
+                static_detail.specs_table,
+                static_detail.fitment_rows,
+            )
+
+    return _scrape_with_browser(oem_code, session)
+
+
+def _scrape_with_browser(
+    oem_code: str, session: Optional[ScraperSession] = None
+) -> Optional[List[Dict[str, Any]]]:
+    owns_driver = session is None
+    wd = WebDriverWrapper(TOYOTA_PARTS_DEAL_CONFIG) if owns_driver else None
+    started_at = time_module.perf_counter()
+    wait_seconds_before = politeness_seconds_before = 0.0
 
     try:
-        wd.initialize_driver()
-        wd.load_page("https://www.toyotapartsdeal.com/")
+        if owns_driver:
+            wd.initialize_driver()
+        else:
+            wd = session.acquire()
+        wait_seconds_before, politeness_seconds_before = wd.wait_seconds, wd.politeness_seconds
+        _open_search(wd)
 
         # 1) Buscar OEM
-        search_input = wd.find_visible(By.CSS_SELECTOR, "input.ab-input-control")
+        search_input = wd.find_visible(By.CSS_SELECTOR, SEARCH_INPUT_SELECTOR)
         search_input.clear()
         search_input.send_keys(oem_code)
-        wd.human_delay()
+        previous_root = wd.driver.find_element(By.TAG_NAME, "html")  # type: ignore
+        previous_url = wd.get_url()
+        wd.before_request(TOYOTA_PARTS_DEAL_HOME)
         search_input.send_keys(Keys.ENTER)
-        
-        wd.human_delay()
-        wd.human_delay()
-        wd.human_delay()
-        wd.human_delay()
 
-        # Esperar: detalle o modal
-        state = _wait_for_detail_or_vehicle_modal(wd)
+        # Esperar: detalle, modal o listado de resultados
+        state = _wait_for_search_outcome(wd, previous_root, previous_url)
 
         if state == "vehicle_modal":
             logger.info(f"[TPD] Apareció modal de vehículo para OEM={oem_code}. Se devuelve None.")
             return None
 
+        if state == "timeout":
+            raise TimeoutError(f"la búsqueda de OEM={oem_code} no terminó de cargar")
+
         if state != "detail":
             logger.info(f"[TPD] No se encontró detalle (state={state}) para OEM={oem_code}. Se devuelve None.")
             return None
 
-        wd.human_delay()
-        wd.human_delay()
-        wd.human_delay()
-        wd.human_delay()
-
-        # 2) Esperar página de detalle (si quedas en results, esto puede fallar -> lo arreglamos después si te pasa)
-        wd.find_present(By.CSS_SELECTOR, "div.pn-detail.part-number-detail")
-        wd.human_delay()
+        # 2) Esperar que la tabla de fitment se llene (si la página la trae)
+        _wait_for_fitment_table(wd)
 
         # 3) Extraer
         url = wd.get_url()
@@ -238,124 +472,32 @@ def scrape_oem_data_in_toyota_parts_deal(oem_code: str) -> Optional[List[Dict[st
         specs_table = _extract_specs_table(wd)
         fitment_rows = _extract_fitment_rows(wd)
 
-        # repuesto_nombre: preferimos el strong (limpio) y le agregamos Brand / Part Description si existen
-        base_name = header_data.get("part_name") or header_data.get("heading_text") or ""
-        brand_name = specs_table.get("Brand", "").strip()
-        part_description = specs_table.get("Part Description", "").strip()
-        name_parts = [part for part in [brand_name, base_name, part_description] if part]
-        repuesto_nombre = " ".join(name_parts) or base_name
-
-        # sku: si no existe, None (como pediste)
-        repuesto_sku = specs_table.get("SKU")
-        if repuesto_sku:
-            repuesto_sku = repuesto_sku.strip() or None
-        else:
-            repuesto_sku = None
-
-        # OEM: lo que buscaste (más confiable), pero si specs trae MPN lo puedes guardar si quieres
-        repuesto_oem = oem_code
-
-        # Dimensiones: parse y además incrustar en specs_text
-        dimensions_text = (specs_table.get("Item Dimensions") or "").strip()
-        dimension_1, dimension_2, dimension_3, dimension_4, dimension_count, dimension_separator = _parse_dimensions(dimensions_text)
-
-        # Armar texto de especificaciones, incluyendo medidas dentro (como pediste)
-        title_text = _clean_title_for_description(header_data.get("heading_text", ""))
-        sub_desc = header_data.get("sub_desc", "")
-
-        specs_lines = []
-        if title_text:
-            specs_lines.append(title_text)
-        if sub_desc:
-            specs_lines.append(sub_desc)
-
-        # key-values (menos ruido: sin Shipping & Return con links)
-        for key, value in specs_table.items():
-            if key.lower().strip() == "shipping & return":
-                continue
-            specs_lines.append(f"{key}: {value}")
-
-        # incrustar medidas explícitas al final (aunque ya estén como Item Dimensions)
-        if dimension_count > 0:
-            # ej: "DIMENSIONS_PARSED: 15.8X11.3X3.2 (inches)"
-            dims_join = dimension_separator.join([str(dim) for dim in [dimension_1, dimension_2, dimension_3, dimension_4] if dim is not None])
-            unit_hint = ""
-            if "inch" in dimensions_text.lower():
-                unit_hint = " inches"
-            elif "cm" in dimensions_text.lower():
-                unit_hint = " cm"
-            specs_lines.append(f"DIMENSIONS_PARSED: {dims_join}{unit_hint}".strip())
-
-        repuesto_especificaciones_texto = " | ".join([s for s in specs_lines if s]).strip(" |")
-
-        # 4) Base row (sin proveedor ni formato_origen)
-        base_row: Dict[str, Any] = {
-            "repuesto_sku": repuesto_sku,
-            "repuesto_oem": repuesto_oem,
-            "proveedor": None,          # lo llena tu ETL según hoja (proveedor_3)
-            "formato_origen": None,     # lo llena tu ETL (formato_oem_solo)
-            "repuesto_nombre": repuesto_nombre,
-            "repuesto_especificaciones_texto": repuesto_especificaciones_texto,
-            "repuesto_medida_1": dimension_1,
-            "repuesto_medida_2": dimension_2,
-            "repuesto_medida_3": dimension_3,
-            "repuesto_medida_4": dimension_4,
-            "repuesto_cantidad_medidas": dimension_count,
-            "repuesto_separador_medidas": dimension_separator,
-            "uso_de_OPEN_AI": False,
-            "paginas_de_informacion": url,
-        }
-
-        # 5) Compatibilidades (1 fila por fitment)
-        if not fitment_rows:
-            base_row.update(
-                {
-                    "compatibilidad_marca": None,
-                    "compatibilidad_modelo": None,
-                    "compatibilidad_anio_desde": None,
-                    "compatibilidad_anio_hasta": None,
-                    "compatibilidad_motor_litros": None,
-                    "compatibilidad_codigo_motor": None,
-                    "compatibilidad_texto": None,
-                }
-            )
-            return [base_row]
-
-        fitment_output: List[Dict[str, Any]] = []
-        for fitment_row in fitment_rows:
-            year_make_model_text = fitment_row["year_make_model"]
-            trim_engine = fitment_row["trim_engine"]
-            option_details = fitment_row["option_details"]
-
-            year_from, year_to = _parse_year_range(year_make_model_text)
-            make, model = _parse_make_model(year_make_model_text)
-            liters = _parse_engine_liters(trim_engine)
-            engine_code = _parse_engine_code(option_details)
-
-            row = dict(base_row)
-            row.update(
-                {
-                    "compatibilidad_marca": make,
-                    "compatibilidad_modelo": model,
-                    "compatibilidad_anio_desde": year_from,
-                    "compatibilidad_anio_hasta": year_to,
-                    "compatibilidad_motor_litros": liters,
-                    "compatibilidad_codigo_motor": engine_code,
-                    "compatibilidad_texto": f"{year_make_model_text} | {trim_engine} | {option_details}".strip(" |"),
-                }
-            )
-            fitment_output.append(row)
-        logger.info(fitment_output)
-        return fitment_output
+        return _build_rows(oem_code, url, header_data, specs_table, fitment_rows)
 
     except Exception as e:
         logger.warning(f"[TPD] Error: {type(e).__name__}: {e}")
-        return None
+        if session is not None:
+            session.mark_broken()
+        raise
     finally:
-        try:
-            wd.quit_driver()
-        except Exception:
-            pass
+        if wd is not None:
+            timing = ScrapeTiming(
+                item=oem_code,
+                total_seconds=time_module.perf_counter() - started_at,
+                wait_seconds=wd.wait_seconds - wait_seconds_before,
+                politeness_seconds=wd.politeness_seconds - politeness_seconds_before,
+            )
+            logger.info(
+                f"[TPD] OEM={oem_code} total={timing.total_seconds:.1f}s espera={timing.wait_seconds:.1f}s "
+                f"cortesía={timing.politeness_seconds:.1f}s trabajo={timing.work_seconds:.1f}s"
+            )
+            if session is not None:
+                session.record_timing(timing)
+        if owns_driver:
+            try:
+                wd.quit_driver()
+            except Exception:
+                pass
 
 
 if __name__ == "__main__":
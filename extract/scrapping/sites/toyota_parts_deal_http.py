@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import quote, urljoin, urlsplit
+
+import requests
+from lxml import html as lxml_html
+
+from utils.oem import normalize_oem_code
+from extract.scrapping.rate_limiter import HostRateLimiter
+
+TOYOTA_PARTS_DEAL_HOME = "https://www.toyotapartsdeal.com/"
+# Búsqueda directa por URL (ajustar si cambia el sitio).
+# No verificada contra el sitio en vivo: si no devuelve el listado, el caller cae a Selenium.
+SEARCH_URL_TEMPLATE = TOYOTA_PARTS_DEAL_HOME + "search?search_str={oem}"
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# XPath equivalentes a los selectores CSS del scraper Selenium
+DETAIL_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' pn-detail ') and contains(concat(' ', normalize-space(@class), ' '), ' part-number-detail ')]"
+HEADING_XPATH = ".//h1[contains(concat(' ', normalize-space(@class), ' '), ' pn-detail-h1 ')]"
+SUB_DESC_XPATH = ".//p[contains(concat(' ', normalize-space(@class), ' '), ' pn-detail-sub-desc ')]"
+SPECS_ROWS_XPATH = "//li[@data-id='Product Specifications']//table[contains(concat(' ', normalize-space(@class), ' '), ' pn-spec-list ')]//tbody/tr"
+FITMENT_SECTION_XPATH = "//li[@data-id='Vehicle Fitment']"
+FITMENT_ROWS_XPATH = FITMENT_SECTION_XPATH + "//table[contains(concat(' ', normalize-space(@class), ' '), ' fit-vehicle-list-table ')]//tbody/tr"
+# Páginas de detalle: /<slug>~<oem>.html (ej. .../toyota-filter-assy-oil~04152-yzza1.html)
+DETAIL_PATH_PATTERN = re.compile(r"~([^/~]+)\.html?$", re.IGNORECASE)
+
+_thread_local = threading.local()
+
+
+@dataclass(frozen=True)
+class StaticDetail:
+    url: str
+    header_data: Dict[str, str]
+    specs_table: Dict[str, str]
+    fitment_rows: List[Dict[str, str]] = field(default_factory=list)
+
+
+# ------------------ HTML parsers (ver tests/test_toyota_parts_deal_http.py) ------------------
+
+def _text_of(element) -> str:
+    """Texto visible aproximado: como `.text` de Selenium, con espacios colapsados y <br> como salto."""
+    if element is None:
+        return ""
+    chunks: List[str] = []
+
+    def _walk(node) -> None:
+        if not isinstance(node.tag, str) or node.tag in ("script", "style"):
+            return
+        if node.tag == "br":
+            chunks.append("\n")
+        elif node.text:
+            chunks.append(node.text)
+        for child in node:
+            _walk(child)
+            if child.tail:
+                chunks.append(child.tail)
+
+    _walk(element)
+    lines = [" ".join(line.split()) for line in "".join(chunks).split("\n")]
+    return "\n".join(line for line in lines if line).strip()
+
+
+def parse_header(document) -> Dict[str, str]:
+    header_data: Dict[str, str] = {"heading_text": "", "part_name": "", "sub_desc": ""}
+    detail_nodes = document.xpath(DETAIL_XPATH)
+    if not detail_nodes:
+        return header_data
+    detail = detail_nodes[0]
+
+    heading_nodes = detail.xpath(HEADING_XPATH)
+    if heading_nodes:
+        header_data["heading_text"] = _text_of(heading_nodes[0])
+        strong_nodes = heading_nodes[0].xpath(".//strong")
+        header_data["part_name"] = _text_of(strong_nodes[0]) if strong_nodes else ""
+
+    sub_desc_nodes = detail.xpath(SUB_DESC_XPATH)
+    header_data["sub_desc"] = _text_of(sub_desc_nodes[0]) if sub_desc_nodes else ""
+    return header_data
+
+
+def parse_specs_table(document) -> Dict[str, str]:
+    specs_table: Dict[str, str] = {}
+    for row in document.xpath(SPECS_ROWS_XPATH):
+        cells = row.xpath("./td")
+        if len(cells) >= 2:
+            key = _text_of(cells[0])
+            value = _text_of(cells[1])
+            if key:
+                specs_table[key] = value
+    return specs_table
+
+
+def parse_fitment_rows(document) -> List[Dict[str, str]]:
+    fitment_rows: List[Dict[str, str]] = []
+    for row in document.xpath(FITMENT_ROWS_XPATH):
+        cells = row.xpath("./td")
+        if len(cells) >= 3:
+            fitment_rows.append(
+                {
+                    "year_make_model": _text_of(cells[0]),
+                    "trim_engine": _text_of(cells[1]),
+                    "option_details": _text_of(cells[2]),
+                }
+            )
+    return fitment_rows
+
+
+def parse_detail_html(page_html: str, url: str) -> Optional[StaticDetail]:
+    """
+    Parsea una página de detalle. Retorna None si el HTML estático no alcanza:
+    sin contenedor de detalle, o con sección de fitment cuyas filas se cargan por JS.
+    """
+    document = lxml_html.fromstring(page_html)
+    if not document.xpath(DETAIL_XPATH):
+        return None
+
+    fitment_rows = parse_fitment_rows(document)
+    if not fitment_rows and document.xpath(FITMENT_SECTION_XPATH):
+        return None
+
+    return StaticDetail(
+        url=url,
+        header_data=parse_header(document),
+        specs_table=parse_specs_table(document),
+        fitment_rows=fitment_rows,
+    )
+
+
+def _detail_link_oem(href: str) -> Optional[str]:
+    """OEM normalizado del slug si `href` apunta a una página de detalle; None si no (búsqueda, paginación...)."""
+    match = DETAIL_PATH_PATTERN.search(urlsplit(href).path)
+    return normalize_oem_code(match.group(1)) if match else None
+
+
+def find_detail_link(page_html: str, base_url: str, oem_code: str) -> Optional[str]:
+    """
+    En un listado de resultados, el link a la página de detalle del OEM exacto: primero por
+    el OEM del slug (`~<oem>.html`) y si no, por un token del texto del link. Solo cuentan
+    links de detalle y la igualdad es exacta (04152-YZZA1 no toma ~04152-yzza10.html).
+    """
+    oem_key = normalize_oem_code(oem_code)
+    if not oem_key:
+        return None
+    document = lxml_html.fromstring(page_html)
+    detail_links = [
+        (anchor, href, slug_oem)
+        for anchor in document.xpath("//a[@href]")
+        if (slug_oem := _detail_link_oem(href := anchor.get("href") or "")) is not None
+    ]
+    for _, href, slug_oem in detail_links:
+        if slug_oem == oem_key:
+            return urljoin(base_url, href)
+    for anchor, href, _ in detail_links:
+        if any(normalize_oem_code(token) == oem_key for token in _text_of(anchor).split()):
+            return urljoin(base_url, href)
+    return None
+
+
+# ------------------ Fetch ------------------
+
+def _http_session() -> requests.Session:
+    """Un requests.Session (keep-alive) por thread."""
+    http_session = getattr(_thread_local, "session", None)
+    if http_session is None:
+        http_session = requests.Session()
+        http_session.headers.update(DEFAULT_HEADERS)
+        _thread_local.session = http_session
+    return http_session
+
+
+def _get(url: str, rate_limiter: Optional[HostRateLimiter], timeout: float) -> requests.Response:
+    if rate_limiter is not None:
+        rate_limiter.acquire(url)
+    response = _http_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response
+
+
+def fetch_detail_via_http(
+    oem_code: str, rate_limiter: Optional[HostRateLimiter] = None, timeout: float = 20.0
+) -> Optional[StaticDetail]:
+    """
+    Resuelve el OEM a su página de detalle sin navegador:
+    búsqueda por URL -> (detalle directo | link de detalle del listado con ese OEM exacto).
+    Retorna None si el HTML estático no trae los datos (el caller usa Selenium).
+    """
+    search_url = SEARCH_URL_TEMPLATE.format(oem=quote(oem_code.strip()))
+    search_response = _get(search_url, rate_limiter, timeout)
+
+    static_detail = parse_detail_html(search_response.text, search_response.url)
+    if static_detail is not None:
+        return static_detail
+
+    detail_url = find_detail_link(search_response.text, search_response.url, oem_code)
+    if not detail_url:
+        return None
+
+    detail_response = _get(detail_url, rate_limiter, timeout)
+    return parse_detail_html(detail_response.text, detail_response.url)
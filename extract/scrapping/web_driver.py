@@ -3,7 +3,8 @@ from __future__ import annotations
 import random
 import time
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -18,15 +19,25 @@ from selenium.common.exceptions import (
 )
 from webdriver_manager.chrome import ChromeDriverManager
 
+from extract.scrapping.rate_limiter import HostRateLimiter
+
 
 @dataclass(frozen=True)
 class ScraperConfig:
     # Delay “humano” para no bombardear: 2–5s por defecto
     human_delay_range: Tuple[float, float] = (2.0, 5.0)
 
+    # Cortesía: intervalo mínimo entre requests al sitio (separado de las esperas de carga).
+    # Si hay un HostRateLimiter compartido, manda el limiter.
+    min_request_interval: float = 2.0
+
     # Timeouts
     page_load_timeout: int = 30
     wait_timeout: int = 15
+    # Espera para secciones opcionales (ej. tabla de fitment que puede no existir)
+    optional_wait_timeout: float = 5.0
+    # Frecuencia con la que se reevalúan las condiciones de espera
+    poll_frequency: float = 0.1
 
     # Navegación
     headless: bool = False
@@ -36,13 +47,33 @@ class ScraperConfig:
     disable_images: bool = True
     user_agent: Optional[str] = None
 
+    # Intentar primero con HTTP + lxml (sin navegador) en los sitios que lo soportan
+    http_first: bool = True
+    http_timeout: float = 20.0
+
+    # Reciclaje del navegador cuando se reutiliza entre OEMs (ScraperSession)
+    max_pages_per_browser: int = 200
+    max_js_heap_mb: float = 512.0
+
+
+@lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    """Resuelve (y descarga si falta) chromedriver una sola vez por proceso."""
+    return ChromeDriverManager().install()
+
 
 class WebDriverWrapper:
-    def __init__(self, config: Optional[ScraperConfig] = None):
+    def __init__(self, config: Optional[ScraperConfig] = None, rate_limiter: Optional[HostRateLimiter] = None):
         self.config = config or ScraperConfig()
+        self.rate_limiter = rate_limiter
         self.driver: Optional[webdriver.Chrome] = None
         self.wait: Optional[WebDriverWait] = None
 
+        # Contadores acumulados para desglosar latencia (espera vs trabajo)
+        self.wait_seconds = 0.0
+        self.politeness_seconds = 0.0
+        self._last_request_at: Optional[float] = None
+
     # ---------- Setup / Teardown ----------
     def initialize_driver(self) -> None:
         chrome_options = webdriver.ChromeOptions()
@@ -66,10 +97,10 @@ class WebDriverWrapper:
             prefs = {"profile.managed_default_content_settings.images": 2}
             chrome_options.add_experimental_option("prefs", prefs)
 
-        service = Service(ChromeDriverManager().install())
+        service = Service(_chromedriver_path())
         self.driver = webdriver.Chrome(service=service, options=chrome_options)
         self.driver.set_page_load_timeout(self.config.page_load_timeout)
-        self.wait = WebDriverWait(self.driver, self.config.wait_timeout)
+        self.wait = WebDriverWait(self.driver, self.config.wait_timeout, poll_frequency=self.config.poll_frequency)
 
     def quit_driver(self) -> None:
         if self.driver is not None:
@@ -81,13 +112,34 @@ class WebDriverWrapper:
 
     # ---------- Ética / rate limiting ----------
     def human_delay(self) -> None:
-        """Delay aleatorio 2–5s (configurable) para bajar carga y parecer humano."""
+        """
+        Delay aleatorio 2–5s (configurable) para bajar carga y parecer humano.
+        Con un rate limiter compartido la cortesía la controla él y esto no espera.
+        """
+        if self.rate_limiter is not None:
+            return
         lo, hi = self.config.human_delay_range
         time.sleep(random.uniform(lo, hi))
 
+    def before_request(self, url: str) -> None:
+        """
+        Cortesía antes de una acción que genera un request al sitio: pide turno al rate
+        limiter compartido o, sin limiter, respeta `min_request_interval` desde el request anterior.
+        """
+        started_at = time.perf_counter()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        elif self._last_request_at is not None:
+            remaining_seconds = self.config.min_request_interval - (time.monotonic() - self._last_request_at)
+            if remaining_seconds > 0:
+                time.sleep(remaining_seconds)
+        self._last_request_at = time.monotonic()
+        self.politeness_seconds += time.perf_counter() - started_at
+
     # ---------- Navegación ----------
     def load_page(self, url: str, delay_after: bool = True) -> None:
         self._require_driver()
+        self.before_request(url)
         self.driver.get(url)
         # Espera mínima a “document ready”
         self._wait_document_ready()
@@ -98,6 +150,17 @@ class WebDriverWrapper:
         self._require_driver()
         return self.driver.current_url
 
+    def js_heap_mb(self) -> Optional[float]:
+        """Heap JS usado por la pestaña actual (MB), o None si Chrome no lo expone."""
+        self._require_driver()
+        try:
+            used_bytes = self.driver.execute_script(
+                "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : null;"
+            )
+        except Exception:
+            return None
+        return float(used_bytes) / (1024 * 1024) if used_bytes else None
+
     # ---------- Tabs ----------
     def new_tab(self, url: str, delay_after: bool = True) -> None:
         self._require_driver()
@@ -124,11 +187,39 @@ class WebDriverWrapper:
     # ---------- Wait helpers ----------
     def find_visible(self, by: By, value: str) -> WebElement:
         self._require_driver()
-        return self.wait.until(EC.visibility_of_element_located((by, value)))
+        return self._timed_until(self.wait, EC.visibility_of_element_located((by, value)))
 
     def find_present(self, by: By, value: str) -> WebElement:
         self._require_driver()
-        return self.wait.until(EC.presence_of_element_located((by, value)))
+        return self._timed_until(self.wait, EC.presence_of_element_located((by, value)))
+
+    def wait_for_any(
+        self, conditions: Dict[str, Callable[[], bool]], timeout: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Espera hasta que se cumpla alguna condición y retorna su nombre (se evalúan en orden),
+        o None si vence el timeout. Reemplaza los sleeps fijos por esperas basadas en el DOM.
+        """
+        self._require_driver()
+
+        def _first_match(_driver: Any) -> Optional[str]:
+            for condition_name, condition in conditions.items():
+                try:
+                    if condition():
+                        return condition_name
+                except StaleElementReferenceException:
+                    continue
+            return None
+
+        condition_wait = WebDriverWait(
+            self.driver,
+            timeout if timeout is not None else self.config.wait_timeout,
+            poll_frequency=self.config.poll_frequency,
+        )
+        try:
+            return self._timed_until(condition_wait, _first_match)
+        except TimeoutException:
+            return None
 
     def click(self, by: By, value: str, delay_after: bool = True, retries: int = 2) -> None:
         """
@@ -170,12 +261,20 @@ class WebDriverWrapper:
         if self.driver is None or self.wait is None:
             raise RuntimeError("Driver not initialized. Call initialize_driver() first.")
 
+    def _timed_until(self, wait: WebDriverWait, condition: Callable[[Any], Any]) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return wait.until(condition)
+        finally:
+            self.wait_seconds += time.perf_counter() - started_at
+
     def _wait_document_ready(self) -> None:
         """Espera a que el documento esté listo (sin meter sleeps fijos)."""
         self._require_driver()
         try:
-            WebDriverWait(self.driver, self.config.wait_timeout).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
+            self._timed_until(
+                WebDriverWait(self.driver, self.config.wait_timeout, poll_frequency=self.config.poll_frequency),
+                lambda d: d.execute_script("return document.readyState") == "complete",
             )
         except TimeoutException:
             # No siempre es fatal (SPA). Se puede seguir, pero sin romper.
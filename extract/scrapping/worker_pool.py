@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Generic, List, Optional, Sequence, TypeVar
+
+from utils.logging import get_logger
+from extract.scrapping.rate_limiter import HostRateLimiter
+from extract.scrapping.session import ScraperSession
+from extract.scrapping.web_driver import ScraperConfig
+
+logger = get_logger()
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+_STOP = object()
+
+
+@dataclass
+class WorkerStats:
+    worker_name: str
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def items_per_minute(self) -> float:
+        return self.processed * 60.0 / self.busy_seconds if self.busy_seconds else 0.0
+
+
+class ScraperWorkerPool(Generic[ItemT, ResultT]):
+    """
+    Pool de N workers, cada uno con su propia ScraperSession (Chrome headless), alimentados
+    desde una cola. Todos comparten el mismo HostRateLimiter, así la carga sobre el sitio
+    queda acotada aunque aumente la cantidad de workers.
+    Los resultados se devuelven en el mismo orden de entrada.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        config: ScraperConfig,
+        rate_limiter: HostRateLimiter,
+        name: str = "scraper",
+        log_every: int = 10,
+    ):
+        self.workers = max(1, workers)
+        self.config = config
+        self.rate_limiter = rate_limiter
+        self.name = name
+        self.log_every = max(1, log_every)
+
+    def map(
+        self,
+        task: Callable[[ItemT, ScraperSession], ResultT],
+        items: Sequence[ItemT],
+    ) -> List[Optional[ResultT]]:
+        results: List[Optional[ResultT]] = [None] * len(items)
+        if not items:
+            return results
+
+        work_queue: "queue.Queue[object]" = queue.Queue()
+        for item_index, item in enumerate(items):
+            work_queue.put((item_index, item))
+
+        worker_count = min(self.workers, len(items))
+        for _ in range(worker_count):
+            work_queue.put(_STOP)
+
+        stats = [WorkerStats(worker_name=f"{self.name}-{worker_index}") for worker_index in range(worker_count)]
+        progress = {"done": 0}
+        progress_lock = threading.Lock()
+
+        def _worker(worker_stats: WorkerStats) -> None:
+            session = ScraperSession(self.config, name=worker_stats.worker_name, rate_limiter=self.rate_limiter)
+            try:
+                while True:
+                    queued = work_queue.get()
+                    if queued is _STOP:
+                        return
+                    item_index, item = queued  # type: ignore[misc]
+
+                    started_at = time.perf_counter()
+                    try:
+                        results[item_index] = task(item, session)
+                    except Exception as task_error:
+                        worker_stats.failed += 1
+                        logger.warning(f"[POOL] {worker_stats.worker_name} falló con {item!r}: {task_error}")
+                    worker_stats.busy_seconds += time.perf_counter() - started_at
+                    worker_stats.processed += 1
+
+                    with progress_lock:
+                        progress["done"] += 1
+                        done = progress["done"]
+                    if done % self.log_every == 0:
+                        logger.info(
+                            f"[POOL] {self.name}: {done}/{len(items)} listos, "
+                            f"cola={max(0, work_queue.qsize() - worker_count)}"
+                        )
+            finally:
+                session.close()
+
+        pool_started_at = time.perf_counter()
+        threads = [
+            threading.Thread(target=_worker, args=(worker_stats,), name=worker_stats.worker_name, daemon=True)
+            for worker_stats in stats
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self._log_stats(stats, time.perf_counter() - pool_started_at, len(items))
+        return results
+
+    def _log_stats(self, stats: List[WorkerStats], elapsed_seconds: float, total_items: int) -> None:
+        for worker_stats in stats:
+            logger.info(
+                f"[POOL] {worker_stats.worker_name}: procesados={worker_stats.processed} "
+                f"fallidos={worker_stats.failed} ocupado={worker_stats.busy_seconds:.1f}s "
+                f"({worker_stats.items_per_minute:.1f}/min)"
+            )
+        throughput = total_items * 60.0 / elapsed_seconds if elapsed_seconds else 0.0
+        logger.info(
+            f"[POOL] {self.name}: {total_items} items en {elapsed_seconds:.1f}s "
+            f"con {len(stats)} workers ({throughput:.1f}/min)"
+        )
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+INDEX_FORMAT_VERSION = 1
+# Años faltantes: desde desconocido = -inf, hasta desconocido (patrones "ON" / "12-") = +inf
+YEAR_MIN = np.iinfo(np.int16).min
+YEAR_MAX = np.iinfo(np.int16).max
+# Tolerancia al comparar litros (el catálogo los guarda como float32)
+LITERS_TOLERANCE = 0.05
+
+INDEX_COLUMNS = [
+    "compatibilidad_marca",
+    "compatibilidad_modelo",
+    "compatibilidad_anio_desde",
+    "compatibilidad_anio_hasta",
+    "compatibilidad_motor_litros",
+    "compatibilidad_codigo_motor",
+    "repuesto_sku",
+    "repuesto_oem",
+    "repuesto_nombre",
+]
+
+
+class CompatiblePart(NamedTuple):
+    # fila (0-based) en el catálogo escrito
+    row: int
+    sku: Optional[str]
+    oem: Optional[str]
+    nombre: Optional[str]
+    marca: Optional[str]
+    modelo: Optional[str]
+    anio_desde: Optional[int]
+    anio_hasta: Optional[int]
+    motor_litros: Optional[float]
+    codigo_motor: Optional[str]
+
+
+def _normalize_key(value: Optional[str]) -> str:
+    return "" if value is None else str(value).strip().upper()
+
+
+def _pack_strings(strings: List[str]) -> np.ndarray:
+    # tabla de textos como un solo bloque UTF-8 separado por \x00 (sin pickle al guardar)
+    return np.frombuffer("\x00".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_strings(packed: np.ndarray) -> List[str]:
+    return packed.tobytes().decode("utf-8").split("\x00")
+
+
+def _codes(values: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """Códigos int32 (-1 = nulo) y tabla de valores distintos."""
+    codes, uniques = pd.factorize(values)
+    return codes.astype(np.int32), [str(value) for value in uniques]
+
+
+class CompatibilityIndex:
+    """
+    Índice vehículo -> repuestos sobre el catálogo unificado. Cada (marca, modelo) es un
+    bucket (dict) con sus filas contiguas y ordenadas por año desde: para un año se corta
+    con búsqueda binaria las que empiezan antes y se filtra vectorizado por año hasta,
+    litros y código de motor. Un dato faltante en el catálogo (marca, años, litros, código)
+    no descarta la fila: puede servir igual.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._arrays = arrays
+        self._bucket_offsets = arrays["bucket_offsets"]
+        self._year_from = arrays["year_from"]
+        self._year_to = arrays["year_to"]
+        self._liters = arrays["motor_litros"]
+        self._engine_code = arrays["engine_code"]
+        self._row = arrays["row"]
+        self._tables: Dict[str, List[str]] = {}
+
+        bucket_keys = [tuple(key.split("\x1f")) for key in _unpack_strings(arrays["bucket_keys"])]
+        self._bucket_keys = bucket_keys[:len(self._bucket_offsets) - 1]
+        self._buckets: Dict[Tuple[str, str], int] = {key: bucket for bucket, key in enumerate(self._bucket_keys)}
+        self._buckets_by_model: Dict[str, List[int]] = {}
+        for bucket, (_, modelo) in enumerate(self._bucket_keys):
+            self._buckets_by_model.setdefault(modelo, []).append(bucket)
+        self._engine_codes = {code: code_id for code_id, code in enumerate(self._table("engine_code"))}
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+    @property
+    def bucket_count(self) -> int:
+        return len(self._bucket_keys)
+
+    def save(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as index_file:
+            np.savez(index_file, version=np.array(INDEX_FORMAT_VERSION), **self._arrays)
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> CompatibilityIndex:
+        with np.load(path, allow_pickle=False) as index_file:
+            arrays = {name: index_file[name] for name in index_file.files if name != "version"}
+            version = int(index_file["version"])
+        if version != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Versión de índice no soportada: {version} (esperada {INDEX_FORMAT_VERSION})")
+        return cls(arrays)
+
+    def _candidate_buckets(self, marca: Optional[str], modelo: str) -> List[int]:
+        modelo = _normalize_key(modelo)
+        if marca is None:
+            return self._buckets_by_model.get(modelo, [])
+        # filas sin marca (ej. formato aplicaciones) también pueden calzar por modelo
+        keys = dict.fromkeys([(_normalize_key(marca), modelo), ("", modelo)])
+        return [self._buckets[key] for key in keys if key in self._buckets]
+
+    def _match_positions(
+        self,
+        bucket: int,
+        year: Optional[int],
+        motor_litros: Optional[float],
+        codigo_motor: Optional[str],
+    ) -> np.ndarray:
+        start, end = int(self._bucket_offsets[bucket]), int(self._bucket_offsets[bucket + 1])
+        if year is not None:
+            # ordenadas por año desde: solo las que empiezan en o antes de `year`
+            end = start + int(np.searchsorted(self._year_from[start:end], year, side="right"))
+        mask = np.ones(end - start, dtype=bool)
+        if year is not None:
+            mask &= self._year_to[start:end] >= year
+        if motor_litros is not None:
+            liters = self._liters[start:end]
+            mask &= np.isnan(liters) | (np.abs(liters - motor_litros) < LITERS_TOLERANCE)
+        if codigo_motor is not None:
+            engine_code = self._engine_code[start:end]
+            code_id = self._engine_codes.get(_normalize_key(codigo_motor), -2)
+            mask &= (engine_code == -1) | (engine_code == code_id)
+        return start + np.flatnonzero(mask)
+
+    def query_rows(
+        self,
+        marca: Optional[str],
+        modelo: str,
+        year: Optional[int] = None,
+        motor_litros: Optional[float] = None,
+        codigo_motor: Optional[str] = None,
+    ) -> np.ndarray:
+        """Filas del catálogo (orden de salida) compatibles con el vehículo; marca None = cualquiera."""
+        positions = [
+            self._match_positions(bucket, year, motor_litros, codigo_motor)
+            for bucket in self._candidate_buckets(marca, modelo)
+        ]
+        if not positions:
+            return np.empty(0, dtype=self._row.dtype)
+        return np.sort(self._row[np.concatenate(positions)])
+
+    def query(
+        self,
+        marca: Optional[str],
+        modelo: str,
+        year: Optional[int] = None,
+        motor_litros: Optional[float] = None,
+        codigo_motor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[CompatiblePart]:
+        """
+        Como `query_rows`, con los datos del repuesto y de la compatibilidad de cada fila
+        (las primeras `limit` en orden de catálogo). Armar cada resultado cuesta ~2 µs:
+        para miles de filas conviene `query_rows` o paginar con `limit`.
+        """
+        buckets = self._candidate_buckets(marca, modelo)
+        if not buckets:
+            return []
+        positions = [self._match_positions(bucket, year, motor_litros, codigo_motor) for bucket in buckets]
+        bucket_ids = np.repeat(buckets, [len(bucket_positions) for bucket_positions in positions])
+        positions = np.concatenate(positions)
+        order = np.argsort(self._row[positions], kind="stable")[:limit]
+        positions, bucket_ids = positions[order], bucket_ids[order]
+
+        # columnas completas como listas y un solo zip: mucho más rápido que armar fila por fila
+        bucket_keys = [self._bucket_keys[bucket] for bucket in bucket_ids.tolist()]
+        return list(map(CompatiblePart._make, zip(
+            self._row[positions].tolist(),
+            self._texts("sku", self._arrays["sku"][positions]),
+            self._texts("oem", self._arrays["oem"][positions]),
+            self._texts("nombre", self._arrays["nombre"][positions]),
+            [bucket_marca or None for bucket_marca, _ in bucket_keys],
+            [bucket_modelo or None for _, bucket_modelo in bucket_keys],
+            _optional_years(self._year_from[positions], YEAR_MIN),
+            _optional_years(self._year_to[positions], YEAR_MAX),
+            # float32 -> valor corto (1.6 y no 1.600000023841858)
+            [None if np.isnan(liters) else liters for liters in self._liters[positions].astype(np.float64).round(3).tolist()],
+            self._texts("engine_code", self._engine_code[positions]),
+        )))
+
+    def _table(self, name: str) -> List[Optional[str]]:
+        # tablas de textos (SKU, OEM, nombres): se decodifican recién en la primera consulta que las usa;
+        # el None final es el valor del código -1 (nulo)
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = [*_unpack_strings(self._arrays[f"{name}_table"]), None]
+        return table
+
+    def _texts(self, name: str, codes: np.ndarray) -> List[Optional[str]]:
+        table = self._table(name)
+        return [table[code] for code in codes.tolist()]
+
+
+def _optional_years(years: np.ndarray, missing: int) -> List[Optional[int]]:
+    return [None if year == missing else year for year in years.tolist()]
+
+
+class CompatibilityIndexBuilder:
+    """
+    Junta las columnas de compatibilidad de cada chunk escrito (en el mismo orden que la
+    salida, así `row` apunta a la fila del catálogo) y arma el índice al final.
+    """
+
+    def __init__(self):
+        self.rows_seen = 0
+        self._chunks: List[pd.DataFrame] = []
+
+    def add(self, data_frame: pd.DataFrame) -> None:
+        chunk = data_frame.reindex(columns=INDEX_COLUMNS)
+        chunk.index = pd.RangeIndex(self.rows_seen, self.rows_seen + len(chunk))
+        self.rows_seen += len(chunk)
+        # sin marca ni modelo no hay vehículo que buscar
+        has_vehicle = chunk["compatibilidad_marca"].notna() | chunk["compatibilidad_modelo"].notna()
+        self._chunks.append(chunk[has_vehicle.to_numpy()])
+
+    def build(self) -> CompatibilityIndex:
+        if self._chunks:
+            catalog = pd.concat(
+                [chunk.astype({"compatibilidad_marca": "str", "compatibilidad_modelo": "str"}) for chunk in self._chunks]
+            )
+        else:
+            catalog = pd.DataFrame(columns=INDEX_COLUMNS)
+        self._chunks = []
+
+        marcas = catalog["compatibilidad_marca"].fillna("").str.strip().str.upper()
+        modelos = catalog["compatibilidad_modelo"].fillna("").str.strip().str.upper()
+        bucket_codes, bucket_keys = _codes(marcas + "\x1f" + modelos)
+        year_from = pd.to_numeric(catalog["compatibilidad_anio_desde"]).fillna(YEAR_MIN).to_numpy(np.int16)
+        year_to = pd.to_numeric(catalog["compatibilidad_anio_hasta"]).fillna(YEAR_MAX).to_numpy(np.int16)
+
+        # filas contiguas por bucket y, dentro de cada uno, por año desde
+        order = np.lexsort((year_from, bucket_codes))
+        bucket_offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(bucket_codes, minlength=len(bucket_keys)))]
+        ).astype(np.int64)
+
+        engine_codes = catalog["compatibilidad_codigo_motor"].str.strip().str.upper()
+        engine_code, engine_code_table = _codes(engine_codes)
+        sku, sku_table = _codes(catalog["repuesto_sku"])
+        oem, oem_table = _codes(catalog["repuesto_oem"])
+        nombre, nombre_table = _codes(catalog["repuesto_nombre"])
+
+        return CompatibilityIndex({
+            "bucket_keys": _pack_strings(bucket_keys),
+            "bucket_offsets": bucket_offsets,
+            "year_from": year_from[order],
+            "year_to": year_to[order],
+            "motor_litros": pd.to_numeric(catalog["compatibilidad_motor_litros"]).to_numpy(np.float32, na_value=np.nan)[order],
+            "engine_code": engine_code[order],
+            "engine_code_table": _pack_strings(engine_code_table),
+            "row": catalog.index.to_numpy(np.int32 if self.rows_seen < 2**31 else np.int64)[order],
+            "sku": sku[order],
+            "sku_table": _pack_strings(sku_table),
+            "oem": oem[order],
+            "oem_table": _pack_strings(oem_table),
+            "nombre": nombre[order],
+            "nombre_table": _pack_strings(nombre_table),
+        })
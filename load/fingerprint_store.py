@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable
+
+from utils.logging import get_logger
+
+logger = get_logger()
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS row_fingerprints (
+    sheet_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    source_rows INTEGER NOT NULL,
+    output_rows TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (sheet_name, row_key)
+)
+"""
+
+
+@dataclass(frozen=True)
+class StoredRows:
+    content_hash: str
+    # filas de la hoja con esta llave (para contar eliminadas)
+    source_rows: int
+    # salida generada desde esas filas, como JSON (lista de registros)
+    output_rows: str
+
+
+class RowFingerprintStore:
+    """
+    Estado de la corrida incremental (SQLite): por hoja y llave de fila (SKU/OEM/CODIGO)
+    guarda el hash del contenido de origen y las filas de salida que produjo.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path))
+        self._connection.execute(SCHEMA_SQL)
+        self._connection.commit()
+
+    def load_sheet(self, sheet_name: str) -> Dict[str, StoredRows]:
+        stored_rows = self._connection.execute(
+            "SELECT row_key, content_hash, source_rows, output_rows FROM row_fingerprints WHERE sheet_name = ?",
+            (sheet_name,),
+        ).fetchall()
+        return {
+            row_key: StoredRows(content_hash, source_rows, output_rows)
+            for row_key, content_hash, source_rows, output_rows in stored_rows
+        }
+
+    def save_sheet_changes(
+        self,
+        sheet_name: str,
+        upserts: Dict[str, StoredRows],
+        removed_keys: Iterable[str],
+    ) -> None:
+        now = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO row_fingerprints "
+                "(sheet_name, row_key, content_hash, source_rows, output_rows, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (sheet_name, row_key, stored.content_hash, stored.source_rows, stored.output_rows, now)
+                    for row_key, stored in upserts.items()
+                ],
+            )
+            self._connection.executemany(
+                "DELETE FROM row_fingerprints WHERE sheet_name = ? AND row_key = ?",
+                [(sheet_name, row_key) for row_key in removed_keys],
+            )
+
+    def remove_other_sheets(self, sheet_names: Iterable[str]) -> int:
+        """Borra el estado de las hojas que ya no vienen en el libro. Retorna las llaves borradas."""
+        sheet_names = list(sheet_names)
+        placeholders = ",".join("?" for _ in sheet_names) or "''"
+        with self._connection:
+            removed = self._connection.execute(
+                f"DELETE FROM row_fingerprints WHERE sheet_name NOT IN ({placeholders})", sheet_names
+            ).rowcount
+        if removed:
+            logger.info(f"[INCREMENTAL] {removed} llaves de hojas que ya no están en el libro eliminadas")
+        return removed
+
+    def close(self) -> None:
+        self._connection.close()
@@ -1,9 +1,81 @@
 from __future__ import annotations
+import shutil
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Optional, Sequence, TextIO
+from urllib.parse import quote
+import numpy as np
 import pandas as pd
 
+from constants.output import (
+    OUTPUT_CATEGORY_COLUMNS,
+    OUTPUT_FLOAT_COLUMNS,
+    OUTPUT_INTEGER_COLUMNS,
+    OUTPUT_SCHEMA,
+    OUTPUT_YEAR_COLUMNS,
+)
+from utils.dataframe import conform_output_chunk
+
+# Filas por hoja de Excel (incluye el encabezado); al llegar al límite se abre otra hoja
+XLSX_MAX_ROWS = 1_048_576
+XLSX_SHEET_NAME = "catalogo"
+# Filas que se pasan a objetos Python a la vez (acota la memoria aunque el chunk sea grande)
+XLSX_BATCH_ROWS = 10_000
+
+# Columnas con pocos valores distintos: codificación diccionario en el dataset Parquet
+# (el resto, SKU / OEM / textos libres, casi no se repite y va plano)
+PARQUET_DICTIONARY_COLUMNS = (
+    OUTPUT_CATEGORY_COLUMNS
+    + OUTPUT_FLOAT_COLUMNS
+    + OUTPUT_YEAR_COLUMNS
+    + OUTPUT_INTEGER_COLUMNS
+    + ["compatibilidad_codigo_motor", "paginas_de_informacion"]
+)
+# Valor de partición para nulos, el mismo que usa pyarrow con particiones hive
+PARQUET_NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+@dataclass(frozen=True)
+class ParquetDatasetConfig:
+    # Columnas de partición (carpetas columna=valor), en orden
+    partition_columns: tuple[str, ...] = ("proveedor", "formato_origen")
+    # Orden de las filas dentro de cada row group (estadísticas min/max más acotadas)
+    sort_columns: tuple[str, ...] = ("compatibilidad_marca", "compatibilidad_modelo", "compatibilidad_anio_desde")
+    row_group_rows: int = 100_000
+    compression: str = "zstd"
+    compression_level: Optional[int] = None
+    # Bloom filters por row group (ej. ("repuesto_oem", "repuesto_sku")); () = sin bloom filters
+    bloom_filter_columns: tuple[str, ...] = ()
+    bloom_filter_fpp: float = 0.05
+
+
+def _float32_as_float64(data_frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    JSON y Excel escriben float32 con el ruido de la conversión a double (1.6 -> 1.600000023...);
+    se pasa por texto para conservar el valor corto.
+    """
+    float32_columns = [column_name for column_name, dtype in data_frame.dtypes.items() if dtype == "float32"]
+    if not float32_columns:
+        return data_frame
+    return data_frame.assign(**{
+        column_name: _widen_float32(data_frame[column_name]) for column_name in float32_columns
+    })
+
+
+def _widen_float32(series: pd.Series) -> pd.Series:
+    # pocos valores distintos (medidas, litros): se convierte cada único una sola vez
+    codes, uniques = pd.factorize(series)
+    widened = pd.to_numeric(pd.Series(uniques, dtype="float32").astype("str")).to_numpy(dtype="float64")
+    # nulos: código -1 -> el NaN agregado al final
+    return pd.Series(np.append(widened, np.nan)[codes], index=series.index)
+
+
 def write_output(
-    data_frame: pd.DataFrame, output_dir: Path, output_format: str = "csv"
+    data_frame: pd.DataFrame,
+    output_dir: Path,
+    output_format: str = "csv",
+    parquet_dataset: Optional[ParquetDatasetConfig] = None,
 ) -> Path:
     output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -17,14 +89,325 @@ def write_output(
         data_frame.to_parquet(output_path, index=False)
         return output_path
 
+    if output_format == "parquet_dataset":
+        # todo el catálogo en un solo write: cada partición queda ordenada completa
+        with ParquetDatasetWriter(output_dir, data_frame.columns, parquet_dataset) as writer:
+            writer.write(data_frame)
+        return writer.output_path
+
     if output_format == "json":
         output_path = output_dir / "catalog_unificado.json"
-        data_frame.to_json(output_path, orient="records", force_ascii=False)
+        _float32_as_float64(data_frame).to_json(output_path, orient="records", force_ascii=False)
         return output_path
 
-    if output_format in ("xlsx", "excel"):
-        output_path = output_dir / "catalog_unificado.xlsx"
-        data_frame.to_excel(output_path, index=False)
+    if output_format == "ndjson":
+        output_path = output_dir / "catalog_unificado.ndjson"
+        _float32_as_float64(data_frame).to_json(output_path, orient="records", lines=True, force_ascii=False)
         return output_path
 
+    if output_format in ("xlsx", "excel"):
+        # openpyxl write_only: memoria constante y hojas extra pasado el límite de filas
+        with XlsxIncrementalWriter(output_dir, data_frame.columns) as writer:
+            writer.write(data_frame)
+        return writer.output_path
+
     raise ValueError(f"Formato no soportado: {output_format}")
+
+
+class IncrementalWriter(ABC):
+    """
+    Escritura de la salida chunk a chunk con memoria acotada: cada `write` conforma el
+    chunk al esquema fijo (`columns`) y lo agrega al archivo con `_write_chunk`, que cada
+    formato debe implementar. Usar como context manager.
+    """
+
+    extension = ""
+
+    def __init__(self, output_dir: Path, columns: Sequence[str]):
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self.columns = list(columns)
+        self.output_path = output_dir / f"catalog_unificado.{self.extension}"
+        self.chunks_written = 0
+        self.rows_written = 0
+
+    def write(self, data_frame: pd.DataFrame) -> None:
+        conformed = conform_output_chunk(data_frame, self.columns)
+        self._write_chunk(conformed)
+        self.chunks_written += 1
+        self.rows_written += len(conformed)
+
+    @abstractmethod
+    def _write_chunk(self, data_frame: pd.DataFrame) -> None:
+        ...
+
+    def close(self) -> Path:
+        return self.output_path
+
+    def __enter__(self) -> IncrementalWriter:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class _TextFileWriter(IncrementalWriter):
+    def __init__(self, output_dir: Path, columns: Sequence[str]):
+        super().__init__(output_dir, columns)
+        self._file: Optional[TextIO] = open(self.output_path, "w", encoding="utf-8", newline="")
+
+    def close(self) -> Path:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        return self.output_path
+
+
+class CsvIncrementalWriter(_TextFileWriter):
+    extension = "csv"
+
+    def _write_chunk(self, data_frame: pd.DataFrame) -> None:
+        # encabezado solo en el primer chunk (aunque venga vacío)
+        data_frame.to_csv(self._file, index=False, header=self.chunks_written == 0)
+
+
+class NdjsonIncrementalWriter(_TextFileWriter):
+    extension = "ndjson"
+
+    def _write_chunk(self, data_frame: pd.DataFrame) -> None:
+        if data_frame.empty:
+            return
+        lines = _float32_as_float64(data_frame).to_json(orient="records", lines=True, force_ascii=False)
+        self._file.write(lines if lines.endswith("\n") else lines + "\n")
+
+
+class JsonIncrementalWriter(_TextFileWriter):
+    """Mismo JSON (lista de registros) que write_output, armado por partes."""
+
+    extension = "json"
+
+    def __init__(self, output_dir: Path, columns: Sequence[str]):
+        super().__init__(output_dir, columns)
+        self._file.write("[")
+        self._has_records = False
+
+    def _write_chunk(self, data_frame: pd.DataFrame) -> None:
+        if data_frame.empty:
+            return
+        records = _float32_as_float64(data_frame).to_json(orient="records", force_ascii=False)[1:-1]
+        self._file.write(("," if self._has_records else "") + records)
+        self._has_records = True
+
+    def close(self) -> Path:
+        if self._file is not None:
+            self._file.write("]")
+        return super().close()
+
+
+class ParquetIncrementalWriter(IncrementalWriter):
+    """Un row group por chunk con pyarrow.parquet.ParquetWriter."""
+
+    extension = "parquet"
+
+    def __init__(self, output_dir: Path, columns: Sequence[str]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        super().__init__(output_dir, columns)
+        # metadata pandas de un chunk vacío: al leer se recuperan category / Int16 / Int8
+        pandas_metadata = pa.Schema.from_pandas(
+            conform_output_chunk(pd.DataFrame(), self.columns), preserve_index=False
+        ).metadata
+        self._schema = pa.schema(
+            [(column_name, _arrow_type(column_name)) for column_name in self.columns], metadata=pandas_metadata
+        )
+        self._writer = pq.ParquetWriter(self.output_path, self._schema)
+
+    def _write_chunk(self, data_frame: pd.DataFrame) -> None:
+        import pyarrow as pa
+
+        if data_frame.empty:
+            return
+        self._writer.write_table(pa.Table.from_pandas(data_frame, schema=self._schema, preserve_index=False))
+
+    def close(self) -> Path:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.output_path
+
+
+class XlsxIncrementalWriter(IncrementalWriter):
+    """
+    openpyxl en modo write_only: cada fila se vuelca a disco al agregarla, sin guardar el
+    libro en memoria. El encabezado va una vez por hoja; al llenar `max_rows` filas
+    (encabezado incluido) se continúa en `catalogo_2`, `catalogo_3`, ...
+    """
+
+    extension = "xlsx"
+
+    def __init__(self, output_dir: Path, columns: Sequence[str], max_rows: int = XLSX_MAX_ROWS):
+        from openpyxl import Workbook
+
+        super().__init__(output_dir, columns)
+        self.max_rows = max_rows
+        self.sheets_written = 0
+        self._workbook = Workbook(write_only=True)
+        self._sheet = None
+        self._sheet_rows = 0
+        self._new_sheet()
+
+    def _new_sheet(self) -> None:
+        self.sheets_written += 1
+        sheet_name = XLSX_SHEET_NAME if self.sheets_written == 1 else f"{XLSX_SHEET_NAME}_{self.sheets_written}"
+        self._sheet = self._workbook.create_sheet(sheet_name)
+        self._sheet.append(self.columns)
+        self._sheet_rows = 1
+
+    def _write_chunk(self, data_frame: pd.DataFrame) -> None:
+        for batch_start in range(0, len(data_frame), XLSX_BATCH_ROWS):
+            # celdas como escalares Python; nulos (NaN / NA) -> celda vacía
+            batch = _float32_as_float64(data_frame.iloc[batch_start:batch_start + XLSX_BATCH_ROWS]).astype(object)
+            batch = batch.where(batch.notna(), None)
+            for row in batch.itertuples(index=False, name=None):
+                if self._sheet_rows >= self.max_rows:
+                    self._new_sheet()
+                self._sheet.append(row)
+                self._sheet_rows += 1
+
+    def close(self) -> Path:
+        if self._workbook is not None:
+            self._workbook.save(self.output_path)
+            self._workbook = None
+        return self.output_path
+
+
+class ParquetDatasetWriter(IncrementalWriter):
+    """
+    Dataset Parquet particionado estilo hive en `catalog_unificado/` (ej.
+    `proveedor=proveedor_1/formato_origen=.../part-0.parquet`), un ParquetWriter abierto
+    por partición. Cada chunk se ordena por `sort_columns` antes de cortarlo en row groups,
+    así las estadísticas min/max (y los bloom filters opcionales) permiten saltear row
+    groups al filtrar. Se lee con `pd.read_parquet(ruta, filters=[...])`; las columnas de
+    partición vuelven al final, como category.
+    """
+
+    def __init__(self, output_dir: Path, columns: Sequence[str], options: Optional[ParquetDatasetConfig] = None):
+        import pyarrow as pa
+
+        super().__init__(output_dir, columns)
+        self.options = options or ParquetDatasetConfig()
+        self.output_path = output_dir / "catalog_unificado"
+        # la corrida anterior podría dejar particiones que ya no existen
+        if self.output_path.is_dir():
+            shutil.rmtree(self.output_path)
+        self.output_path.mkdir()
+
+        self.partition_columns = [column for column in self.options.partition_columns if column in self.columns]
+        self._file_columns = [column for column in self.columns if column not in self.partition_columns]
+        self._sort_columns = [column for column in self.options.sort_columns if column in self._file_columns]
+        pandas_metadata = pa.Schema.from_pandas(
+            conform_output_chunk(pd.DataFrame(), self._file_columns), preserve_index=False
+        ).metadata
+        self._schema = pa.schema(
+            [(column_name, _arrow_type(column_name)) for column_name in self._file_columns], metadata=pandas_metadata
+        )
+        self._writers: dict[tuple[str, ...], Any] = {}
+
+    def _partition_writer(self, partition_values: tuple[str, ...]) -> Any:
+        import pyarrow.parquet as pq
+
+        writer = self._writers.get(partition_values)
+        if writer is None:
+            partition_dir = self.output_path.joinpath(*(
+                f"{column}={quote(value, safe='')}" for column, value in zip(self.partition_columns, partition_values)
+            ))
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(
+                partition_dir / "part-0.parquet",
+                self._schema,
+                compression=self.options.compression,
+                compression_level=self.options.compression_level,
+                use_dictionary=[column for column in self._file_columns if column in PARQUET_DICTIONARY_COLUMNS],
+                write_statistics=True,
+                write_page_index=True,
+                sorting_columns=[
+                    pq.SortingColumn(self._file_columns.index(column)) for column in self._sort_columns
+                ] or None,
+                bloom_filter_options={
+                    column: {"ndv": self.options.row_group_rows, "fpp": self.options.bloom_filter_fpp}
+                    for column in self.options.bloom_filter_columns
+                    if column in self._file_columns
+                } or None,
+            )
+            self._writers[partition_values] = writer
+        return writer
+
+    def _write_chunk(self, data_frame: pd.DataFrame) -> None:
+        import pyarrow as pa
+
+        if data_frame.empty:
+            return
+        if self._sort_columns:
+            # categorías por orden alfabético: el orden de filas coincide con el min/max de Parquet
+            data_frame = data_frame.sort_values(
+                self._sort_columns,
+                kind="stable",
+                key=lambda column: (
+                    column.cat.set_categories(sorted(column.cat.categories))
+                    if isinstance(column.dtype, pd.CategoricalDtype) else column
+                ),
+            )
+        if self.partition_columns:
+            partition_keys = data_frame[self.partition_columns].astype("str").fillna(PARQUET_NULL_PARTITION)
+            groups = data_frame.groupby([partition_keys[column] for column in self.partition_columns], sort=False)
+        else:
+            groups = [((), data_frame)]
+        for partition_values, partition_data_frame in groups:
+            table = pa.Table.from_pandas(
+                partition_data_frame[self._file_columns], schema=self._schema, preserve_index=False
+            )
+            self._partition_writer(tuple(partition_values)).write_table(
+                table, row_group_size=self.options.row_group_rows
+            )
+
+    def close(self) -> Path:
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+        return self.output_path
+
+
+def _arrow_type(column_name: str) -> Any:
+    import pyarrow as pa
+
+    dtype = OUTPUT_SCHEMA.get(column_name, "str")
+    if dtype == "category":
+        # diccionario por row group: las categorías pueden variar entre chunks
+        return pa.dictionary(pa.int32(), pa.string())
+    arrow_types = {"float32": pa.float32(), "Int16": pa.int16(), "Int8": pa.int8(), "bool": pa.bool_()}
+    return arrow_types.get(dtype, pa.string())
+
+
+INCREMENTAL_WRITERS: dict[str, type[IncrementalWriter]] = {
+    "csv": CsvIncrementalWriter,
+    "parquet": ParquetIncrementalWriter,
+    "json": JsonIncrementalWriter,
+    "ndjson": NdjsonIncrementalWriter,
+    "xlsx": XlsxIncrementalWriter,
+    "excel": XlsxIncrementalWriter,
+    "parquet_dataset": ParquetDatasetWriter,
+}
+
+
+def open_incremental_writer(
+    output_dir: Path,
+    output_format: str,
+    columns: Sequence[str],
+    parquet_dataset: Optional[ParquetDatasetConfig] = None,
+) -> IncrementalWriter:
+    writer_class = INCREMENTAL_WRITERS.get(output_format)
+    if writer_class is None:
+        raise ValueError(f"Formato no soportado para escritura incremental: {output_format}")
+    if writer_class is ParquetDatasetWriter:
+        return ParquetDatasetWriter(output_dir, columns, parquet_dataset)
+    return writer_class(output_dir, columns)
@@ -1,6 +1,12 @@
 from __future__ import annotations
+import multiprocessing
 import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
 import pandas as pd
 
 from config import ETLConfig
@@ -12,16 +18,29 @@ from constants.formats import (
 )
 from constants.output import OUTPUT_COLUMN_ORDER
 from detect.format_detector import detectar_formato
-from extract.excel_reader import read_all_sheets
-from load.writer import write_output
+from extract.excel_reader import SheetData, iter_sheet_chunks, read_all_sheets, read_sheet_headers
+from extract.oem_cache import OemCacheConfig, OemEnrichmentCache
+from extract.oem_enrichment import ENRICHMENT_TIMINGS, reset_enrichment_timings
+from extract.OpenAI.oem_llm_async import AsyncLlmConfig
+from load.compatibility_index import CompatibilityIndexBuilder
+from load.fingerprint_store import RowFingerprintStore
+from load.writer import ParquetDatasetConfig, open_incremental_writer, write_output
 from transform.formats.formato_aplicaciones import procesar_formato_aplicaciones
 from transform.formats.formato_completo import procesar_formato_completo_a_tabla_unica
 from transform.formats.formato_nombre_embebido import (
     procesar_formato_nombre_embebido_a_tabla_unica,
 )
 from transform.formats.formato_oem_solo import procesar_formato_oem_solo
-from utils.dataframe import reorder_columns
+from transform.incremental import procesar_hoja_incremental
+from transform.oems_conocidos import IndiceOemConocidos
+from transform.parse_cache import ParseStatsSnapshot, log_parse_stats, merge_parse_stats, snapshot_parse_stats
+from utils.dataframe import concat_output_chunks, conform_output_chunk, reorder_columns
 from utils.logging import get_logger
+from utils.row_dedup import RowDeduplicator
+from utils.run_report import RunReport
+
+if TYPE_CHECKING:
+    from extract.scrapping.session import ScraperSession
 
 logger = get_logger()
 
@@ -31,70 +50,583 @@ PROCESSORS = {
     FORMAT_NOMBRE_EMBEBIDO: procesar_formato_nombre_embebido_a_tabla_unica,
 }
 
-def run(config: ETLConfig) -> Path:
-    sheet_data_list = read_all_sheets(config.input_path)
-    processed_outputs: list[pd.DataFrame] = []
+def _open_oem_cache(config: ETLConfig) -> Optional[OemEnrichmentCache]:
+    if config.oem_cache_path is None:
+        return None
+    return OemEnrichmentCache(
+        OemCacheConfig(
+            path=config.oem_cache_path,
+            ttl_hours=config.oem_cache_ttl_hours,
+            negative_ttl_hours=config.oem_cache_negative_ttl_hours,
+            max_entries=config.oem_cache_max_entries,
+        )
+    )
 
-    for sheet_data in sheet_data_list:
-        detected_format = detectar_formato(sheet_data.data_frame)
 
-        if not detected_format:
-            logger.info(
-                f"Hoja '{sheet_data.sheet_name}' ignorada. "
-                f"Columnas detectadas={list(sheet_data.data_frame.columns)}"
-            )
-            continue
+def _async_llm_config(config: ETLConfig) -> Optional[AsyncLlmConfig]:
+    if config.llm_concurrency <= 1:
+        return None
+    return AsyncLlmConfig(
+        max_concurrency=config.llm_concurrency,
+        requests_per_minute=config.llm_requests_per_minute,
+        tokens_per_minute=config.llm_tokens_per_minute,
+    )
 
-        if detected_format.format_key == FORMAT_OEM_SOLO:
-            logger.info(
-                f"Procesando hoja '{sheet_data.sheet_name}' "
-                f"con formato='{detected_format.format_key}' ({detected_format.reason})"
-            )
-            processed_data_frame = procesar_formato_oem_solo(
-                sheet_data.data_frame,
-                sheet_data.sheet_name,
-                use_llm=config.use_llm,
-            )
-            processed_outputs.append(processed_data_frame)
-            continue
-
-        processor = PROCESSORS.get(detected_format.format_key)
-        if not processor:
-            logger.warning(
-                f"Formato detectado pero sin processor: {detected_format.format_key} "
-                f"(Hoja={sheet_data.sheet_name})"
-            )
-            continue
 
+def _parquet_dataset_config(config: ETLConfig) -> ParquetDatasetConfig:
+    return ParquetDatasetConfig(
+        partition_columns=config.parquet_partition_columns,
+        sort_columns=config.parquet_sort_columns,
+        row_group_rows=config.parquet_row_group_rows,
+        bloom_filter_columns=config.parquet_bloom_filter_columns,
+    )
+
+
+def _run_processor(format_key: str, data_frame: pd.DataFrame, sheet_name: str) -> tuple[pd.DataFrame, float, float]:
+    """
+    Processor CPU de una hoja (salida ya casteada a OUTPUT_SCHEMA) + su tiempo de reloj y de
+    CPU; a nivel de módulo para poder enviarlo al pool de procesos.
+    """
+    started_at, cpu_started_at = time.perf_counter(), time.process_time()
+    processed_data_frame = conform_output_chunk(PROCESSORS[format_key](data_frame, sheet_name), OUTPUT_COLUMN_ORDER)
+    return processed_data_frame, time.perf_counter() - started_at, time.process_time() - cpu_started_at
+
+
+def _run_processor_in_pool(
+    format_key: str, data_frame: pd.DataFrame, sheet_name: str
+) -> tuple[pd.DataFrame, float, float, ParseStatsSnapshot]:
+    """`_run_processor` en un proceso del pool: suma las stats [PARSE] del proceso para el principal."""
+    return (*_run_processor(format_key, data_frame, sheet_name), snapshot_parse_stats())
+
+
+@dataclass
+class _SheetTiming:
+    format_key: str
+    chunks: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+
+
+def _record_sheet_time(
+    sheet_timings: dict[str, _SheetTiming],
+    sheet_name: str,
+    processed_data_frame: pd.DataFrame,
+    elapsed_seconds: float,
+) -> None:
+    sheet_timing = sheet_timings[sheet_name]
+    sheet_timing.chunks += 1
+    sheet_timing.rows += len(processed_data_frame)
+    sheet_timing.seconds += elapsed_seconds
+
+
+def _log_sheet_times(sheet_timings: dict[str, _SheetTiming]) -> None:
+    for sheet_name, sheet_timing in sheet_timings.items():
+        logger.info(
+            f"[SHEETS] Hoja '{sheet_name}' ({sheet_timing.format_key}): {sheet_timing.rows} filas "
+            f"en {sheet_timing.seconds:.2f}s ({sheet_timing.chunks} chunk(s))"
+        )
+
+
+def _process_oem_sheet(
+    sheet_data: SheetData,
+    config: ETLConfig,
+    scraper_session: Optional[ScraperSession],
+    oem_cache: Optional[OemEnrichmentCache],
+    known_oems: Optional[IndiceOemConocidos] = None,
+) -> tuple[pd.DataFrame, float]:
+    started_at = time.perf_counter()
+    processed_data_frame = procesar_formato_oem_solo(
+        sheet_data.data_frame,
+        sheet_data.sheet_name,
+        use_llm=config.use_llm,
+        cache=oem_cache,
+        session=scraper_session,
+        workers=config.scraper_workers,
+        requests_per_second=config.scraper_requests_per_second,
+        llm_batch_size=config.llm_batch_size,
+        async_llm=_async_llm_config(config),
+        oems_conocidos=known_oems,
+    )
+    processed_data_frame = conform_output_chunk(processed_data_frame, OUTPUT_COLUMN_ORDER)
+    return processed_data_frame, time.perf_counter() - started_at
+
+
+class _OrderedOutputs:
+    """Salidas por posición de hoja/chunk; entrega en orden original las que ya están listas."""
+
+    def __init__(self, sheet_timings: dict[str, _SheetTiming], known_oems: Optional[IndiceOemConocidos] = None):
+        self.sheet_timings = sheet_timings
+        # OEM de las hojas completo / nombre embebido para la hoja solo OEM
+        self.known_oems = known_oems
+        self._expected: deque[int] = deque()
+        self._ready: dict[int, pd.DataFrame] = {}
+
+    def expect(self, position: int) -> None:
+        self._expected.append(position)
+
+    def put(self, position: int, sheet_name: str, result: tuple[pd.DataFrame, float]) -> None:
+        processed_data_frame, elapsed_seconds = result[0], result[1]
+        _record_sheet_time(self.sheet_timings, sheet_name, processed_data_frame, elapsed_seconds)
+        if self.known_oems is not None:
+            self.known_oems.agregar_salida(processed_data_frame)
+        self._ready[position] = processed_data_frame
+
+    def pop_ready(self) -> Iterator[pd.DataFrame]:
+        while self._expected and self._expected[0] in self._ready:
+            yield self._ready.pop(self._expected.popleft())
+
+
+def _detect_sheet_format(
+    sheet_data: SheetData, sheet_timings: dict[str, _SheetTiming], ignored_sheets: set[str]
+) -> Optional[str]:
+    """Formato a aplicar a la hoja/chunk, o None si se ignora. Loguea una vez por hoja."""
+    if sheet_data.sheet_name in ignored_sheets:
+        return None
+    detected_format = detectar_formato(sheet_data.data_frame)
+
+    if not detected_format:
+        logger.info(
+            f"Hoja '{sheet_data.sheet_name}' ignorada. "
+            f"Columnas detectadas={list(sheet_data.data_frame.columns)}"
+        )
+        ignored_sheets.add(sheet_data.sheet_name)
+        return None
+
+    if detected_format.format_key != FORMAT_OEM_SOLO and detected_format.format_key not in PROCESSORS:
+        logger.warning(
+            f"Formato detectado pero sin processor: {detected_format.format_key} "
+            f"(Hoja={sheet_data.sheet_name})"
+        )
+        ignored_sheets.add(sheet_data.sheet_name)
+        return None
+
+    if sheet_data.sheet_name not in sheet_timings:
         logger.info(
             f"Procesando hoja '{sheet_data.sheet_name}' "
             f"con formato='{detected_format.format_key}' ({detected_format.reason})"
         )
+        sheet_timings[sheet_data.sheet_name] = _SheetTiming(detected_format.format_key)
+    return detected_format.format_key
 
-        processed_data_frame = processor(sheet_data.data_frame, sheet_data.sheet_name)
-        processed_outputs.append(processed_data_frame)
 
-    if not processed_outputs:
-        raise RuntimeError("No se generó ninguna salida procesable.")
+def _transform_stage(report: RunReport, sheet_data: SheetData, run: Callable[[], tuple]) -> tuple:
+    """Corre un processor en este proceso como etapa `transform:<hoja>` del reporte."""
+    with report.stage(f"transform:{sheet_data.sheet_name}", rows_in=len(sheet_data.data_frame)) as stage:
+        result = run()
+        stage.rows_out = len(result[0])
+    return result
+
+
+def _put_pool_result(
+    outputs: _OrderedOutputs, report: RunReport, position: int, sheet_name: str, rows_in: int, future: Future
+) -> None:
+    processed_data_frame, elapsed_seconds, cpu_seconds, parse_stats = future.result()
+    merge_parse_stats(parse_stats)
+    # medido en el proceso hijo: sin memoria
+    report.record(
+        f"transform:{sheet_name}", elapsed_seconds, cpu_seconds, rows_in=rows_in, rows_out=len(processed_data_frame)
+    )
+    outputs.put(position, sheet_name, (processed_data_frame, elapsed_seconds))
+
+
+def _collect_finished(
+    futures: dict[int, tuple[Future, str, int]], outputs: _OrderedOutputs, report: RunReport, wait_all: bool = False
+) -> None:
+    for position in list(futures):
+        future, sheet_name, rows_in = futures[position]
+        if wait_all or future.done():
+            _put_pool_result(outputs, report, position, sheet_name, rows_in, future)
+            del futures[position]
+
+
+def _detect_stage(
+    report: RunReport, sheet_data: SheetData, sheet_timings: dict[str, _SheetTiming], ignored_sheets: set[str]
+) -> Optional[str]:
+    with report.stage("detect", rows_in=len(sheet_data.data_frame)) as stage:
+        format_key = _detect_sheet_format(sheet_data, sheet_timings, ignored_sheets)
+        stage.rows_out = len(sheet_data.data_frame) if format_key else 0
+    return format_key
+
+
+def _iter_processed_sheets(
+    sheet_data_list: Iterable[SheetData],
+    config: ETLConfig,
+    scraper_session: Optional[ScraperSession],
+    report: RunReport,
+    known_oems: Optional[IndiceOemConocidos] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Procesa las hojas (o chunks de hojas, en el orden en que llegan) y entrega sus salidas
+    en el orden original del libro, apenas están listas.
+    Con `config.sheet_workers > 0` las hojas CPU van a un pool de procesos mientras la hoja
+    solo OEM (I/O: scraping/LLM) se procesa en paralelo en el proceso principal; las salidas
+    posteriores a la hoja OEM esperan a que esta termine para respetar el orden.
+    Con `known_oems` (solo sin pool ni chunks) la hoja solo OEM se procesa al final, cuando
+    ya están las salidas de las otras hojas; la salida mantiene el orden del libro.
+    """
+    sheet_timings: dict[str, _SheetTiming] = {}
+    outputs = _OrderedOutputs(sheet_timings, known_oems)
+    ignored_sheets: set[str] = set()
+    deferred_oem_sheets: list[tuple[int, SheetData]] = []
+    oem_cache: Optional[OemEnrichmentCache] = None
+    oem_cache_opened = False
 
-    unified_data_frame = pd.concat(processed_outputs, ignore_index=True)
+    executor: Optional[ProcessPoolExecutor] = None
+    futures: dict[int, tuple[Future, str, int]] = {}
+    if config.sheet_workers > 0:
+        # spawn: el proceso principal puede tener threads vivos (Chrome, pools) y fork no es seguro
+        executor = ProcessPoolExecutor(
+            max_workers=config.sheet_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    try:
+        for position, sheet_data in enumerate(sheet_data_list):
+            format_key = _detect_stage(report, sheet_data, sheet_timings, ignored_sheets)
+            if format_key is None:
+                continue
+            outputs.expect(position)
+
+            if format_key == FORMAT_OEM_SOLO and (executor is not None or known_oems is not None):
+                deferred_oem_sheets.append((position, sheet_data))
+            elif format_key == FORMAT_OEM_SOLO:
+                if not oem_cache_opened:
+                    oem_cache, oem_cache_opened = _open_oem_cache(config), True
+                outputs.put(position, sheet_data.sheet_name, _transform_stage(
+                    report, sheet_data, lambda: _process_oem_sheet(sheet_data, config, scraper_session, oem_cache)
+                ))
+            elif executor is not None:
+                futures[position] = (
+                    executor.submit(_run_processor_in_pool, format_key, sheet_data.data_frame, sheet_data.sheet_name),
+                    sheet_data.sheet_name,
+                    len(sheet_data.data_frame),
+                )
+                # acota los chunks en vuelo: espera al más antiguo si el pool va atrasado
+                if len(futures) > 2 * config.sheet_workers:
+                    oldest_position = next(iter(futures))
+                    oldest_future, oldest_sheet_name, oldest_rows_in = futures.pop(oldest_position)
+                    _put_pool_result(outputs, report, oldest_position, oldest_sheet_name, oldest_rows_in, oldest_future)
+                _collect_finished(futures, outputs, report)
+            else:
+                outputs.put(position, sheet_data.sheet_name, _transform_stage(
+                    report, sheet_data, lambda: _run_processor(format_key, sheet_data.data_frame, sheet_data.sheet_name)
+                ))
+            yield from outputs.pop_ready()
+
+        # con pool, la hoja solo OEM corre acá mientras los procesos trabajan las hojas CPU
+        if deferred_oem_sheets:
+            oem_cache = _open_oem_cache(config)
+        for position, sheet_data in deferred_oem_sheets:
+            outputs.put(position, sheet_data.sheet_name, _transform_stage(
+                report,
+                sheet_data,
+                lambda: _process_oem_sheet(sheet_data, config, scraper_session, oem_cache, known_oems),
+            ))
+            _collect_finished(futures, outputs, report)
+            yield from outputs.pop_ready()
+
+        _collect_finished(futures, outputs, report, wait_all=True)
+        yield from outputs.pop_ready()
+        if oem_cache is not None:
+            oem_cache.log_stats()
+    finally:
+        if oem_cache is not None:
+            oem_cache.close()
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    _log_sheet_times(sheet_timings)
+    # con pool incluye lo parseado en los procesos hijos (merge_parse_stats)
+    log_parse_stats()
+
+
+def _iter_processed_sheets_incremental(
+    sheet_data_list: Iterable[SheetData],
+    config: ETLConfig,
+    scraper_session: Optional[ScraperSession],
+    report: RunReport,
+    known_oems: Optional[IndiceOemConocidos] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Variante incremental (secuencial): por hoja procesa solo las filas nuevas o modificadas
+    según el store de fingerprints y completa con la salida guardada del resto. Con
+    `known_oems` las hojas solo OEM se procesan al final (la salida mantiene el orden del
+    libro) y las filas que copian de otras hojas entran en su fingerprint.
+    """
+    store = RowFingerprintStore(config.incremental_store_path)
+    sheet_timings: dict[str, _SheetTiming] = {}
+    outputs = _OrderedOutputs(sheet_timings, known_oems)
+    ignored_sheets: set[str] = set()
+    oem_cache: Optional[OemEnrichmentCache] = None
+    oem_cache_opened = False
+
+    def transform_sheet(sheet_data: SheetData, format_key: str) -> tuple[pd.DataFrame, float]:
+        nonlocal oem_cache, oem_cache_opened
+        external_fingerprint: Optional[Callable[[str], str]] = None
+        if format_key == FORMAT_OEM_SOLO:
+            if not oem_cache_opened:
+                oem_cache, oem_cache_opened = _open_oem_cache(config), True
+            if known_oems is not None:
+                external_fingerprint = known_oems.huella
+
+            def process_rows(data_frame: pd.DataFrame) -> pd.DataFrame:
+                return _process_oem_sheet(
+                    SheetData(sheet_data.sheet_name, data_frame), config, scraper_session, oem_cache, known_oems
+                )[0]
+        else:
+            def process_rows(data_frame: pd.DataFrame) -> pd.DataFrame:
+                return PROCESSORS[format_key](data_frame, sheet_data.sheet_name)
+
+        started_at = time.perf_counter()
+        with report.stage(f"transform:{sheet_data.sheet_name}", rows_in=len(sheet_data.data_frame)) as stage:
+            processed_data_frame = procesar_hoja_incremental(
+                sheet_data.data_frame, sheet_data.sheet_name, format_key, process_rows, store, external_fingerprint
+            )
+            stage.rows_out = len(processed_data_frame)
+        return processed_data_frame, time.perf_counter() - started_at
+
+    try:
+        deferred_oem_sheets: list[tuple[int, SheetData]] = []
+        for position, sheet_data in enumerate(sheet_data_list):
+            format_key = _detect_stage(report, sheet_data, sheet_timings, ignored_sheets)
+            if format_key is None:
+                continue
+            outputs.expect(position)
+            if format_key == FORMAT_OEM_SOLO and known_oems is not None:
+                deferred_oem_sheets.append((position, sheet_data))
+                continue
+            outputs.put(position, sheet_data.sheet_name, transform_sheet(sheet_data, format_key))
+            yield from outputs.pop_ready()
+        for position, sheet_data in deferred_oem_sheets:
+            outputs.put(position, sheet_data.sheet_name, transform_sheet(sheet_data, FORMAT_OEM_SOLO))
+            yield from outputs.pop_ready()
+
+        store.remove_other_sheets(sheet_timings)
+        if oem_cache is not None:
+            oem_cache.log_stats()
+    finally:
+        if oem_cache is not None:
+            oem_cache.close()
+        store.close()
+
+    _log_sheet_times(sheet_timings)
+    log_parse_stats()
+
+
+def _read_sheets(config: ETLConfig, report: RunReport) -> Iterable[SheetData]:
+    if config.read_chunk_rows is None:
+        with report.stage("read") as stage:
+            sheet_data_list = read_all_sheets(config.input_path)
+            stage.rows_out = sum(len(sheet_data.data_frame) for sheet_data in sheet_data_list)
+        return sheet_data_list
+    return _iter_timed_chunks(iter_sheet_chunks(config.input_path, chunk_rows=config.read_chunk_rows), report)
+
+
+def _iter_timed_chunks(sheet_chunks: Iterator[SheetData], report: RunReport) -> Iterator[SheetData]:
+    """Mide cada lectura de chunk como etapa `read` (la lectura se intercala con el resto)."""
+    while True:
+        with report.stage("read") as stage:
+            sheet_data = next(sheet_chunks, None)
+            stage.rows_out = len(sheet_data.data_frame) if sheet_data is not None else 0
+        if sheet_data is None:
+            return
+        yield sheet_data
+
+
+def _dedup_stage(report: RunReport, deduplicator: RowDeduplicator, processed_data_frame: pd.DataFrame) -> pd.DataFrame:
+    # quitar duplicados exactos (misma compatibilidad + mismo repuesto), también entre salidas
+    with report.stage("dedup", rows_in=len(processed_data_frame)) as stage:
+        processed_data_frame = deduplicator.filter(processed_data_frame)
+        stage.rows_out = len(processed_data_frame)
+    return processed_data_frame
+
+
+def _index_stage(
+    report: RunReport, index_builder: Optional[CompatibilityIndexBuilder], processed_data_frame: pd.DataFrame
+) -> None:
+    if index_builder is None:
+        return
+    with report.stage("index:add", rows_in=len(processed_data_frame)) as stage:
+        index_builder.add(processed_data_frame)
+        stage.rows_out = len(processed_data_frame)
+
+
+def _write_all(
+    processed_outputs: Iterator[pd.DataFrame],
+    config: ETLConfig,
+    report: RunReport,
+    deduplicator: RowDeduplicator,
+    index_builder: Optional[CompatibilityIndexBuilder] = None,
+) -> tuple[Path, int]:
+    # cada salida se deduplica apenas llega: las filas repetidas no llegan al concat
+    deduplicated_outputs = [
+        _dedup_stage(report, deduplicator, processed_data_frame) for processed_data_frame in processed_outputs
+    ]
+    if not deduplicated_outputs:
+        raise RuntimeError("No se generó ninguna salida procesable.")
 
-    # quitar duplicados exactos (misma compatibilidad + mismo repuesto)
-    unified_data_frame = unified_data_frame.drop_duplicates()
+    with report.stage("concat", rows_in=sum(len(output) for output in deduplicated_outputs)) as stage:
+        # salidas con el mismo esquema tipado: el concat no sube columnas a object
+        unified_data_frame = concat_output_chunks(deduplicated_outputs)
+        stage.rows_out = len(unified_data_frame)
 
     # Orden final coherente de columnas
-    unified_data_frame = reorder_columns(
-        unified_data_frame, priority_columns=OUTPUT_COLUMN_ORDER
+    with report.stage("reorder", rows_in=len(unified_data_frame)) as stage:
+        unified_data_frame = reorder_columns(
+            unified_data_frame, priority_columns=OUTPUT_COLUMN_ORDER
+        )
+        stage.rows_out = len(unified_data_frame)
+
+    with report.stage("write", rows_in=len(unified_data_frame)) as stage:
+        output_path = write_output(
+            unified_data_frame,
+            config.output_dir,
+            output_format=config.output_format,
+            parquet_dataset=_parquet_dataset_config(config),
+        )
+        stage.rows_out = len(unified_data_frame)
+    _index_stage(report, index_builder, unified_data_frame)
+    return output_path, len(unified_data_frame)
+
+
+def _write_streaming(
+    processed_outputs: Iterator[pd.DataFrame],
+    config: ETLConfig,
+    report: RunReport,
+    deduplicator: RowDeduplicator,
+    index_builder: Optional[CompatibilityIndexBuilder] = None,
+) -> tuple[Path, int]:
+    """
+    Escribe cada salida apenas llega, con memoria acotada al chunk (más el set de huellas
+    del deduplicador, que también descarta duplicados entre chunks distintos).
+    """
+    with open_incremental_writer(
+        config.output_dir, config.output_format, OUTPUT_COLUMN_ORDER, _parquet_dataset_config(config)
+    ) as writer:
+        for processed_data_frame in processed_outputs:
+            processed_data_frame = _dedup_stage(report, deduplicator, processed_data_frame)
+            with report.stage("reorder", rows_in=len(processed_data_frame)) as stage:
+                processed_data_frame = reorder_columns(processed_data_frame, priority_columns=OUTPUT_COLUMN_ORDER)
+                stage.rows_out = len(processed_data_frame)
+            with report.stage("write", rows_in=len(processed_data_frame)) as stage:
+                writer.write(processed_data_frame)
+                stage.rows_out = len(processed_data_frame)
+            _index_stage(report, index_builder, processed_data_frame)
+
+    if writer.chunks_written == 0:
+        raise RuntimeError("No se generó ninguna salida procesable.")
+    return writer.output_path, writer.rows_written
+
+
+def _save_compatibility_index(
+    report: RunReport, index_builder: CompatibilityIndexBuilder, output_path: Path
+) -> Path:
+    index_path = output_path.with_name(f"{output_path.stem}.compat_index.npz")
+    with report.stage("index:build", rows_in=index_builder.rows_seen) as stage:
+        compatibility_index = index_builder.build()
+        compatibility_index.save(index_path)
+        stage.rows_out = len(compatibility_index)
+    logger.info(
+        f"[INDEX] Índice de compatibilidad: {len(compatibility_index)} filas en "
+        f"{compatibility_index.bucket_count} (marca, modelo) -> {index_path} "
+        f"({index_path.stat().st_size / 2**20:.1f} MB)"
     )
+    return index_path
+
 
-    output_path = write_output(
-        unified_data_frame,
-        config.output_dir,
-        output_format=config.output_format
+def _workbook_has_oem_only_sheet(input_path: Path) -> bool:
+    for sheet_headers in read_sheet_headers(input_path).values():
+        detected_format = detectar_formato(pd.DataFrame(columns=sheet_headers))
+        if detected_format and detected_format.format_key == FORMAT_OEM_SOLO:
+            return True
+    return False
+
+
+def _known_oems_index(sheet_data_list: Iterable[SheetData]) -> Optional[IndiceOemConocidos]:
+    """Índice de OEM conocidos restringido a los OEM de las hojas solo OEM; None si no hay."""
+    oem_codes: list[str] = []
+    for sheet_data in sheet_data_list:
+        detected_format = detectar_formato(sheet_data.data_frame)
+        if detected_format and detected_format.format_key == FORMAT_OEM_SOLO:
+            # misma búsqueda de columna que formato_oem_solo
+            columnas = {str(column_name).strip().lower(): column_name for column_name in sheet_data.data_frame.columns}
+            oem_codes.extend(sheet_data.data_frame[columnas["oem"]].dropna().astype(str).tolist())
+    return IndiceOemConocidos(oem_codes) if oem_codes else None
+
+
+def _finish_run_report(report: RunReport, config: ETLConfig, output_path: Path, total_rows: int) -> None:
+    # enriquecimiento: medido dentro de la hoja solo OEM (ya incluido en su transform)
+    for kind, timing in ENRICHMENT_TIMINGS.items():
+        if timing.calls:
+            report.record(
+                f"enrich:{kind}", timing.wall_seconds, timing.cpu_seconds, rows_in=timing.oems, calls=timing.calls
+            )
+    report.extra.update(
+        input_path=str(config.input_path),
+        output_path=str(output_path),
+        output_format=config.output_format,
+        rows_out=total_rows,
     )
+    if config.run_report:
+        report.write(output_path.with_name(f"{output_path.stem}.run_report.json"))
+    else:
+        report.finish()
+
+
+def run(config: ETLConfig) -> Path:
+    if config.incremental_store_path is not None and config.read_chunk_rows is not None:
+        # la llave de fila se agrupa por hoja completa; con chunks quedaría partida
+        raise ValueError("incremental_store_path no es compatible con read_chunk_rows")
+
+    scraper_session: Optional[ScraperSession] = None
+    if (
+        config.prewarm_scraper
+        and config.scraper_workers <= 1
+        and _workbook_has_oem_only_sheet(config.input_path)
+    ):
+        # Chrome arranca mientras se lee el Excel; selenium se importa solo si hace falta
+        from extract.scrapping.sites.toyota_parts_deal import create_toyota_parts_deal_session
+
+        scraper_session = create_toyota_parts_deal_session()
+        scraper_session.start_in_background()
 
+    report = RunReport(config.run_report_memory)
+    reset_enrichment_timings()
+    known_oems: Optional[IndiceOemConocidos] = None
+    try:
+        sheet_data_list = _read_sheets(config, report)
+        if config.reuse_known_oems:
+            # libro completo en memoria (sin chunks): los OEM buscados salen de las hojas ya leídas
+            known_oems = _known_oems_index(sheet_data_list)
+        if config.incremental_store_path is not None:
+            processed_outputs = _iter_processed_sheets_incremental(
+                sheet_data_list, config, scraper_session, report, known_oems
+            )
+        else:
+            processed_outputs = _iter_processed_sheets(sheet_data_list, config, scraper_session, report, known_oems)
+        deduplicator = RowDeduplicator()
+        index_builder = CompatibilityIndexBuilder() if config.compatibility_index else None
+        if config.stream_output:
+            output_path, total_rows = _write_streaming(processed_outputs, config, report, deduplicator, index_builder)
+        else:
+            output_path, total_rows = _write_all(processed_outputs, config, report, deduplicator, index_builder)
+    finally:
+        if scraper_session is not None:
+            scraper_session.close()
+
+    deduplicator.log_stats()
+    if known_oems is not None:
+        known_oems.log_stats()
+        report.extra["oem_lookups_avoided"] = known_oems.stats.evitadas
+    report.extra["duplicates_by_sheet"] = {
+        sheet_name: sheet_stats.duplicates for sheet_name, sheet_stats in deduplicator.stats.items()
+    }
     logger.info(f"Salida final generada: {output_path}")
-    logger.info(f"Filas totales: {len(unified_data_frame)}")
+    logger.info(f"Filas totales: {total_rows}")
+    if index_builder is not None:
+        report.extra["compatibility_index_path"] = str(_save_compatibility_index(report, index_builder, output_path))
+
+    _finish_run_report(report, config, output_path, total_rows)
 
     return output_path
 
@@ -106,5 +638,7 @@ if __name__ == "__main__":
         output_dir=Path(os.path.join(base_directory, "out")),
         output_format="xlsx",
         use_llm=True,
+        oem_cache_path=Path(os.path.join(base_directory, "out", "oem_cache.sqlite")),
+        prewarm_scraper=True,
     )
     run(config)
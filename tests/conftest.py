@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Los módulos del repo se importan desde la raíz (como en main.py)
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
@@ -0,0 +1,69 @@
+import sqlite3
+import time
+
+from extract.oem_cache import OemCacheConfig, OemEnrichmentCache
+
+RESULT = {"repuesto_nombre": "Filtro", "compatibilidades": []}
+
+
+def _cache(tmp_path, **overrides) -> OemEnrichmentCache:
+    return OemEnrichmentCache(OemCacheConfig(path=tmp_path / "cache.sqlite", **overrides))
+
+
+def _last_access(tmp_path, oem_key: str) -> float:
+    with sqlite3.connect(tmp_path / "cache.sqlite") as connection:
+        (last_access,) = connection.execute(
+            "SELECT last_access FROM oem_enrichment WHERE oem_key = ?", (oem_key,)
+        ).fetchone()
+    return last_access
+
+
+def test_hits_write_access_in_batches(tmp_path):
+    cache = _cache(tmp_path, access_flush_batch=3)
+    for oem_code in ("A-1", "B-1", "C-1"):
+        cache.put(oem_code, "site", RESULT)
+    written_at = _last_access(tmp_path, "A1")
+    time.sleep(0.01)
+
+    assert cache.get("A-1", "site").value == RESULT
+    assert cache.get("B-1", "site").value == RESULT
+    # hasta completar el lote los hits no escriben
+    assert _last_access(tmp_path, "A1") == written_at
+    assert cache.get("C-1", "site").value == RESULT
+    assert _last_access(tmp_path, "A1") > written_at
+    cache.close()
+
+
+def test_eviction_uses_pending_access_and_counts_in_memory(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put("A-1", "site", RESULT)
+    time.sleep(0.01)
+    cache.put("B-1", "site", None)
+    time.sleep(0.01)
+    # el hit de A-1 todavía no se escribió, pero la expulsión lo ve: sale B-1
+    assert cache.get("A-1", "site") is not None
+    cache.put("C-1", "site", RESULT)
+    cache.put("C-1", "site", RESULT)  # reemplazo: no suma al conteo
+
+    assert cache.evictions == 1
+    assert cache.get("B-1", "site") is None
+    assert cache.get("A-1", "site") is not None and cache.get("C-1", "site") is not None
+    cache.close()
+
+    reopened = _cache(tmp_path, max_entries=2)
+    reopened.put("D-1", "site", RESULT)
+    assert reopened.evictions == 1
+    reopened.close()
+    with sqlite3.connect(tmp_path / "cache.sqlite") as connection:
+        assert connection.execute("SELECT COUNT(*) FROM oem_enrichment").fetchone() == (2,)
+
+
+def test_expired_entries_leave_the_count(tmp_path):
+    cache = _cache(tmp_path, max_entries=2, negative_ttl_hours=0)
+    cache.put("A-1", "site", None)
+    cache.put("B-1", "site", RESULT)
+    assert cache.get("A-1", "site") is None and cache.expired == 1
+    cache.put("C-1", "site", RESULT)
+
+    assert cache.evictions == 0
+    cache.close()
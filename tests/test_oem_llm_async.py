@@ -0,0 +1,194 @@
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+import pytest
+
+pytest.importorskip("openai")
+
+from extract.OpenAI.oem_llm_async import AsyncLlmConfig, AsyncOemLlmClient
+
+OEM_IN_PROMPT = re.compile(r'OEM: "([^"]+)"')
+LLM_JSON = {
+    "repuesto_nombre": "Filtro de aceite",
+    "compatibilidad_texto": "Toyota Yaris 2008-2012",
+    "compatibilidades": [{"compatibilidad_marca": "TOYOTA", "compatibilidad_modelo": "YARIS"}],
+    "links_fuente": [],
+}
+
+
+class StubResponsesServer(ThreadingHTTPServer):
+    """
+    Servidor local con la forma de `POST /v1/responses`. `scripts[oem]` es la lista de
+    respuestas de error (status, headers) que recibe ese OEM antes de contestar bien;
+    `usage_tokens` es el input_tokens que se informa en cada respuesta exitosa.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, scripts: Dict[str, List[Tuple[int, Dict[str, str]]]], output_texts: Dict[str, str] = None,
+                 usage_tokens: int = 50):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.scripts = {oem: list(script) for oem, script in scripts.items()}
+        self.output_texts = output_texts or {}
+        self.usage_tokens = usage_tokens
+        self.requests: Dict[str, List[float]] = defaultdict(list)
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        oem = OEM_IN_PROMPT.search(body["input"]).group(1)
+        server: StubResponsesServer = self.server
+        with server.lock:
+            server.requests[oem].append(time.monotonic())
+            script = server.scripts.get(oem)
+            status, headers = script.pop(0) if script else (200, {})
+
+        if status != 200:
+            self._send_json(status, {"error": {"message": f"stub {status}", "type": "server_error"}}, headers)
+            return
+        output_text = server.output_texts.get(oem, json.dumps(LLM_JSON))
+        self._send_json(200, {
+            "id": f"resp_{oem}",
+            "object": "response",
+            "created_at": 0,
+            "model": body["model"],
+            "status": "completed",
+            "output": [{
+                "type": "message",
+                "id": f"msg_{oem}",
+                "role": "assistant",
+                "status": "completed",
+                "content": [{"type": "output_text", "text": output_text, "annotations": []}],
+            }],
+            "usage": {"input_tokens": server.usage_tokens, "output_tokens": 0, "total_tokens": server.usage_tokens},
+        })
+
+    def _send_json(self, status: int, payload: dict, headers: Dict[str, str] = None) -> None:
+        encoded = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-stub")
+    servers = []
+
+    def start(scripts, **kwargs) -> StubResponsesServer:
+        server = StubResponsesServer(scripts, **kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _config(server: StubResponsesServer, **overrides) -> AsyncLlmConfig:
+    values = dict(
+        base_url=server.base_url, max_concurrency=4, requests_per_minute=None, tokens_per_minute=None,
+        timeout_seconds=5.0, max_retries=3, backoff_base=0.05, backoff_max=1.0,
+    )
+    values.update(overrides)
+    return AsyncLlmConfig(**values)
+
+
+def _gaps(times: List[float]) -> List[float]:
+    return [later - earlier for earlier, later in zip(times, times[1:])]
+
+
+def test_retries_429_and_5xx_with_backoff(stub_server):
+    server = stub_server({
+        "A-429": [(429, {"retry-after": "0.3"})],
+        "B-500": [(500, {}), (503, {})],
+    })
+    llm_client = AsyncOemLlmClient(_config(server))
+
+    results = asyncio.run(llm_client.lookup_many(["A-429", "B-500", "C-OK"]))
+
+    assert set(results) == {"A-429", "B-500", "C-OK"}
+    assert all(result["repuesto_nombre"] == "Filtro de aceite" for result in results.values())
+    assert (llm_client.stats.ok, llm_client.stats.failed, llm_client.stats.retries) == (3, 0, 3)
+    assert [len(server.requests[oem]) for oem in ("A-429", "B-500", "C-OK")] == [2, 3, 1]
+    # 429 respeta retry-after; 5xx espera backoff exponencial con jitter (base/2 .. base * 2**intento)
+    assert _gaps(server.requests["A-429"])[0] >= 0.3
+    first_gap, second_gap = _gaps(server.requests["B-500"])
+    assert first_gap >= 0.025 and second_gap >= 0.05
+
+
+def test_failed_oem_does_not_affect_the_rest(stub_server):
+    server = stub_server(
+        {
+            "D-DOWN": [(500, {})] * 10,
+            "E-400": [(400, {})],
+        },
+        output_texts={"G-EMPTY": "no encontré información"},
+    )
+    llm_client = AsyncOemLlmClient(_config(server, max_retries=2))
+
+    results = asyncio.run(llm_client.lookup_many(["D-DOWN", "E-400", "F-OK", "G-EMPTY"]))
+
+    # los que fallaron no vienen en el resultado (no se cachean como negativos); "sin datos" sí
+    assert set(results) == {"F-OK", "G-EMPTY"}
+    assert results["G-EMPTY"] is None
+    assert results["F-OK"]["repuesto_nombre"] == "Filtro de aceite"
+    stats = llm_client.stats
+    assert (stats.ok, stats.empty, stats.failed, stats.retries) == (1, 1, 2, 2)
+    # 5xx agota los reintentos; un 400 no se reintenta
+    assert len(server.requests["D-DOWN"]) == 3
+    assert len(server.requests["E-400"]) == 1
+
+
+def test_requests_per_minute_budget(stub_server):
+    server = stub_server({})
+    llm_client = AsyncOemLlmClient(_config(server, requests_per_minute=600))
+    # el bucket arranca lleno (un minuto de ráfaga): se vacía para medir el ritmo de recarga (10/s)
+    llm_client._request_budget.debit(llm_client._request_budget.capacity)
+
+    started_at = time.monotonic()
+    results = asyncio.run(llm_client.lookup_many(["R-1", "R-2", "R-3", "R-4"]))
+
+    assert len(results) == 4
+    request_times = sorted(times[0] for times in server.requests.values())
+    assert request_times[-1] - started_at >= 0.35
+    assert all(gap >= 0.08 for gap in _gaps(request_times))
+    # la primera espera se solapa con la creación del cliente; las otras tres son completas
+    assert llm_client.stats.budget_wait_seconds >= 0.25
+
+
+def test_tokens_per_minute_budget_charges_real_usage(stub_server):
+    # 60k tokens/min = 1000/s; cada respuesta informa 300 tokens más que la ráfaga completa
+    server = stub_server({}, usage_tokens=60_300)
+    llm_client = AsyncOemLlmClient(
+        _config(server, max_concurrency=1, tokens_per_minute=60_000, estimated_tokens_per_call=100)
+    )
+
+    results = asyncio.run(llm_client.lookup_many(["T-1", "T-2"]))
+
+    assert len(results) == 2
+    first_request, second_request = sorted(times[0] for times in server.requests.values())
+    # saldo tras la primera: 60000 - 60300 = -300; la segunda reserva 100 -> espera ~0,4 s
+    assert second_request - first_request >= 0.35
+    assert llm_client.stats.budget_wait_seconds >= 0.35
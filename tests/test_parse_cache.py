@@ -0,0 +1,42 @@
+import logging
+
+import pytest
+
+from transform import parse_cache
+from transform.parse_cache import ParseStatsSnapshot, merge_parse_stats, registrar_columna, reset_parse_stats
+
+
+@pytest.fixture(autouse=True)
+def _clean_stats():
+    reset_parse_stats()
+    yield
+    reset_parse_stats()
+
+
+def test_pool_snapshots_are_added_to_the_parent_stats(caplog):
+    registrar_columna("completo.compatibilidades", 10, 4)
+    parse_cache.extraer_anios("2007-2010")
+    parse_cache.extraer_anios("2007-2010")
+    # snapshots acumulados de un proceso del pool: gana el de mayor secuencia aunque llegue antes
+    merge_parse_stats(ParseStatsSnapshot(101, 2, {"completo.compatibilidades": (30, 9)}, {"extraer_anios": (5, 3, 3)}))
+    merge_parse_stats(ParseStatsSnapshot(101, 1, {"completo.compatibilidades": (20, 6)}, {"extraer_anios": (1, 1, 1)}))
+    merge_parse_stats(ParseStatsSnapshot(102, 1, {"aplicaciones.descripcion": (7, 7)}, {}))
+
+    with caplog.at_level(logging.INFO, logger="etl"):
+        parse_cache.log_parse_stats()
+
+    maxsize = parse_cache.PARSE_CACHE_MAXSIZE
+    assert "[PARSE] columna completo.compatibilidades: filas=40 únicos=13 (ratio=32.5%)" in caplog.text
+    assert "[PARSE] columna aplicaciones.descripcion: filas=7 únicos=7 (ratio=100.0%)" in caplog.text
+    assert f"[PARSE] extraer_anios: llamadas=10 hit_rate=60.0% en_cache=4/{2 * maxsize}" in caplog.text
+
+
+def test_snapshot_reports_this_process(caplog):
+    registrar_columna("nombre_embebido.medidas", 3, 2)
+    parse_cache.extraer_medidas("10X20")
+
+    snapshot = parse_cache.snapshot_parse_stats()
+
+    assert snapshot.columnas == {"nombre_embebido.medidas": (3, 2)}
+    assert snapshot.parsers == {"extraer_medidas": (0, 1, 1)}
+    assert parse_cache.snapshot_parse_stats().secuencia > snapshot.secuencia
@@ -0,0 +1,86 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from extract.scrapping.sites import toyota_parts_deal_http as tpd
+
+FIXTURES = Path(__file__).parent / "fixtures" / "toyota_parts_deal"
+BASE_URL = "https://www.toyotapartsdeal.com/search?search_str=04152-YZZA1"
+DETAIL_URL = "https://www.toyotapartsdeal.com/genuine/toyota-filter-assy-oil~04152-yzza1.html"
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("oem_code", ["04152-YZZA1", "04152yzza1", " 04152 YZZA1 "])
+def test_find_detail_link_exact_oem(oem_code):
+    # ni la paginación (OEM en la query) ni ~04152-yzza10.html (substring) cuentan
+    assert tpd.find_detail_link(_fixture("search_results.html"), BASE_URL, oem_code) == DETAIL_URL
+
+
+def test_find_detail_link_longer_oem():
+    expected = "https://www.toyotapartsdeal.com/genuine/toyota-element-kit-oil-filter~04152-yzza10.html"
+    assert tpd.find_detail_link(_fixture("search_results.html"), BASE_URL, "04152-YZZA10") == expected
+
+
+@pytest.mark.parametrize("oem_code", ["04152-YZZA", "04152-37010", "", "  "])
+def test_find_detail_link_without_match(oem_code):
+    # 04152-37010 solo aparece en un link de búsqueda, no de detalle
+    assert tpd.find_detail_link(_fixture("search_results.html"), BASE_URL, oem_code) is None
+
+
+def test_find_detail_link_by_text_token():
+    page_html = """
+    <a href="/search?search_str=90915-YZZD4&page=2">90915-YZZD4</a>
+    <a href="/genuine/toyota-oil-filter-kit~90915-yzzd4x.html">Kit 90915-YZZD4X</a>
+    <a href="/genuine/toyota-oil-filter~oil-filter.html">Oil Filter 90915-YZZD4</a>
+    """
+    expected = "https://www.toyotapartsdeal.com/genuine/toyota-oil-filter~oil-filter.html"
+    assert tpd.find_detail_link(page_html, BASE_URL, "90915-YZZD4") == expected
+
+
+def test_parse_detail_html():
+    detail = tpd.parse_detail_html(_fixture("detail.html"), DETAIL_URL)
+
+    assert detail is not None
+    assert detail.url == DETAIL_URL
+    assert detail.header_data == {
+        "heading_text": "Toyota Filter Assy, Oil 04152-YZZA1",
+        "part_name": "Filter Assy, Oil",
+        "sub_desc": "Genuine Toyota Part\nOil Filter Element",
+    }
+    assert detail.specs_table == {
+        "Brand": "Genuine Toyota",
+        "Part Number": "04152-YZZA1",
+        "Replaces": "04152-31080, 04152-YZZA5",
+    }
+    assert detail.fitment_rows == [
+        {"year_make_model": "2018 Toyota Camry", "trim_engine": "LE, SE Sedan", "option_details": "3.5L V6 - Gas"},
+        {"year_make_model": "2019 Lexus ES350", "trim_engine": "Base\nLuxury", "option_details": "3.5L V6 - Gas"},
+    ]
+
+
+def test_parse_detail_html_needs_browser():
+    # fitment cargado por JS, o un listado sin contenedor de detalle: el caller usa Selenium
+    assert tpd.parse_detail_html(_fixture("detail_js_fitment.html"), DETAIL_URL) is None
+    assert tpd.parse_detail_html(_fixture("search_results.html"), BASE_URL) is None
+
+
+def test_fetch_detail_via_http_follows_exact_link(monkeypatch):
+    pages = {
+        tpd.SEARCH_URL_TEMPLATE.format(oem="04152-YZZA1"): _fixture("search_results.html"),
+        DETAIL_URL: _fixture("detail.html"),
+    }
+    requested = []
+
+    def fake_get(url, rate_limiter, timeout):
+        requested.append(url)
+        return SimpleNamespace(url=url, text=pages[url])
+
+    monkeypatch.setattr(tpd, "_get", fake_get)
+    detail = tpd.fetch_detail_via_http("04152-YZZA1")
+
+    assert requested == [tpd.SEARCH_URL_TEMPLATE.format(oem="04152-YZZA1"), DETAIL_URL]
+    assert detail is not None and detail.header_data["part_name"] == "Filter Assy, Oil"
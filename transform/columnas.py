@@ -0,0 +1,159 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Sequence
+import numpy as np
+import pandas as pd
+
+from constants.output import OUTPUT_SCHEMA
+from transform.parse_cache import extraer_medidas, registrar_columna
+from transform.parsing_medidas import CamposMedida, build_medida_fields
+
+# Campos de CamposMedida (lo que devuelve build_medida_fields), en el mismo orden
+MEDIDA_COLUMNS = list(CamposMedida._fields)
+
+
+def texto_limpio(series: pd.Series) -> pd.Series:
+    """Columna como texto sin espacios en los bordes; nulos quedan como ''."""
+    return series.astype("string").fillna("").str.strip().reset_index(drop=True)
+
+
+def texto_o_none(series: pd.Series) -> pd.Series:
+    """'' -> None, el resto igual (equivale a `valor or None` fila a fila)."""
+    return series.astype(object).where(series != "", None)
+
+
+def explotar_partes(partes: pd.Series) -> pd.Series:
+    """
+    `partes` trae una lista de textos por fila. Retorna una fila por parte no vacía (strip),
+    con el index de la fila de origen; las filas sin partes quedan con una sola fila None.
+    """
+    explotadas = partes.explode().astype(object)
+    validas = explotadas.notna()
+    explotadas[validas] = explotadas[validas].str.strip()
+    validas &= explotadas.ne("")
+
+    primera_de_su_fila = ~explotadas.index.duplicated()
+    fila_sin_partes = ~validas.groupby(level=0).transform("any")
+    conservar = validas | (primera_de_su_fila & fila_sin_partes)
+
+    explotadas = explotadas[conservar]
+    return explotadas.where(validas[conservar], None)
+
+
+def _factorizar(valores: pd.Series, nombre: str) -> tuple[np.ndarray, list]:
+    """
+    Códigos por fila + valores únicos (sin nulos; los nulos quedan con código -1).
+    Registra filas/únicos de la columna para las stats de parseo.
+    """
+    codigos, unicos = pd.factorize(valores, use_na_sentinel=True)
+    unicos_lista = list(unicos)
+    registrar_columna(nombre, len(codigos), len(unicos_lista))
+    return codigos, unicos_lista
+
+
+def _difundir(resultados_unicos: list, codigos: np.ndarray, valor_nulo: Any) -> np.ndarray:
+    """Lleva el resultado de cada único a todas sus filas (código -1 -> `valor_nulo`)."""
+    tabla = np.empty(len(resultados_unicos) + 1, dtype=object)
+    # asignación uno a uno: numpy no debe interpretar listas/tuplas como dimensiones
+    for posicion, resultado in enumerate(resultados_unicos):
+        tabla[posicion] = resultado
+    tabla[-1] = valor_nulo
+    return tabla[codigos]
+
+
+def mapear_columna(valores: pd.Series, funcion: Callable[[Any], Any], nombre: str, valor_nulo: Any = None) -> pd.Series:
+    """`valores.map(funcion)` evaluando `funcion` una sola vez por valor distinto."""
+    codigos, unicos = _factorizar(valores, nombre)
+    resultados = [funcion(valor) for valor in unicos]
+    return pd.Series(_difundir(resultados, codigos, valor_nulo), index=valores.index, dtype=object)
+
+
+def campos_medidas(textos: pd.Series, nombre: str = "medidas") -> pd.DataFrame:
+    """extraer_medidas + build_medida_fields sobre toda la columna, una vez por texto distinto."""
+    codigos, unicos = _factorizar(textos, nombre)
+    registros_unicos = [build_medida_fields(*extraer_medidas(texto)) for texto in unicos]
+    return pd.DataFrame(
+        {
+            column_name: _difundir(
+                [registro[posicion_campo] for registro in registros_unicos], codigos, None
+            ).tolist()
+            for posicion_campo, column_name in enumerate(MEDIDA_COLUMNS)
+        },
+        index=textos.index,
+    )
+
+
+def parsear_columna(
+    textos: pd.Series, parser: Callable[[str], Sequence[Any]], columnas: Sequence[str], nombre: str = "compatibilidades"
+) -> Dict[str, list]:
+    """
+    Aplica `parser(texto) -> tupla` a cada texto distinto de la columna y lo difunde a
+    todas sus filas; los None dan None en todos los campos. Retorna una lista por campo,
+    alineada con `textos`.
+    """
+    codigos, unicos = _factorizar(textos, nombre)
+    parseados = [parser(texto) for texto in unicos]
+    campos: Dict[str, list] = {}
+    for posicion_campo, columna in enumerate(columnas):
+        valores_unicos = [parseado[posicion_campo] for parseado in parseados]
+        campos[columna] = _difundir(valores_unicos, codigos, None).tolist()
+    return campos
+
+
+def armar_tabla(filas_origen: pd.Index, columnas: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Arma la tabla de salida columna por columna. `filas_origen` es la fila de la hoja que
+    originó cada fila de salida; los valores pueden ser escalares (se repiten), listas ya
+    alineadas con la salida, o Series/DataFrame indexados por fila de origen.
+    """
+    total_filas = len(filas_origen)
+    datos: Dict[str, Any] = {}
+    for nombre, valores in columnas.items():
+        if isinstance(valores, pd.Series):
+            datos[nombre] = valores.reindex(filas_origen).tolist()
+        elif isinstance(valores, list):
+            datos[nombre] = valores
+        else:
+            datos[nombre] = difundir_constante(nombre, valores, total_filas)
+    return pd.DataFrame(datos)
+
+
+def difundir_constante(nombre: str, valor: Any, total_filas: int) -> Any:
+    """
+    Columna constante (proveedor, formato_origen, DEFAULT_OUTPUT_FIELDS). Si el esquema de
+    salida la declara categórica se arma directo como categórica de un solo valor (un byte
+    por fila, sin objetos por fila ni conversión posterior); los bool con numpy.
+    """
+    if OUTPUT_SCHEMA.get(nombre) == "category" and valor is not None:
+        return pd.Categorical.from_codes(np.zeros(total_filas, dtype=np.int8), categories=[valor])
+    if isinstance(valor, bool):
+        return np.full(total_filas, valor, dtype=bool)
+    # texto: la lista repite la referencia y pandas la convierte a str más rápido que un array object
+    return [valor] * total_filas
+
+
+class ConstructorTabla:
+    """
+    Salida armada por columnas para processors que generan filas una a una (ej. solo OEM):
+    `agregar` recibe los valores en el orden de `columnas` y los suma a una lista por
+    columna, sin un dict por fila. Las `constantes` se difunden una vez en `construir`.
+    """
+
+    __slots__ = ("columnas", "constantes", "_listas", "total_filas")
+
+    def __init__(self, columnas: Sequence[str], constantes: Dict[str, Any]):
+        self.columnas = list(columnas)
+        self.constantes = dict(constantes)
+        self._listas: list[list] = [[] for _ in self.columnas]
+        self.total_filas = 0
+
+    def agregar(self, valores: Sequence[Any]) -> None:
+        for lista, valor in zip(self._listas, valores):
+            lista.append(valor)
+        self.total_filas += 1
+
+    def construir(self) -> pd.DataFrame:
+        datos: Dict[str, Any] = {
+            nombre: difundir_constante(nombre, valor, self.total_filas) for nombre, valor in self.constantes.items()
+        }
+        datos.update(zip(self.columnas, self._listas))
+        return pd.DataFrame(datos)
@@ -3,73 +3,72 @@ import pandas as pd
 
 from constants.formats import FORMAT_COMPLETO
 from constants.output import DEFAULT_OUTPUT_FIELDS
-from transform.delete_0 import limpiar_ceros_modelo_texto
-from transform.parsing_compatibilidades import (
-    extraer_anios,
-    extraer_motor_litros,
-    extraer_codigo_motor,
-    extraer_marca_modelo_flexible,
+from transform.columnas import (
+    armar_tabla,
+    campos_medidas,
+    explotar_partes,
+    parsear_columna,
+    texto_limpio,
+    texto_o_none,
 )
-from transform.parsing_medidas import build_medida_fields, extraer_medidas
+from transform.parse_cache import limpiar_ceros_modelo_texto, parsear_compatibilidad
 
+COMPATIBILIDAD_COLUMNS = [
+    "compatibilidad_marca",
+    "compatibilidad_modelo",
+    "compatibilidad_anio_desde",
+    "compatibilidad_anio_hasta",
+    "compatibilidad_motor_litros",
+    "compatibilidad_codigo_motor",
+]
 
-def procesar_formato_completo_a_tabla_unica(
-    data_frame: pd.DataFrame, nombre_hoja: str
-) -> pd.DataFrame:
-    columnas = {str(column_name).strip().lower(): column_name for column_name in data_frame.columns}
-
-    sku_series = data_frame[columnas["sku"]].astype("string").str.strip()
-    oem_series = data_frame[columnas["oem"]].astype("string").str.strip()
-    repuesto_series = data_frame[columnas["repuesto"]].astype("string").str.strip()
-    compatibilidad_series = data_frame[columnas["compatibilidades"]].astype("string").fillna("").str.strip()
 
-    rows = []
-    for row_index in range(len(data_frame)):
-        sku = (sku_series.iloc[row_index] or "").strip()
-        oem = (oem_series.iloc[row_index] or "").strip()
-        nombre_rep = (repuesto_series.iloc[row_index] or "").strip()
-        compatibilidad_raw = (compatibilidad_series.iloc[row_index] or "").strip()
+def _parsear_compatibilidad(compatibilidad_texto: str) -> tuple:
+    compatibilidad = parsear_compatibilidad(compatibilidad_texto)
+    compatibilidad_anio_hasta = compatibilidad.anio_hasta
+    if compatibilidad.anio_desde and compatibilidad_anio_hasta is None:
+        compatibilidad_anio_hasta = compatibilidad.anio_desde
 
-        compatibilidad_parts = [part.strip() for part in compatibilidad_raw.split(",") if part.strip()] or [None]
+    return (
+        compatibilidad.marca,
+        limpiar_ceros_modelo_texto(compatibilidad.modelo),
+        compatibilidad.anio_desde,
+        compatibilidad_anio_hasta,
+        compatibilidad.motor_litros,
+        compatibilidad.codigo_motor,
+    )
 
-        especificaciones_raw, medidas, separador_medidas = extraer_medidas(nombre_rep)
-        medida_fields = build_medida_fields(especificaciones_raw, medidas, separador_medidas)
 
-        for compatibilidad_texto in compatibilidad_parts:
-            compatibilidad_marca = compatibilidad_modelo = None
-            compatibilidad_anio_desde = compatibilidad_anio_hasta = None
-            compatibilidad_motor_litros = None
-            compatibilidad_codigo_motor = None
-            texto_compatibilidad = None
+def procesar_formato_completo_a_tabla_unica(
+    data_frame: pd.DataFrame, nombre_hoja: str
+) -> pd.DataFrame:
+    if data_frame.empty:
+        return pd.DataFrame()
 
-            if compatibilidad_texto is not None:
-                texto_compatibilidad = compatibilidad_texto
-                compatibilidad_marca, compatibilidad_modelo = extraer_marca_modelo_flexible(compatibilidad_texto)
-                compatibilidad_anio_desde, compatibilidad_anio_hasta = extraer_anios(compatibilidad_texto)
-                compatibilidad_motor_litros = extraer_motor_litros(compatibilidad_texto)
-                compatibilidad_codigo_motor = extraer_codigo_motor(compatibilidad_texto)
-                if compatibilidad_anio_desde and compatibilidad_anio_hasta is None:
-                    compatibilidad_anio_hasta = compatibilidad_anio_desde
+    columnas = {str(column_name).strip().lower(): column_name for column_name in data_frame.columns}
 
-                compatibilidad_modelo = limpiar_ceros_modelo_texto(compatibilidad_modelo)
+    sku_series = texto_limpio(data_frame[columnas["sku"]])
+    oem_series = texto_limpio(data_frame[columnas["oem"]])
+    repuesto_series = texto_limpio(data_frame[columnas["repuesto"]])
+    compatibilidad_series = texto_limpio(data_frame[columnas["compatibilidades"]])
 
-            row = {
-                "repuesto_oem": oem or None,
-                "proveedor": nombre_hoja,
-                "formato_origen": FORMAT_COMPLETO,
-                "repuesto_sku": sku or None,
-                "repuesto_nombre": nombre_rep or None,
-                "compatibilidad_marca": compatibilidad_marca,
-                "compatibilidad_modelo": compatibilidad_modelo,
-                "compatibilidad_anio_desde": compatibilidad_anio_desde,
-                "compatibilidad_anio_hasta": compatibilidad_anio_hasta,
-                "compatibilidad_motor_litros": compatibilidad_motor_litros,
-                "compatibilidad_codigo_motor": compatibilidad_codigo_motor,
-                "compatibilidad_texto": texto_compatibilidad,
-            }
-            row.update(medida_fields)
-            row.update(DEFAULT_OUTPUT_FIELDS)
-            rows.append(row)
+    compatibilidades = explotar_partes(compatibilidad_series.str.split(","))
+    compatibilidad_fields = parsear_columna(
+        compatibilidades, _parsear_compatibilidad, COMPATIBILIDAD_COLUMNS, nombre="completo.compatibilidades"
+    )
+    medida_fields = campos_medidas(repuesto_series, nombre="completo.repuesto")
 
-    output_table = pd.DataFrame(rows)
-    return output_table
+    return armar_tabla(
+        compatibilidades.index,
+        {
+            "repuesto_oem": texto_o_none(oem_series),
+            "proveedor": nombre_hoja,
+            "formato_origen": FORMAT_COMPLETO,
+            "repuesto_sku": texto_o_none(sku_series),
+            "repuesto_nombre": texto_o_none(repuesto_series),
+            **compatibilidad_fields,
+            "compatibilidad_texto": compatibilidades.tolist(),
+            **{column_name: medida_fields[column_name] for column_name in medida_fields.columns},
+            **DEFAULT_OUTPUT_FIELDS,
+        },
+    )
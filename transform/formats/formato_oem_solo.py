@@ -1,181 +1,322 @@
 from __future__ import annotations
 import re
+from typing import TYPE_CHECKING, Any, Dict, Optional
 import pandas as pd
 
 from constants.formats import FORMAT_OEM_SOLO
 from constants.output import DEFAULT_OUTPUT_FIELDS
-from extract.oem_enrichment import enrich_oem_data
-from transform.parsing_compatibilidades import (
+from extract.oem_cache import OemEnrichmentCache
+from extract.oem_enrichment import (
+    enrich_oem_data,
+    get_client,
+    log_llm_usage,
+    log_scraper_site_stats,
+    query_oems_with_llm_async,
+    query_oems_with_llm_batch,
+)
+from extract.OpenAI.oem_llm_async import AsyncLlmConfig
+from transform.columnas import ConstructorTabla
+from transform.oems_conocidos import COLUMNAS_COPIADAS, IndiceOemConocidos
+from transform.parse_cache import (
     extraer_anios,
     extraer_motor_litros,
     extraer_codigo_motor,
     extraer_marca_modelo_flexible,
+    extraer_medidas,
 )
-from transform.parsing_medidas import build_medida_fields, extraer_medidas
+from transform.parsing_medidas import build_medida_fields
+
+if TYPE_CHECKING:
+    from extract.scrapping.session import ScraperSession
+
+# Columnas que varían por fila, en el orden en que _agregar_filas_enriquecidas las entrega;
+# proveedor y formato_origen son constantes de la hoja
+COLUMNAS_OEM = ["repuesto_oem", "repuesto_sku", *COLUMNAS_COPIADAS]
+
+
+def _int_or_none(val):
+    try:
+        return int(val) if val is not None else None
+    except Exception:
+        return None
+
+
+def _split_engine_codes(raw: Any) -> list[str | None]:
+    if raw is None:
+        return [None]
+    if isinstance(raw, (int, float)):
+        return [str(raw)]
+    if not isinstance(raw, str):
+        return [None]
+    parts = [p.strip() for p in re.split(r"[;,|]", raw) if p.strip()]
+    return parts or [None]
+
+
+def _split_variant_codes(raw_text: Any) -> list[str | None]:
+    """
+    Option details suelen venir como: '1NZFE; NCP91L-AGMRKA, NCP91L-AGMRKK'.
+    Queremos una fila por cada cС©digo posterior al ';'.
+    """
+    if not isinstance(raw_text, str):
+        return [None]
+    if ";" not in raw_text:
+        return [None]
+    variant_part = raw_text.split(";", 1)[1]
+    variants = [v.strip() for v in re.split(r"[;,|]", variant_part) if v.strip()]
+    return variants or [None]
+
+
+def _agregar_filas_enriquecidas(
+    tabla: ConstructorTabla, oem_code: str, enrichment: Optional[Dict[str, Any]]
+) -> None:
+    especificaciones_texto_enriquecidas = enrichment.get("repuesto_especificaciones_texto") if enrichment else None
+
+    # Tomar dimensiones directas del LLM si vienen estructuradas; si no, extraer del texto
+    dimensiones_llm = enrichment.get("dimensiones") if enrichment else None
+    medidas: list[float | None] = []
+    separador: str | None = None
+    especificaciones_texto: str | None = None
+
+    if dimensiones_llm:
+        medidas = list(dimensiones_llm)[:4]
+        separador = "X" if len(medidas) > 1 else None
+    elif especificaciones_texto_enriquecidas:
+        especificaciones_texto, medidas, separador = extraer_medidas(especificaciones_texto_enriquecidas)
+
+    medida_fields = build_medida_fields(
+        especificaciones_texto=especificaciones_texto,
+        medidas=medidas,
+        separador=separador,
+    )
+
+    # iguales para todas las filas del OEM
+    repuesto_sku = enrichment.get("repuesto_sku") if enrichment else None
+    repuesto_nombre = enrichment.get("repuesto_nombre") if enrichment else None
+    paginas_de_informacion = DEFAULT_OUTPUT_FIELDS["paginas_de_informacion"]
+    if enrichment:
+        links = enrichment.get("links_fuente") or []
+        if links:
+            paginas_de_informacion = " ; ".join(links)
+        elif enrichment.get("link_fuente"):
+            paginas_de_informacion = enrichment.get("link_fuente")
+    # Verdadero solo si la fuente es OpenAI/LLM (no para scraping)
+    uso_de_open_ai = enrichment.get("fuente") == "openai" if enrichment else False
+
+    compat_list = enrichment.get("compatibilidades") if enrichment else None
+    compat_list = compat_list if isinstance(compat_list, list) else []
+
+    if not compat_list:
+        compat_list = [
+            {
+                "compatibilidad_marca": enrichment.get("compatibilidad_marca") if enrichment else None,
+                "compatibilidad_modelo": enrichment.get("compatibilidad_modelo") if enrichment else None,
+                "compatibilidad_anio_desde": enrichment.get("compatibilidad_anio_desde") if enrichment else None,
+                "compatibilidad_anio_hasta": enrichment.get("compatibilidad_anio_hasta") if enrichment else None,
+                "compatibilidad_motor_litros": enrichment.get("compatibilidad_motor_litros") if enrichment else None,
+                "compatibilidad_codigo_motor": enrichment.get("compatibilidad_codigo_motor") if enrichment else None,
+                "compatibilidad_texto": enrichment.get("compatibilidad_texto") if enrichment else None,
+            }
+        ]
+
+    if not compat_list:
+        compat_list = [
+            {
+                "compatibilidad_marca": None,
+                "compatibilidad_modelo": None,
+                "compatibilidad_anio_desde": None,
+                "compatibilidad_anio_hasta": None,
+                "compatibilidad_motor_litros": None,
+                "compatibilidad_codigo_motor": None,
+                "compatibilidad_texto": None,
+            }
+        ]
+
+    for compat in compat_list:
+        compat_texto = compat.get("compatibilidad_texto")
+        compat_marca = compat.get("compatibilidad_marca")
+        compat_modelo = compat.get("compatibilidad_modelo")
+        compat_anio_desde = compat.get("compatibilidad_anio_desde")
+        compat_anio_hasta = compat.get("compatibilidad_anio_hasta")
+        compat_motor_litros = compat.get("compatibilidad_motor_litros")
+        compat_codigo_motor = compat.get("compatibilidad_codigo_motor")
+
+        if not compat_texto:
+            parts = [compat_marca, compat_modelo]
+            if compat_anio_desde or compat_anio_hasta:
+                if compat_anio_desde and compat_anio_hasta:
+                    parts.append(f"{compat_anio_desde}-{compat_anio_hasta}")
+                elif compat_anio_desde:
+                    parts.append(str(compat_anio_desde))
+                else:
+                    parts.append(str(compat_anio_hasta))
+            compat_texto = " ".join([p for p in parts if p]) or None
+
+        # Completar campos faltantes desde compat_texto
+        if compat_texto:
+            if not compat_marca or not compat_modelo:
+                compat_marca, compat_modelo = extraer_marca_modelo_flexible(compat_texto)
+            if compat_anio_desde is None and compat_anio_hasta is None:
+                compat_anio_desde, compat_anio_hasta = extraer_anios(compat_texto)
+            if compat_motor_litros is None:
+                compat_motor_litros = extraer_motor_litros(compat_texto)
+            if compat_codigo_motor is None:
+                compat_codigo_motor = extraer_codigo_motor(compat_texto)
+
+        engine_codes = _split_engine_codes(compat_codigo_motor)
+        variant_codes = _split_variant_codes(compat_texto)
+
+        for engine_code in engine_codes:
+            for variant_code in variant_codes:
+                compat_texto_final = compat_texto
+                if variant_code:
+                    compat_texto_final = f"{compat_texto} | {variant_code}" if compat_texto else variant_code
+
+            tabla.agregar((
+                oem_code,
+                repuesto_sku,
+                repuesto_nombre,
+                compat_marca,
+                compat_modelo,
+                _int_or_none(compat_anio_desde),
+                _int_or_none(compat_anio_hasta),
+                compat_motor_litros,
+                engine_code,
+                compat_texto_final,
+                *medida_fields,
+                uso_de_open_ai,
+                paginas_de_informacion,
+            ))
+
+
+def _enrich_each_oem(
+    oem_codes: list[str],
+    use_llm: bool,
+    cache: Optional[OemEnrichmentCache],
+    session: Optional[ScraperSession],
+    workers: int,
+    requests_per_second: float,
+) -> list[Optional[Dict[str, Any]]]:
+    # Selenium se importa solo cuando una hoja necesita scraping
+    from extract.scrapping.sites.toyota_parts_deal import (
+        create_toyota_parts_deal_pool,
+        create_toyota_parts_deal_session,
+    )
+
+    if workers > 1 and len(oem_codes) > 1:
+        pool = create_toyota_parts_deal_pool(workers, requests_per_second)
+        return pool.map(
+            lambda oem_code, worker_session: enrich_oem_data(
+                oem_code, use_llm, cache=cache, session=worker_session
+            ),
+            oem_codes,
+        )
+
+    owns_session = session is None
+    if owns_session:
+        session = create_toyota_parts_deal_session()
+    try:
+        return [
+            enrich_oem_data(oem_code, use_llm, cache=cache, session=session)
+            for oem_code in oem_codes
+        ]
+    finally:
+        if owns_session:
+            session.close()
+
+
+def _enrich_oem_codes(
+    oem_codes: list[str],
+    use_llm: bool,
+    cache: Optional[OemEnrichmentCache],
+    session: Optional[ScraperSession],
+    workers: int,
+    requests_per_second: float,
+    llm_batch_size: int,
+    async_llm: Optional[AsyncLlmConfig],
+) -> list[Optional[Dict[str, Any]]]:
+    """
+    Con llm_batch_size>1 o async_llm primero se scrapean todos los OEM y luego los que
+    quedaron sin resultado van juntos al LLM (async concurrente o en batches);
+    si no, cada OEM hace scraping -> LLM.
+    """
+    deferred_llm = use_llm and (async_llm is not None or llm_batch_size > 1)
+    enrichments = _enrich_each_oem(
+        oem_codes, use_llm and not deferred_llm, cache, session, workers, requests_per_second
+    )
+    if not deferred_llm:
+        return enrichments
+
+    missing_oems = [oem_code for oem_code, enrichment in zip(oem_codes, enrichments) if not enrichment]
+    if not missing_oems:
+        return enrichments
+
+    if async_llm is not None:
+        llm_results = query_oems_with_llm_async(missing_oems, async_llm, cache=cache)
+    else:
+        llm_results = query_oems_with_llm_batch(missing_oems, llm_batch_size, cache=cache)
+    return [
+        enrichment or llm_results.get(oem_code)
+        for oem_code, enrichment in zip(oem_codes, enrichments)
+    ]
 
 
 def procesar_formato_oem_solo(
-    data_frame: pd.DataFrame, nombre_hoja: str, use_llm: bool
+    data_frame: pd.DataFrame,
+    nombre_hoja: str,
+    use_llm: bool,
+    cache: Optional[OemEnrichmentCache] = None,
+    session: Optional[ScraperSession] = None,
+    workers: int = 1,
+    requests_per_second: float = 0.5,
+    llm_batch_size: int = 1,
+    async_llm: Optional[AsyncLlmConfig] = None,
+    oems_conocidos: Optional[IndiceOemConocidos] = None,
 ) -> pd.DataFrame:
+    """
+    Enriquece cada OEM (cache -> scraping -> LLM) y genera una fila por compatibilidad.
+    Cada OEM (normalizado) se enriquece una sola vez aunque se repita; con `oems_conocidos`
+    (armado por main.run con las otras hojas) los que ya aparecen en hojas formato completo /
+    nombre embebido se completan con esas filas sin consulta externa, y los repetidos entre
+    chunks u hojas reusan el enriquecimiento ya hecho.
+    - workers=1: un solo navegador para toda la hoja; se usa `session` si viene
+      (ej. pre-calentada por main.run) o se crea una propia que se cierra al terminar.
+    - workers>1: pool de navegadores headless con rate limit compartido por host
+      (`requests_per_second`); el orden de salida es el mismo de la hoja.
+    - llm_batch_size>1: el fallback LLM agrupa varios OEM por request.
+    - async_llm: el fallback LLM consulta los OEM de a uno pero concurrentes (asyncio),
+      con presupuestos por minuto y reintentos; tiene prioridad sobre llm_batch_size.
+    """
     columnas = {str(column_name).strip().lower(): column_name for column_name in data_frame.columns}
     oem_series = data_frame[columnas["oem"]].astype("string").str.strip()
 
-    rows = []
-    for row_index in range(len(data_frame)):
-        oem_code = (oem_series.iloc[row_index] or "").strip()
-        if not oem_code:
-            continue
+    oem_codes = [
+        (oem_series.iloc[row_index] or "").strip()
+        for row_index in range(len(data_frame))
+    ]
+    oem_codes = [oem_code for oem_code in oem_codes if oem_code]
 
-        enrichment = enrich_oem_data(oem_code, use_llm)
+    oems_conocidos = oems_conocidos if oems_conocidos is not None else IndiceOemConocidos()
+    claves, filas_locales, oems_a_consultar = oems_conocidos.planificar(oem_codes)
 
-        especificaciones_texto_enriquecidas = enrichment.get("repuesto_especificaciones_texto") if enrichment else None
-
-        # Tomar dimensiones directas del LLM si vienen estructuradas; si no, extraer del texto
-        dimensiones_llm = enrichment.get("dimensiones") if enrichment else None
-        medidas: list[float | None] = []
-        separador: str | None = None
-        especificaciones_texto: str | None = None
-
-        if dimensiones_llm:
-            medidas = list(dimensiones_llm)[:4]
-            separador = "X" if len(medidas) > 1 else None
-        elif especificaciones_texto_enriquecidas:
-            especificaciones_texto, medidas, separador = extraer_medidas(especificaciones_texto_enriquecidas)
-
-        medida_fields = build_medida_fields(
-            especificaciones_texto=especificaciones_texto,
-            medidas=medidas,
-            separador=separador,
+    if oems_a_consultar:
+        if use_llm:
+            # Falla antes de scrapear la hoja si falta OPENAI_API_KEY
+            get_client()
+        enrichments = _enrich_oem_codes(
+            oems_a_consultar, use_llm, cache, session, workers, requests_per_second, llm_batch_size, async_llm
         )
+        oems_conocidos.registrar(oems_a_consultar, enrichments)
+        log_scraper_site_stats()
+        if use_llm:
+            log_llm_usage()
+
+    tabla = ConstructorTabla(COLUMNAS_OEM, {"proveedor": nombre_hoja, "formato_origen": FORMAT_OEM_SOLO})
+    for oem_code, clave in zip(oem_codes, claves):
+        filas = filas_locales.get(clave)
+        if filas:
+            for fila in filas:
+                tabla.agregar((oem_code, None, *fila))
+        else:
+            _agregar_filas_enriquecidas(tabla, oem_code, oems_conocidos.enriquecimiento(clave))
 
-        compat_list = enrichment.get("compatibilidades") if enrichment else None
-        compat_list = compat_list if isinstance(compat_list, list) else []
-
-        if not compat_list:
-            compat_list = [
-                {
-                    "compatibilidad_marca": enrichment.get("compatibilidad_marca") if enrichment else None,
-                    "compatibilidad_modelo": enrichment.get("compatibilidad_modelo") if enrichment else None,
-                    "compatibilidad_anio_desde": enrichment.get("compatibilidad_anio_desde") if enrichment else None,
-                    "compatibilidad_anio_hasta": enrichment.get("compatibilidad_anio_hasta") if enrichment else None,
-                    "compatibilidad_motor_litros": enrichment.get("compatibilidad_motor_litros") if enrichment else None,
-                    "compatibilidad_codigo_motor": enrichment.get("compatibilidad_codigo_motor") if enrichment else None,
-                    "compatibilidad_texto": enrichment.get("compatibilidad_texto") if enrichment else None,
-                }
-            ]
-
-        if not compat_list:
-            compat_list = [
-                {
-                    "compatibilidad_marca": None,
-                    "compatibilidad_modelo": None,
-                    "compatibilidad_anio_desde": None,
-                    "compatibilidad_anio_hasta": None,
-                    "compatibilidad_motor_litros": None,
-                    "compatibilidad_codigo_motor": None,
-                    "compatibilidad_texto": None,
-                }
-            ]
-
-        def _int_or_none(val):
-            try:
-                return int(val) if val is not None else None
-            except Exception:
-                return None
-
-        def _split_engine_codes(raw: Any) -> list[str | None]:
-            if raw is None:
-                return [None]
-            if isinstance(raw, (int, float)):
-                return [str(raw)]
-            if not isinstance(raw, str):
-                return [None]
-            parts = [p.strip() for p in re.split(r"[;,|]", raw) if p.strip()]
-            return parts or [None]
-
-        def _split_variant_codes(raw_text: Any) -> list[str | None]:
-            """
-            Option details suelen venir como: '1NZFE; NCP91L-AGMRKA, NCP91L-AGMRKK'.
-            Queremos una fila por cada cС©digo posterior al ';'.
-            """
-            if not isinstance(raw_text, str):
-                return [None]
-            if ";" not in raw_text:
-                return [None]
-            variant_part = raw_text.split(";", 1)[1]
-            variants = [v.strip() for v in re.split(r"[;,|]", variant_part) if v.strip()]
-            return variants or [None]
-
-        for compat in compat_list:
-            compat_texto = compat.get("compatibilidad_texto")
-            compat_marca = compat.get("compatibilidad_marca")
-            compat_modelo = compat.get("compatibilidad_modelo")
-            compat_anio_desde = compat.get("compatibilidad_anio_desde")
-            compat_anio_hasta = compat.get("compatibilidad_anio_hasta")
-            compat_motor_litros = compat.get("compatibilidad_motor_litros")
-            compat_codigo_motor = compat.get("compatibilidad_codigo_motor")
-
-            if not compat_texto:
-                parts = [compat_marca, compat_modelo]
-                if compat_anio_desde or compat_anio_hasta:
-                    if compat_anio_desde and compat_anio_hasta:
-                        parts.append(f"{compat_anio_desde}-{compat_anio_hasta}")
-                    elif compat_anio_desde:
-                        parts.append(str(compat_anio_desde))
-                    else:
-                        parts.append(str(compat_anio_hasta))
-                compat_texto = " ".join([p for p in parts if p]) or None
-
-            # Completar campos faltantes desde compat_texto
-            if compat_texto:
-                if not compat_marca or not compat_modelo:
-                    compat_marca, compat_modelo = extraer_marca_modelo_flexible(compat_texto)
-                if compat_anio_desde is None and compat_anio_hasta is None:
-                    compat_anio_desde, compat_anio_hasta = extraer_anios(compat_texto)
-                if compat_motor_litros is None:
-                    compat_motor_litros = extraer_motor_litros(compat_texto)
-                if compat_codigo_motor is None:
-                    compat_codigo_motor = extraer_codigo_motor(compat_texto)
-
-            engine_codes = _split_engine_codes(compat_codigo_motor)
-            variant_codes = _split_variant_codes(compat_texto)
-
-            for engine_code in engine_codes:
-                for variant_code in variant_codes:
-                    compat_texto_final = compat_texto
-                    if variant_code:
-                        compat_texto_final = f"{compat_texto} | {variant_code}" if compat_texto else variant_code
-
-                row = {
-                    "repuesto_oem": oem_code,
-                    "proveedor": nombre_hoja,
-                    "formato_origen": FORMAT_OEM_SOLO,
-                    "repuesto_sku": enrichment.get("repuesto_sku") if enrichment else None,
-                    "repuesto_nombre": enrichment.get("repuesto_nombre") if enrichment else None,
-                    "repuesto_especificaciones_texto": medida_fields.get("repuesto_especificaciones_texto"),
-                    "compatibilidad_marca": compat_marca,
-                    "compatibilidad_modelo": compat_modelo,
-                    "compatibilidad_anio_desde": _int_or_none(compat_anio_desde),
-                    "compatibilidad_anio_hasta": _int_or_none(compat_anio_hasta),
-                    "compatibilidad_motor_litros": compat_motor_litros,
-                    "compatibilidad_codigo_motor": engine_code,
-                    "compatibilidad_texto": compat_texto_final,
-                }
-
-                row.update(medida_fields)
-
-                final_row = {**DEFAULT_OUTPUT_FIELDS, **row}
-
-                if enrichment:
-                    links = enrichment.get("links_fuente") or []
-                    if links:
-                        final_row["paginas_de_informacion"] = " ; ".join(links)
-                    elif enrichment.get("link_fuente"):
-                        final_row["paginas_de_informacion"] = enrichment.get("link_fuente")
-
-                # Verdadero solo si la fuente es OpenAI/LLM (no para scraping)
-                final_row["uso_de_OPEN_AI"] = enrichment.get("fuente") == "openai" if enrichment else False
-
-                rows.append(final_row)
-
-    return pd.DataFrame(rows)
+    return tabla.construir()
@@ -0,0 +1,174 @@
+from __future__ import annotations
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from constants.formats import FORMAT_APLICACIONES, FORMAT_COMPLETO, FORMAT_NOMBRE_EMBEBIDO, FORMAT_OEM_SOLO
+from constants.output import OUTPUT_COLUMN_ORDER
+from load.fingerprint_store import RowFingerprintStore, StoredRows
+from utils.dataframe import conform_output_chunk
+from utils.logging import get_logger
+
+logger = get_logger()
+
+# Subir al cambiar el parseo/enriquecimiento: invalida todas las salidas guardadas
+VERSION_INCREMENTAL = 1
+
+# Por formato: columna de la hoja que identifica la fila y columna de salida que la conserva
+COLUMNAS_CLAVE = {
+    FORMAT_COMPLETO: ("sku", "repuesto_sku"),
+    FORMAT_APLICACIONES: ("codigo", "repuesto_oem"),
+    FORMAT_NOMBRE_EMBEBIDO: ("sku", "repuesto_sku"),
+    FORMAT_OEM_SOLO: ("oem", "repuesto_oem"),
+}
+
+
+@dataclass
+class EstadisticasIncrementales:
+    nuevas: int = 0
+    modificadas: int = 0
+    sin_cambios: int = 0
+    eliminadas: int = 0
+    # llaves solo OEM sin datos (enriquecimiento fallido o vacío): no se guardan
+    sin_datos: int = 0
+
+
+def _clave(valor: Any) -> str:
+    return "" if pd.isna(valor) else str(valor).strip()
+
+
+def _hash_grupo(format_key: str, columnas: List[str], filas: List[list], extra: Optional[str] = None) -> str:
+    partes = [VERSION_INCREMENTAL, format_key, columnas, filas] + ([extra] if extra is not None else [])
+    contenido = json.dumps(partes, ensure_ascii=False)
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+def _salida_reutilizable(format_key: str, registros: List[Dict[str, Any]]) -> bool:
+    """
+    La salida de un OEM sin datos (el enriquecimiento falló o volvió vacío) no se guarda en
+    el store: su hash solo cubre la fila, así que nunca se reintentaría. Al no guardarla se
+    reprocesa en cada corrida y la cache de OEM (con su TTL y TTL negativo, sin errores)
+    decide si se vuelve a consultar afuera.
+    """
+    if format_key != FORMAT_OEM_SOLO:
+        return True
+    return any(
+        registro.get(columna) is not None
+        for registro in registros
+        for columna in ("repuesto_nombre", "compatibilidad_texto", "compatibilidad_modelo")
+    )
+
+
+def _registros_por_clave(salida: pd.DataFrame, columna_salida: str) -> Dict[str, List[Dict[str, Any]]]:
+    if salida.empty:
+        return {}
+    # nulos -> None y escalares numpy -> Python, para poder guardarlos como JSON
+    registros = salida.astype(object).where(salida.notna(), None).to_dict("records")
+    por_clave: Dict[str, List[Dict[str, Any]]] = {}
+    for registro in registros:
+        por_clave.setdefault(_clave(registro[columna_salida]), []).append(registro)
+    return por_clave
+
+
+def procesar_hoja_incremental(
+    data_frame: pd.DataFrame,
+    nombre_hoja: str,
+    format_key: str,
+    procesar: Callable[[pd.DataFrame], pd.DataFrame],
+    store: RowFingerprintStore,
+    huella_externa: Optional[Callable[[str], str]] = None,
+) -> pd.DataFrame:
+    """
+    Procesa solo las filas nuevas o modificadas de la hoja y reutiliza del `store` la salida
+    de las demás. La unidad es la llave de fila (SKU/OEM/CODIGO): si cambia cualquier fila
+    con esa llave se reprocesan todas las filas de la llave. La salida queda ordenada por
+    la primera aparición de cada llave en la hoja.
+    `huella_externa(llave)` suma al hash lo que la salida de la llave toma de fuera de la
+    hoja (ej. filas de OEM conocidos de otras hojas): si cambia, la llave se reprocesa.
+    """
+    if data_frame.empty:
+        store.save_sheet_changes(nombre_hoja, {}, store.load_sheet(nombre_hoja))
+        return pd.DataFrame()
+
+    columna_clave, columna_salida = COLUMNAS_CLAVE[format_key]
+    columnas = {str(column_name).strip().lower(): column_name for column_name in data_frame.columns}
+    nombres_columnas = [str(column_name) for column_name in data_frame.columns]
+
+    filas = data_frame.astype(object).where(data_frame.notna(), None).values.tolist()
+    claves = [_clave(valor) for valor in data_frame[columnas[columna_clave]].tolist()]
+    posiciones_por_clave: Dict[str, List[int]] = {}
+    for posicion, clave in enumerate(claves):
+        posiciones_por_clave.setdefault(clave, []).append(posicion)
+
+    guardadas = store.load_sheet(nombre_hoja)
+    estadisticas = EstadisticasIncrementales()
+    hashes: Dict[str, str] = {}
+    claves_a_procesar: List[str] = []
+    for clave, posiciones in posiciones_por_clave.items():
+        hashes[clave] = _hash_grupo(
+            format_key,
+            nombres_columnas,
+            [filas[posicion] for posicion in posiciones],
+            huella_externa(clave) if huella_externa is not None else None,
+        )
+        guardada = guardadas.get(clave)
+        if guardada is None:
+            estadisticas.nuevas += len(posiciones)
+            claves_a_procesar.append(clave)
+        elif guardada.content_hash != hashes[clave]:
+            estadisticas.modificadas += len(posiciones)
+            claves_a_procesar.append(clave)
+        else:
+            estadisticas.sin_cambios += len(posiciones)
+
+    claves_eliminadas = [clave for clave in guardadas if clave not in posiciones_por_clave]
+    estadisticas.eliminadas = sum(guardadas[clave].source_rows for clave in claves_eliminadas)
+
+    registros_nuevos: Dict[str, List[Dict[str, Any]]] = {}
+    if claves_a_procesar:
+        posiciones_a_procesar = sorted(
+            posicion for clave in claves_a_procesar for posicion in posiciones_por_clave[clave]
+        )
+        salida = procesar(data_frame.iloc[posiciones_a_procesar])
+        registros_nuevos = _registros_por_clave(salida, columna_salida)
+
+    claves_sin_datos = [
+        clave for clave in claves_a_procesar
+        if not _salida_reutilizable(format_key, registros_nuevos.get(clave, []))
+    ]
+    estadisticas.sin_datos = sum(len(posiciones_por_clave[clave]) for clave in claves_sin_datos)
+    sin_datos = set(claves_sin_datos)
+    store.save_sheet_changes(
+        nombre_hoja,
+        {
+            clave: StoredRows(
+                content_hash=hashes[clave],
+                source_rows=len(posiciones_por_clave[clave]),
+                output_rows=json.dumps(registros_nuevos.get(clave, []), ensure_ascii=False),
+            )
+            for clave in claves_a_procesar
+            if clave not in sin_datos
+        },
+        # una llave que antes tenía datos y ahora no, tampoco queda guardada
+        claves_eliminadas + [clave for clave in claves_sin_datos if clave in guardadas],
+    )
+    logger.info(
+        f"[INCREMENTAL] Hoja '{nombre_hoja}': nuevas={estadisticas.nuevas} modificadas={estadisticas.modificadas} "
+        f"sin_cambios={estadisticas.sin_cambios} eliminadas={estadisticas.eliminadas} "
+        f"sin_datos={estadisticas.sin_datos} (filas)"
+    )
+
+    reprocesadas = set(claves_a_procesar)
+    registros: List[Dict[str, Any]] = []
+    for clave in posiciones_por_clave:
+        if clave in reprocesadas:
+            registros.extend(registros_nuevos.get(clave, []))
+        else:
+            registros.extend(json.loads(guardadas[clave].output_rows))
+    if not registros:
+        return pd.DataFrame()
+    # mismos dtypes haya sido la fila reprocesada o leída del store
+    return conform_output_chunk(pd.DataFrame(registros), OUTPUT_COLUMN_ORDER)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from constants.formats import FORMAT_COMPLETO, FORMAT_NOMBRE_EMBEBIDO
+from transform.columnas import MEDIDA_COLUMNS
+from utils.logging import get_logger
+from utils.oem import normalize_oem_code
+
+logger = get_logger()
+
+# Hojas cuyo OEM viene con nombre y compatibilidades propias
+FORMATOS_CON_OEM = (FORMAT_COMPLETO, FORMAT_NOMBRE_EMBEBIDO)
+
+# Columnas que se copian a la fila de la hoja solo OEM, en el orden de COLUMNAS_OEM después
+# de repuesto_oem / repuesto_sku (el SKU es del otro proveedor: no se copia)
+COLUMNAS_COPIADAS = [
+    "repuesto_nombre",
+    "compatibilidad_marca",
+    "compatibilidad_modelo",
+    "compatibilidad_anio_desde",
+    "compatibilidad_anio_hasta",
+    "compatibilidad_motor_litros",
+    "compatibilidad_codigo_motor",
+    "compatibilidad_texto",
+    *MEDIDA_COLUMNS,
+    "uso_de_OPEN_AI",
+    "paginas_de_informacion",
+]
+
+
+@dataclass
+class ConsultasOem:
+    # OEM (filas con OEM) vistos en hojas solo OEM
+    oems: int = 0
+    # completados con filas de otras hojas del libro
+    desde_otras_hojas: int = 0
+    # repetidos en la corrida: reusan el enriquecimiento de su primera aparición
+    repetidos: int = 0
+    # enriquecidos (cache -> scraping -> LLM)
+    consultados: int = 0
+
+    @property
+    def evitadas(self) -> int:
+        return self.desde_otras_hojas + self.repetidos
+
+
+def clave_oem(oem_code: str) -> str:
+    return normalize_oem_code(oem_code) or oem_code
+
+
+class IndiceOemConocidos:
+    """
+    OEM normalizados (sin guiones, espacios ni mayúsculas/minúsculas) de la corrida:
+    - `buscados`: los OEM de las hojas solo OEM. De las salidas de hojas formato completo /
+      nombre embebido solo se guardan (como tuplas de COLUMNAS_COPIADAS) las filas con esos
+      OEM que traen nombre y compatibilidad; el resto de la salida no se retiene;
+    - el enriquecimiento ya obtenido para cada OEM, para no consultarlo de nuevo si se repite
+      en la misma hoja, en otro chunk u otra hoja solo OEM.
+    """
+
+    def __init__(self, buscados: Iterable[str] = ()):
+        self.stats = ConsultasOem()
+        self._buscados = {clave_oem(str(oem_code).strip()) for oem_code in buscados}
+        self._locales: Dict[str, List[tuple]] = {}
+        self._enriquecimientos: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def agregar_salida(self, data_frame: pd.DataFrame) -> None:
+        if not self._buscados or data_frame.empty or "formato_origen" not in data_frame.columns:
+            return
+        conocidas = data_frame[
+            data_frame["formato_origen"].isin(FORMATOS_CON_OEM)
+            & data_frame["repuesto_oem"].notna()
+            & data_frame["repuesto_nombre"].notna()
+            & (data_frame["compatibilidad_marca"].notna() | data_frame["compatibilidad_modelo"].notna())
+        ]
+        if conocidas.empty:
+            return
+        # se normaliza cada OEM distinto una sola vez
+        codigos, oems_unicos = pd.factorize(conocidas["repuesto_oem"])
+        claves_unicas = np.array([clave_oem(str(oem_code)) for oem_code in oems_unicos], dtype=object)
+        buscadas = np.array([clave in self._buscados for clave in claves_unicas], dtype=bool)[codigos]
+        if not buscadas.any():
+            return
+        valores = conocidas.loc[buscadas, COLUMNAS_COPIADAS].astype(object)
+        valores = valores.where(valores.notna(), None)
+        claves = claves_unicas[codigos[buscadas]].tolist()
+        for clave, fila in zip(claves, valores.itertuples(index=False, name=None)):
+            self._locales.setdefault(clave, []).append(fila)
+
+    def huella(self, oem_code: str) -> str:
+        """Hash de las filas locales del OEM: el ETL incremental reprocesa el OEM si cambian."""
+        filas = self._locales.get(clave_oem(oem_code.strip()), [])
+        return hashlib.sha1(repr(filas).encode("utf-8")).hexdigest()
+
+    def planificar(self, oem_codes: Sequence[str]) -> tuple[List[str], Dict[str, List[tuple]], List[str]]:
+        """
+        Para los OEM de una hoja (o chunk) solo OEM retorna: su clave normalizada, las filas
+        locales de los que ya aparecen en otras hojas y los OEM a enriquecer (uno por clave
+        que no sea local ni se haya enriquecido antes en la corrida).
+        """
+        claves = [clave_oem(oem_code) for oem_code in oem_codes]
+        filas_locales = {clave: self._locales[clave] for clave in set(claves) if clave in self._locales}
+        a_consultar: Dict[str, str] = {}
+        for oem_code, clave in zip(oem_codes, claves):
+            self.stats.oems += 1
+            if clave in filas_locales:
+                self.stats.desde_otras_hojas += 1
+            elif clave in self._enriquecimientos or clave in a_consultar:
+                self.stats.repetidos += 1
+            else:
+                a_consultar[clave] = oem_code
+                self.stats.consultados += 1
+        return claves, filas_locales, list(a_consultar.values())
+
+    def registrar(self, oem_codes: Sequence[str], enrichments: Sequence[Optional[Dict[str, Any]]]) -> None:
+        for oem_code, enrichment in zip(oem_codes, enrichments):
+            self._enriquecimientos[clave_oem(oem_code)] = enrichment
+
+    def enriquecimiento(self, clave: str) -> Optional[Dict[str, Any]]:
+        return self._enriquecimientos.get(clave)
+
+    def log_stats(self) -> None:
+        logger.info(
+            f"[OEM] {self.stats.oems} OEM en hojas solo OEM: {self.stats.desde_otras_hojas} desde otras hojas, "
+            f"{self.stats.repetidos} repetidos, {self.stats.consultados} enriquecidos "
+            f"({self.stats.evitadas} consultas externas evitadas)"
+        )
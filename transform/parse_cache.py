@@ -0,0 +1,160 @@
+from __future__ import annotations
+import itertools
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple
+
+from transform import parsing_compatibilidades, parsing_medidas, parsing_nombre_embebido
+from transform.delete_0 import limpiar_ceros_modelo_texto as _limpiar_ceros_modelo_texto
+from utils.logging import get_logger
+
+logger = get_logger()
+
+# Strings distintos que guarda cada parser (LRU); acota la memoria con hojas grandes
+PARSE_CACHE_MAXSIZE = 100_000
+
+
+class MemoParser:
+    """
+    Parser de texto con memoización acotada (LRU). Los resultados se comparten entre
+    llamadas: quien los use no debe mutarlos.
+    """
+
+    def __init__(self, parser: Callable[[str], Any], maxsize: int = PARSE_CACHE_MAXSIZE):
+        self.name = parser.__name__
+        self._cached = lru_cache(maxsize=maxsize)(parser)
+
+    def __call__(self, texto: str) -> Any:
+        return self._cached(texto)
+
+    @property
+    def hit_rate(self) -> float:
+        cache_info = self._cached.cache_info()
+        total = cache_info.hits + cache_info.misses
+        return cache_info.hits / total if total else 0.0
+
+    def cache_clear(self) -> None:
+        self._cached.cache_clear()
+
+
+@dataclass
+class ColumnStats:
+    """Filas vs strings únicos vistos por una columna al factorizar."""
+    rows: int = 0
+    unique: int = 0
+
+    @property
+    def unique_ratio(self) -> float:
+        return self.unique / self.rows if self.rows else 0.0
+
+
+@dataclass(frozen=True)
+class ParseStatsSnapshot:
+    """
+    Totales acumulados de un proceso del pool de hojas, que viajan con el resultado de cada
+    hoja: columnas {nombre: (filas, únicos)} y parsers {nombre: (hits, misses, en_cache)}.
+    """
+    pid: int
+    secuencia: int
+    columnas: Dict[str, Tuple[int, int]]
+    parsers: Dict[str, Tuple[int, int, int]]
+
+
+MEMO_PARSERS: Dict[str, MemoParser] = {}
+COLUMN_STATS: Dict[str, ColumnStats] = {}
+# Último snapshot recibido de cada proceso del pool (por pid); este proceso usa COLUMN_STATS / MEMO_PARSERS
+WORKER_STATS: Dict[int, ParseStatsSnapshot] = {}
+_stats_lock = threading.Lock()
+_secuencia_snapshot = itertools.count()
+
+
+def memoizar(parser: Callable[[str], Any], maxsize: int = PARSE_CACHE_MAXSIZE) -> MemoParser:
+    memo_parser = MemoParser(parser, maxsize=maxsize)
+    MEMO_PARSERS[memo_parser.name] = memo_parser
+    return memo_parser
+
+
+def registrar_columna(nombre: str, filas: int, unicos: int) -> None:
+    with _stats_lock:
+        column_stats = COLUMN_STATS.setdefault(nombre, ColumnStats())
+        column_stats.rows += filas
+        column_stats.unique += unicos
+
+
+def snapshot_parse_stats() -> ParseStatsSnapshot:
+    """Totales de este proceso para mandarlos al proceso principal (ver `merge_parse_stats`)."""
+    with _stats_lock:
+        columnas = {nombre: (column_stats.rows, column_stats.unique) for nombre, column_stats in COLUMN_STATS.items()}
+    parsers = {}
+    for memo_parser in MEMO_PARSERS.values():
+        cache_info = memo_parser._cached.cache_info()
+        if cache_info.hits + cache_info.misses:
+            parsers[memo_parser.name] = (cache_info.hits, cache_info.misses, cache_info.currsize)
+    return ParseStatsSnapshot(os.getpid(), next(_secuencia_snapshot), columnas, parsers)
+
+
+def merge_parse_stats(snapshot: ParseStatsSnapshot) -> None:
+    """
+    Suma a los logs [PARSE] lo parseado en un proceso del pool. Los snapshots son acumulados:
+    el más reciente de cada proceso reemplaza al anterior.
+    """
+    with _stats_lock:
+        previous = WORKER_STATS.get(snapshot.pid)
+        if previous is None or snapshot.secuencia > previous.secuencia:
+            WORKER_STATS[snapshot.pid] = snapshot
+
+
+def log_parse_stats() -> None:
+    with _stats_lock:
+        columnas = {nombre: [column_stats.rows, column_stats.unique] for nombre, column_stats in COLUMN_STATS.items()}
+        worker_snapshots = list(WORKER_STATS.values())
+    parsers: Dict[str, list] = {}
+    for memo_parser in MEMO_PARSERS.values():
+        cache_info = memo_parser._cached.cache_info()
+        if cache_info.hits + cache_info.misses:
+            parsers[memo_parser.name] = [cache_info.hits, cache_info.misses, cache_info.currsize, 1]
+    for snapshot in worker_snapshots:
+        for nombre, (filas, unicos) in snapshot.columnas.items():
+            totales = columnas.setdefault(nombre, [0, 0])
+            totales[0] += filas
+            totales[1] += unicos
+        for nombre, (hits, misses, currsize) in snapshot.parsers.items():
+            totales = parsers.setdefault(nombre, [0, 0, 0, 0])
+            totales[0] += hits
+            totales[1] += misses
+            totales[2] += currsize
+            totales[3] += 1
+
+    for nombre, (filas, unicos) in columnas.items():
+        column_stats = ColumnStats(filas, unicos)
+        logger.info(
+            f"[PARSE] columna {nombre}: filas={column_stats.rows} únicos={column_stats.unique} "
+            f"(ratio={column_stats.unique_ratio:.1%})"
+        )
+    for nombre, (hits, misses, currsize, procesos) in parsers.items():
+        # cada proceso tiene su propia cache: la capacidad es por proceso
+        logger.info(
+            f"[PARSE] {nombre}: llamadas={hits + misses} hit_rate={hits / (hits + misses):.1%} "
+            f"en_cache={currsize}/{MEMO_PARSERS[nombre]._cached.cache_info().maxsize * procesos}"
+        )
+
+
+def reset_parse_stats() -> None:
+    with _stats_lock:
+        COLUMN_STATS.clear()
+        WORKER_STATS.clear()
+    for memo_parser in MEMO_PARSERS.values():
+        memo_parser.cache_clear()
+
+
+parsear_compatibilidad = memoizar(parsing_compatibilidades.parsear_compatibilidad)
+extraer_marca_modelo_flexible = memoizar(parsing_compatibilidades.extraer_marca_modelo_flexible)
+extraer_anios = memoizar(parsing_compatibilidades.extraer_anios)
+extraer_motor_litros = memoizar(parsing_compatibilidades.extraer_motor_litros)
+extraer_codigo_motor = memoizar(parsing_compatibilidades.extraer_codigo_motor)
+split_aplicaciones_seguro = memoizar(parsing_compatibilidades.split_aplicaciones_seguro)
+extraer_medidas = memoizar(parsing_medidas.extraer_medidas)
+parse_compatibilidad_desde_nombre = memoizar(parsing_nombre_embebido.parse_compatibilidad_desde_nombre)
+limpiar_ceros_modelo_texto = memoizar(_limpiar_ceros_modelo_texto)
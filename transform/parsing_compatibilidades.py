@@ -1,6 +1,6 @@
 from __future__ import annotations
 import re
-from typing import Optional, Tuple
+from typing import NamedTuple, Optional, Tuple
 
 from constants.vehicles import KNOWN_MAKES
 
@@ -34,26 +34,59 @@ def _to_year_4(year_token: str) -> Optional[int]:
     return None
 
 
-def extraer_anios(texto: str) -> Tuple[Optional[int], Optional[int]]:
-    normalized_text = texto.upper()
-    normalized_text = MEASURE_BLOCK.sub(" ", normalized_text)
-    normalized_text = DECIMALS.sub(" ", normalized_text)
-
-    range_match = RANGE_4DIGIT.search(normalized_text)
-    if range_match:
-        return int(range_match.group(1)), int(range_match.group(2))
-
-    range_match = RANGE_2DIGIT.search(normalized_text)
-    if range_match:
-        return _to_year_4(range_match.group(1)), _to_year_4(range_match.group(2))
+class CompatibilidadParseada(NamedTuple):
+    """Campos de compatibilidad extraídos de un fragmento de texto (inmutable, apto para cache)."""
+    marca: Optional[str]
+    modelo: Optional[str]
+    anio_desde: Optional[int]
+    anio_hasta: Optional[int]
+    motor_litros: Optional[float]
+    codigo_motor: Optional[str]
 
-    range_match = GENERIC_RANGE.search(normalized_text)
-    if range_match:
-        return _to_year_4(range_match.group(1)), _to_year_4(range_match.group(2))
 
-    on_match = ON_PATTERN.search(normalized_text)
-    if on_match:
-        return _to_year_4(on_match.group(1)), None
+def parsear_compatibilidad(texto: str) -> CompatibilidadParseada:
+    """
+    Escáner único: pasa el texto a mayúsculas y lo tokeniza una sola vez, y con eso llena
+    marca/modelo, años, litros y código de motor. Mismo resultado que las cuatro
+    funciones `extraer_*` por separado (que ahora delegan en los mismos helpers).
+    """
+    normalized_text = texto.upper()
+    marca, modelo = _marca_modelo_desde_tokens(normalized_text.split())
+    anio_desde, anio_hasta = _anios_desde_mayusculas(normalized_text)
+    return CompatibilidadParseada(
+        marca,
+        modelo,
+        anio_desde,
+        anio_hasta,
+        _motor_litros_desde_texto(texto),
+        _codigo_motor_desde_mayusculas(normalized_text),
+    )
+
+
+def _anios_desde_mayusculas(normalized_text: str) -> Tuple[Optional[int], Optional[int]]:
+    # los chequeos de caracteres evitan correr regex que no pueden calzar
+    if "X" in normalized_text or "*" in normalized_text or "\u00D7" in normalized_text:
+        normalized_text = MEASURE_BLOCK.sub(" ", normalized_text)
+    if "." in normalized_text:
+        normalized_text = DECIMALS.sub(" ", normalized_text)
+
+    if "-" in normalized_text or "/" in normalized_text:
+        range_match = RANGE_4DIGIT.search(normalized_text)
+        if range_match:
+            return int(range_match.group(1)), int(range_match.group(2))
+
+        range_match = RANGE_2DIGIT.search(normalized_text)
+        if range_match:
+            return _to_year_4(range_match.group(1)), _to_year_4(range_match.group(2))
+
+        range_match = GENERIC_RANGE.search(normalized_text)
+        if range_match:
+            return _to_year_4(range_match.group(1)), _to_year_4(range_match.group(2))
+
+    if "ON" in normalized_text:
+        on_match = ON_PATTERN.search(normalized_text)
+        if on_match:
+            return _to_year_4(on_match.group(1)), None
 
     year_match = YEAR4.search(normalized_text)
     if year_match:
@@ -63,7 +96,9 @@ def extraer_anios(texto: str) -> Tuple[Optional[int], Optional[int]]:
     return None, None
 
 
-def extraer_motor_litros(texto: str) -> Optional[float]:
+def _motor_litros_desde_texto(texto: str) -> Optional[float]:
+    if "." not in texto:
+        return None
     liters_match = LITERS.search(texto)
     if not liters_match:
         return None
@@ -73,45 +108,60 @@ def extraer_motor_litros(texto: str) -> Optional[float]:
     return liters_value
 
 
-def extraer_codigo_motor(texto: str) -> Optional[str]:
-    normalized_text = texto.upper()
+def _codigo_motor_desde_mayusculas(normalized_text: str) -> Optional[str]:
     candidates = []
     for token in TOKEN.findall(normalized_text):
-        if token in KNOWN_MAKES or token in STOP_WORDS:
+        # TOKEN solo deja [A-Z0-9]: "tiene letra y dígito" equivale a no ser solo dígitos ni solo letras
+        if token.isdigit() or token.isalpha():
             continue
-        if not HAS_LETTER.search(token) or not HAS_DIGIT.search(token):
-            continue
-        if token.isdigit():
+        if token in KNOWN_MAKES or token in STOP_WORDS:
             continue
         candidates.append(token)
 
     if not candidates:
         return None
 
-    candidates.sort(key=lambda token: (-(len(token)), -sum(ch.isdigit() for ch in token)))
-    return candidates[0]
+    # min() devuelve el primero entre empates, igual que sort estable + [0]
+    return min(candidates, key=lambda token: (-(len(token)), -sum(ch.isdigit() for ch in token)))
 
 
-def extraer_marca_modelo_flexible(texto: str) -> tuple[Optional[str], Optional[str]]:
-    tokens = [token for token in texto.strip().split() if token]
+def _marca_modelo_desde_tokens(tokens: list[str]) -> tuple[Optional[str], Optional[str]]:
+    """`tokens` ya en mayúsculas (split por espacios)."""
     if not tokens:
         return None, None
 
-    first_token = tokens[0].upper()
-    marca = first_token if first_token in KNOWN_MAKES else None
+    marca = tokens[0] if tokens[0] in KNOWN_MAKES else None
     model_start_index = 1 if marca else 0
 
     modelo_tokens = []
     for token in tokens[model_start_index:]:
-        token_upper = token.upper()
-        if YEAR4.fullmatch(token_upper) or LITERS.fullmatch(token) or RANGE_2DIGIT.fullmatch(token) or RANGE_4DIGIT.fullmatch(token):
+        # años, rangos y litros empiezan siempre con dígito
+        if token[0].isdigit() and (
+            YEAR4.fullmatch(token) or LITERS.fullmatch(token) or RANGE_2DIGIT.fullmatch(token) or RANGE_4DIGIT.fullmatch(token)
+        ):
             break
-        if token_upper == "0":
+        if token == "0":
             continue
         modelo_tokens.append(token)
 
     modelo = " ".join(modelo_tokens).strip() if modelo_tokens else None
-    return marca, (modelo.upper() if modelo else None)
+    return marca, (modelo if modelo else None)
+
+
+def extraer_anios(texto: str) -> Tuple[Optional[int], Optional[int]]:
+    return _anios_desde_mayusculas(texto.upper())
+
+
+def extraer_motor_litros(texto: str) -> Optional[float]:
+    return _motor_litros_desde_texto(texto)
+
+
+def extraer_codigo_motor(texto: str) -> Optional[str]:
+    return _codigo_motor_desde_mayusculas(texto.upper())
+
+
+def extraer_marca_modelo_flexible(texto: str) -> tuple[Optional[str], Optional[str]]:
+    return _marca_modelo_desde_tokens(texto.upper().split())
 
 
 def split_aplicaciones_seguro(aplicaciones: str) -> list[str]:
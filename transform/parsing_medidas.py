@@ -1,6 +1,6 @@
 from __future__ import annotations
 import re
-from typing import Optional, Tuple, List, Dict
+from typing import NamedTuple, Optional, Tuple, List
 
 DRIVETRAIN = re.compile(r"\b4\s*[xX]\s*[24]\b")
 BELT_CODE = re.compile(r"\b\d+PK-\d+\b", re.IGNORECASE)
@@ -16,6 +16,17 @@ SEQUENCE_EXPLICIT_PATTERN = re.compile(
 SPLIT_SEQUENCE_PATTERN = re.compile(r"\s*(?:[xX\*\u00D7-])\s*")
 
 
+class CamposMedida(NamedTuple):
+    """Columnas de medidas de una fila de salida (tupla inmutable: sin dict por fila, apta para cache)."""
+    repuesto_especificaciones_texto: Optional[str]
+    repuesto_medida_1: Optional[float]
+    repuesto_medida_2: Optional[float]
+    repuesto_medida_3: Optional[float]
+    repuesto_medida_4: Optional[float]
+    repuesto_cantidad_medidas: int
+    repuesto_separador_medidas: Optional[str]
+
+
 def _to_float(raw_number: str) -> Optional[float]:
     normalized_number = raw_number.strip().replace(",", ".")
     if normalized_number.endswith("."):
@@ -167,7 +178,7 @@ def build_medida_fields(
     especificaciones_texto: Optional[str],
     medidas: List[Optional[float]],
     separador: Optional[str],
-) -> Dict[str, object]:
+) -> CamposMedida:
     def _format_number(value: object | None) -> str | None:
         if value is None:
             return None
@@ -202,12 +213,12 @@ def build_medida_fields(
     if not cleaned_specs:
         cleaned_specs = _build_specs_from_medidas(medidas, separador)
 
-    return {
-        "repuesto_especificaciones_texto": cleaned_specs,
-        "repuesto_medida_1": medida_1,
-        "repuesto_medida_2": medida_2,
-        "repuesto_medida_3": medida_3,
-        "repuesto_medida_4": medida_4,
-        "repuesto_cantidad_medidas": len(medidas) if medidas else 0,
-        "repuesto_separador_medidas": separador,
-    }
+    return CamposMedida(
+        cleaned_specs,
+        medida_1,
+        medida_2,
+        medida_3,
+        medida_4,
+        len(medidas) if medidas else 0,
+        separador,
+    )
@@ -1,6 +1,6 @@
 from __future__ import annotations
 import re
-from typing import Optional, List, Tuple
+from typing import NamedTuple, Optional, List, Tuple
 
 from constants.vehicles import KNOWN_MAKES
 
@@ -17,6 +17,18 @@ RANGE_SLASH = re.compile(r"\b(\d{2,4})/(\d{2,4})\b")       # 1042/ ... (ojo: no
 LITERS = re.compile(r"\b(\d\.\d)\b")
 ENGINE = re.compile(r"\b([A-Z]\d[A-Z0-9]{2,8})\b")
 
+
+class CompatibilidadEmbebida(NamedTuple):
+    """Una compatibilidad extraída del nombre; campos con el nombre de la columna de salida."""
+    compatibilidad_marca: Optional[str]
+    compatibilidad_modelo: Optional[str]
+    compatibilidad_anio_desde: Optional[int]
+    compatibilidad_anio_hasta: Optional[int]
+    compatibilidad_motor_litros: Optional[float]
+    compatibilidad_codigo_motor: Optional[str]
+    compatibilidad_texto: str
+
+
 def _to_year4(year_token: str) -> Optional[int]:
     year_token = year_token.strip()
     if len(year_token) == 4:
@@ -93,10 +105,10 @@ def split_vehiculos_en_nombre(nombre: str) -> List[str]:
 
     return [normalized_vehicle_text]
 
-def parse_compatibilidad_desde_nombre(nombre: str) -> List[dict]:
+def parse_compatibilidad_desde_nombre(nombre: str) -> List[CompatibilidadEmbebida]:
     """
     Extrae 1+ compatibilidades desde el nombre del repuesto.
-    Devuelve lista de dicts con compatibilidad_marca, compatibilidad_modelo, anios, motor, codigo_motor, compatibilidad_texto.
+    Devuelve lista de CompatibilidadEmbebida (marca, modelo, anios, motor, codigo_motor, texto).
     """
     compatibility_records = []
     for vehicle_text in split_vehiculos_en_nombre(nombre):
@@ -116,15 +128,9 @@ def parse_compatibilidad_desde_nombre(nombre: str) -> List[dict]:
             # no hay marca: guardamos todo como texto y modelo None
             anio_desde, anio_hasta = extraer_anios_embebidos(vehicle_text)
             motor_litros, codigo_motor = extraer_motor_y_codigo(vehicle_text)
-            compatibility_records.append({
-                "compatibilidad_marca": None,
-                "compatibilidad_modelo": None,
-                "compatibilidad_anio_desde": anio_desde,
-                "compatibilidad_anio_hasta": anio_hasta,
-                "compatibilidad_motor_litros": motor_litros,
-                "compatibilidad_codigo_motor": codigo_motor,
-                "compatibilidad_texto": vehicle_text
-            })
+            compatibility_records.append(CompatibilidadEmbebida(
+                None, None, anio_desde, anio_hasta, motor_litros, codigo_motor, vehicle_text
+            ))
             continue
 
         marca = vehicle_tokens[marca_index].upper()
@@ -154,14 +160,8 @@ def parse_compatibilidad_desde_nombre(nombre: str) -> List[dict]:
         motor_litros, codigo_motor = extraer_motor_y_codigo(vehicle_text)
 
         # rango abierto: si solo hay desde y no hay hasta, lo dejamos None
-        compatibility_records.append({
-            "compatibilidad_marca": marca,
-            "compatibilidad_modelo": modelo,
-            "compatibilidad_anio_desde": anio_desde,
-            "compatibilidad_anio_hasta": anio_hasta,
-            "compatibilidad_motor_litros": motor_litros,
-            "compatibilidad_codigo_motor": codigo_motor,
-            "compatibilidad_texto": vehicle_text
-        })
+        compatibility_records.append(CompatibilidadEmbebida(
+            marca, modelo, anio_desde, anio_hasta, motor_litros, codigo_motor, vehicle_text
+        ))
 
     return compatibility_records
@@ -1,6 +1,9 @@
 from __future__ import annotations
-from typing import Iterable
+from typing import Iterable, Sequence
 import pandas as pd
+from pandas.api.types import union_categoricals
+
+from constants.output import OUTPUT_SCHEMA
 
 
 def order_columns_by_prefix(data_frame: pd.DataFrame, prefixes: Iterable[str]) -> pd.DataFrame:
@@ -40,3 +43,54 @@ def reorder_columns(data_frame: pd.DataFrame, priority_columns: Iterable[str]) -
             seen.add(column)
 
     return data_frame.loc[:, ordered_columns]
+
+
+def conform_output_chunk(data_frame: pd.DataFrame, columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Chunk con exactamente `columns` (faltantes quedan nulas, sobrantes se descartan) y los
+    dtypes de `OUTPUT_SCHEMA` (columnas fuera del esquema quedan como texto).
+    """
+    conformed = data_frame.reindex(columns=list(columns))
+    for column_name in conformed.columns:
+        dtype = OUTPUT_SCHEMA.get(column_name, "str")
+        column = conformed[column_name]
+        if column.dtype == dtype:
+            continue
+        if dtype == "category":
+            conformed[column_name] = column.astype("str").astype("category")
+        elif dtype == "bool":
+            conformed[column_name] = column.astype("boolean").fillna(False).astype("bool")
+        elif dtype == "str":
+            conformed[column_name] = column.astype("str")
+        else:
+            conformed[column_name] = pd.to_numeric(column, errors="coerce").astype(dtype)
+    return conformed
+
+
+def concat_output_chunks(data_frames: Sequence[pd.DataFrame]) -> pd.DataFrame:
+    """
+    pd.concat de salidas ya conformadas que mantiene las columnas categóricas: pandas sube
+    a object si las categorías difieren, así que antes se unifican entre todas las partes.
+    """
+    data_frames = list(data_frames)
+    if len(data_frames) < 2:
+        return pd.concat(data_frames, ignore_index=True)
+
+    categories_by_column = {
+        column_name: union_categoricals([data_frame[column_name] for data_frame in data_frames]).categories
+        for column_name in data_frames[0].columns
+        if all(
+            column_name in data_frame.columns and isinstance(data_frame[column_name].dtype, pd.CategoricalDtype)
+            for data_frame in data_frames
+        )
+    }
+    return pd.concat(
+        [
+            data_frame.assign(**{
+                column_name: data_frame[column_name].cat.set_categories(categories)
+                for column_name, categories in categories_by_column.items()
+            })
+            for data_frame in data_frames
+        ],
+        ignore_index=True,
+    )
@@ -0,0 +1,16 @@
+from __future__ import annotations
+import re
+from typing import Any, Optional
+
+OEM_SEPARATORS = re.compile(r"[\s\-_./]+")
+
+
+def normalize_oem_code(oem_code: Any) -> Optional[str]:
+    """
+    Normaliza un OEM para usarlo como llave: sin espacios, guiones ni puntos y en mayúsculas.
+    Ej: " 53410-12480 " -> "5341012480"
+    """
+    if oem_code is None:
+        return None
+    normalized = OEM_SEPARATORS.sub("", str(oem_code).replace("﻿", "")).upper()
+    return normalized or None
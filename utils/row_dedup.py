@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Set
+
+import numpy as np
+import pandas as pd
+
+from utils.logging import get_logger
+
+logger = get_logger()
+
+
+@dataclass
+class DedupStats:
+    rows: int = 0
+    duplicates: int = 0
+
+
+class RowDeduplicator:
+    """
+    Quita filas exactamente repetidas a medida que llegan los chunks, también entre chunks
+    distintos. Cada fila se resume en una huella de 64 bits (`hash_pandas_object`) y solo
+    se guarda el set de huellas vistas, no las filas; con 10M de filas únicas la chance de
+    una colisión (una fila distinta descartada) es ~3e-6. Se conserva la primera aparición,
+    igual que `drop_duplicates()`. Los chunks deben venir con las mismas columnas y dtypes
+    (ver `conform_output_chunk`).
+    """
+
+    def __init__(self, sheet_column: str = "proveedor"):
+        self.sheet_column = sheet_column
+        self.stats: Dict[str, DedupStats] = {}
+        self._seen: Set[int] = set()
+
+    def filter(self, data_frame: pd.DataFrame) -> pd.DataFrame:
+        if data_frame.empty:
+            return data_frame
+
+        fingerprints = pd.Series(pd.util.hash_pandas_object(data_frame, index=False).to_numpy())
+        # repetidas dentro del chunk: vectorizado; contra chunks anteriores: set de huellas
+        keep = ~fingerprints.duplicated().to_numpy()
+        first_positions = np.flatnonzero(keep)
+        first_fingerprints = fingerprints.to_numpy()[first_positions].tolist()
+        seen = self._seen
+        keep[first_positions] = [fingerprint not in seen for fingerprint in first_fingerprints]
+        seen.update(first_fingerprints)
+
+        self._count(data_frame, keep)
+        return data_frame if keep.all() else data_frame[keep]
+
+    def _count(self, data_frame: pd.DataFrame, keep: np.ndarray) -> None:
+        if self.sheet_column in data_frame.columns:
+            sheet_names = data_frame[self.sheet_column].astype("str").fillna("")
+        else:
+            sheet_names = pd.Series("", index=data_frame.index)
+        rows_by_sheet = sheet_names.value_counts(sort=False)
+        duplicates_by_sheet = sheet_names[~keep].value_counts(sort=False)
+        for sheet_name, rows in rows_by_sheet.items():
+            sheet_stats = self.stats.setdefault(sheet_name, DedupStats())
+            sheet_stats.rows += int(rows)
+            sheet_stats.duplicates += int(duplicates_by_sheet.get(sheet_name, 0))
+
+    @property
+    def duplicates(self) -> int:
+        return sum(sheet_stats.duplicates for sheet_stats in self.stats.values())
+
+    def log_stats(self) -> None:
+        for sheet_name, sheet_stats in self.stats.items():
+            logger.info(
+                f"[DEDUP] Hoja '{sheet_name}': {sheet_stats.duplicates} duplicadas de {sheet_stats.rows} filas"
+            )
+        logger.info(f"[DEDUP] Total: {self.duplicates} filas duplicadas descartadas ({len(self._seen)} únicas)")
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from utils.logging import get_logger
+
+logger = get_logger()
+
+# Modos de medición de memoria por etapa (None = solo tiempos)
+MEMORY_TRACEMALLOC = "tracemalloc"
+MEMORY_RSS = "rss"
+
+
+@dataclass
+class StageRecord:
+    """Acumulado de una etapa; una etapa puede ejecutarse varias veces (ej. por chunk)."""
+    name: str
+    calls: int = 0
+    wall_seconds: float = 0.0
+    # CPU del proceso completo durante la etapa (incluye threads de workers)
+    cpu_seconds: float = 0.0
+    rows_in: int = 0
+    rows_out: int = 0
+    # pico absoluto de memoria (MB) visto durante la etapa; None si no se midió
+    peak_memory_mb: Optional[float] = None
+
+
+@dataclass
+class StageRows:
+    """Lo que la etapa en curso reporta al terminar."""
+    rows_in: int = 0
+    rows_out: int = 0
+
+
+def _current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss_mb() -> float:
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 1024
+
+
+class _RssSampler:
+    """Muestrea el RSS cada `interval_seconds` en un thread y guarda el máximo desde el último reset."""
+
+    def __init__(self, interval_seconds: float = 0.05):
+        self.interval_seconds = interval_seconds
+        self._peak_mb = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def _sample(self) -> None:
+        rss_mb = _current_rss_mb()
+        if rss_mb is not None:
+            with self._lock:
+                self._peak_mb = max(self._peak_mb, rss_mb)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._peak_mb = 0.0
+        self._sample()
+
+    def peak_mb(self) -> float:
+        self._sample()
+        with self._lock:
+            return self._peak_mb
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class RunReport:
+    """
+    Tiempos (reloj y CPU), filas y memoria por etapa de una corrida del ETL.
+    Memoria opcional: `tracemalloc` (asignaciones de Python/numpy, más preciso y más lento)
+    o `rss` (muestreo del RSS del proceso). Las etapas no deben anidarse.
+    """
+
+    def __init__(self, memory_mode: Optional[str] = None):
+        if memory_mode not in (None, MEMORY_TRACEMALLOC, MEMORY_RSS):
+            raise ValueError(f"Modo de memoria no soportado: {memory_mode}")
+        self.memory_mode = memory_mode
+        self.stages: Dict[str, StageRecord] = {}
+        self.extra: Dict[str, Any] = {}
+        self._rss_sampler: Optional[_RssSampler] = None
+        self._started_at = time.perf_counter()
+        self._cpu_started_at = time.process_time()
+        self._started_tracemalloc = False
+
+        if memory_mode == MEMORY_TRACEMALLOC and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif memory_mode == MEMORY_RSS:
+            self._rss_sampler = _RssSampler()
+            self._rss_sampler.start()
+
+    def _reset_peak(self) -> None:
+        if self.memory_mode == MEMORY_TRACEMALLOC:
+            tracemalloc.reset_peak()
+        elif self._rss_sampler is not None:
+            self._rss_sampler.reset()
+
+    def _peak_mb(self) -> Optional[float]:
+        if self.memory_mode == MEMORY_TRACEMALLOC:
+            return tracemalloc.get_traced_memory()[1] / 2**20
+        if self._rss_sampler is not None:
+            return self._rss_sampler.peak_mb()
+        return None
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = 0) -> Iterator[StageRows]:
+        stage_rows = StageRows(rows_in=rows_in)
+        self._reset_peak()
+        started_at, cpu_started_at = time.perf_counter(), time.process_time()
+        try:
+            yield stage_rows
+        finally:
+            self.record(
+                name,
+                wall_seconds=time.perf_counter() - started_at,
+                cpu_seconds=time.process_time() - cpu_started_at,
+                rows_in=stage_rows.rows_in,
+                rows_out=stage_rows.rows_out,
+                peak_memory_mb=self._peak_mb(),
+            )
+
+    def record(
+        self,
+        name: str,
+        wall_seconds: float,
+        cpu_seconds: float = 0.0,
+        rows_in: int = 0,
+        rows_out: int = 0,
+        peak_memory_mb: Optional[float] = None,
+        calls: int = 1,
+    ) -> None:
+        """Suma una ejecución medida por fuera (ej. en un proceso del pool o en threads)."""
+        stage_record = self.stages.setdefault(name, StageRecord(name))
+        stage_record.calls += calls
+        stage_record.wall_seconds += wall_seconds
+        stage_record.cpu_seconds += cpu_seconds
+        stage_record.rows_in += rows_in
+        stage_record.rows_out += rows_out
+        if peak_memory_mb is not None:
+            stage_record.peak_memory_mb = max(stage_record.peak_memory_mb or 0.0, peak_memory_mb)
+
+    def finish(self) -> Dict[str, Any]:
+        """Cierra la medición y retorna el reporte como dict serializable."""
+        if self._rss_sampler is not None:
+            self._rss_sampler.stop()
+            self._rss_sampler = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return {
+            "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "memory_mode": self.memory_mode,
+            "total_wall_seconds": round(time.perf_counter() - self._started_at, 4),
+            "total_cpu_seconds": round(time.process_time() - self._cpu_started_at, 4),
+            "max_rss_mb": round(_max_rss_mb(), 1),
+            "stages": [
+                {
+                    **asdict(stage_record),
+                    "wall_seconds": round(stage_record.wall_seconds, 4),
+                    "cpu_seconds": round(stage_record.cpu_seconds, 4),
+                    "peak_memory_mb": (
+                        round(stage_record.peak_memory_mb, 1) if stage_record.peak_memory_mb is not None else None
+                    ),
+                }
+                for stage_record in self.stages.values()
+            ],
+            **self.extra,
+        }
+
+    def write(self, path: Path) -> Dict[str, Any]:
+        report = self.finish()
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        self.log_summary(report)
+        logger.info(f"[RUN] Reporte de la corrida: {path}")
+        return report
+
+    @staticmethod
+    def log_summary(report: Dict[str, Any]) -> None:
+        for stage in report["stages"]:
+            memory_text = f" pico={stage['peak_memory_mb']:.1f}MB" if stage["peak_memory_mb"] is not None else ""
+            logger.info(
+                f"[RUN] {stage['name']}: {stage['wall_seconds']:.2f}s (cpu {stage['cpu_seconds']:.2f}s) "
+                f"filas {stage['rows_in']}->{stage['rows_out']} x{stage['calls']}{memory_text}"
+            )
+        logger.info(
+            f"[RUN] total: {report['total_wall_seconds']:.2f}s (cpu {report['total_cpu_seconds']:.2f}s) "
+            f"RSS máx={report['max_rss_mb']:.0f}MB"
+        )